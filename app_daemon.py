@@ -0,0 +1,189 @@
+# app_daemon.py
+# Resident "warm" mode for the launcher.
+#
+# The launcher normally pays for a fresh interpreter plus the Gtk / Gemini / OCR
+# imports on every hotkey press. With a daemon running (main_app_launcher.py --daemon)
+# the launcher only imports what is in this module's top level (stdlib only), sends
+# a one-line request over a Unix socket and exits; the daemon shows the capture
+# dialog from an already warm process.
+#
+# Keep the top-level imports of this file light: they are paid by the thin client.
+import json
+import os
+import socket
+import statistics
+import time
+
+from app_paths import get_cache_dir
+
+SOCKET_NAME = "ubuntu-ai-app.sock"
+CLIENT_TIMEOUT_SECONDS = 2.0
+LATENCY_LOG_NAME = "launch_latency.jsonl"
+
+
+def get_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    return os.path.join("/tmp", f"ubuntu-ai-app-{os.getuid()}.sock")
+
+
+def get_process_start_time():
+    """
+    Wall-clock time at which the current process was started, read from /proc so
+    that interpreter start-up is included. Falls back to 'now' if /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # The command name (field 2) may contain spaces; everything after the last ')' is safe to split.
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19]) # Field 22 overall: starttime, in clock ticks since boot
+        with open("/proc/stat", "r") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return time.time()
+
+
+# --- Client side (used by the launcher, must stay cheap) ---
+
+def send_request(command, launch_time=None, timeout=CLIENT_TIMEOUT_SECONDS):
+    """
+    Sends a command to a running daemon.
+    Returns the daemon's reply string, or None if no daemon is listening.
+    """
+    payload = json.dumps({"cmd": command, "launch_time": launch_time}) + "\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(get_socket_path())
+            sock.sendall(payload.encode("utf-8"))
+            reply = sock.makefile("r", encoding="utf-8").readline()
+            return reply.strip() or None
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None # No daemon running, the caller falls back to the in-process flow
+    except OSError as e:
+        print(f"DAEMON_CLIENT: Could not talk to daemon: {e}")
+        return None
+
+
+def is_daemon_running():
+    return send_request("ping") == "PONG"
+
+
+# --- Latency bookkeeping ---
+
+def record_launch_latency(mode, launch_time):
+    """Appends one hotkey-to-dialog measurement ('cold' or 'warm') to the latency log."""
+    if launch_time is None:
+        return
+    latency_ms = (time.time() - launch_time) * 1000.0
+    print(f"LATENCY: {mode} start, launch -> capture dialog shown: {latency_ms:.1f} ms")
+    try:
+        log_path = os.path.join(get_cache_dir(), LATENCY_LOG_NAME)
+        with open(log_path, "a") as f:
+            f.write(json.dumps({"mode": mode, "latency_ms": round(latency_ms, 2), "timestamp": time.time()}) + "\n")
+    except OSError as e:
+        print(f"LATENCY: Could not write latency log: {e}")
+
+
+def print_latency_report():
+    log_path = os.path.join(get_cache_dir(), LATENCY_LOG_NAME)
+    samples = {"cold": [], "warm": []}
+    try:
+        with open(log_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                samples.setdefault(entry.get("mode"), []).append(float(entry.get("latency_ms", 0)))
+    except FileNotFoundError:
+        print(f"No latency measurements recorded yet ({log_path}).")
+        return
+
+    print(f"Launch latency (launch -> capture dialog shown), from {log_path}")
+    print(f"{'mode':<6} {'n':>5} {'min':>9} {'median':>9} {'p95':>9} {'max':>9}")
+    for mode in ("cold", "warm"):
+        values = sorted(samples.get(mode, []))
+        if not values:
+            print(f"{mode:<6} {0:>5} {'-':>9} {'-':>9} {'-':>9} {'-':>9}")
+            continue
+        p95 = values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))]
+        print(f"{mode:<6} {len(values):>5} {values[0]:>8.1f}ms {statistics.median(values):>7.1f}ms "
+              f"{p95:>7.1f}ms {values[-1]:>7.1f}ms")
+    cold, warm = samples.get("cold"), samples.get("warm")
+    if cold and warm:
+        print(f"Median speed-up of warm start: {statistics.median(cold) / max(statistics.median(warm), 0.001):.1f}x")
+
+
+# --- Server side (only used inside the daemon process) ---
+
+def run_daemon(on_capture_request, on_library_request=None):
+    """
+    Listens on the Unix socket and runs the Gtk main loop forever.
+    on_capture_request(launch_time) is called on the GTK main thread for every 'capture' request,
+    on_library_request() for every 'library' request.
+    """
+    import gi
+    gi.require_version('Gtk', '3.0')
+    from gi.repository import Gtk, GLib
+
+    socket_path = get_socket_path()
+    if is_daemon_running():
+        print(f"DAEMON: Another daemon is already listening on {socket_path}. Exiting.")
+        return False
+    if os.path.exists(socket_path):
+        os.remove(socket_path) # Stale socket from a daemon that did not shut down cleanly
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(4)
+    print(f"DAEMON: Listening on {socket_path}")
+
+    def run_request(handler, *args):
+        handler(*args)
+        return False # One-shot idle callback
+
+    def on_connection(source, condition):
+        try:
+            conn, _ = server.accept()
+        except OSError as e:
+            print(f"DAEMON: accept() failed: {e}")
+            return True
+        with conn:
+            conn.settimeout(CLIENT_TIMEOUT_SECONDS)
+            try:
+                request = json.loads(conn.makefile("r", encoding="utf-8").readline() or "{}")
+            except (OSError, ValueError) as e:
+                print(f"DAEMON: Bad request: {e}")
+                return True
+            command = request.get("cmd")
+            try:
+                if command == "ping":
+                    conn.sendall(b"PONG\n")
+                elif command == "capture":
+                    conn.sendall(b"OK\n")
+                    # Reply first so the client can exit, then run the flow from the main loop.
+                    GLib.idle_add(run_request, on_capture_request, request.get("launch_time"))
+                elif command == "library" and on_library_request is not None:
+                    conn.sendall(b"OK\n")
+                    GLib.idle_add(run_request, on_library_request)
+                else:
+                    conn.sendall(b"ERROR unknown command\n")
+            except OSError as e:
+                print(f"DAEMON: Could not reply to client: {e}")
+        return True # Keep watching the socket
+
+    GLib.io_add_watch(server.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, on_connection)
+    try:
+        Gtk.main()
+    except KeyboardInterrupt:
+        print("DAEMON: Interrupted.")
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        print("DAEMON: Stopped.")
+    return True
@@ -0,0 +1,26 @@
+# app_env.py
+# Numeric settings read from environment variables at import time. A value that does not parse is
+# reported and replaced by the default, and one outside the allowed range is clamped, so a typo in
+# the environment never keeps a module (or the daemon, which imports most of them while warming up)
+# from loading.
+import math
+import os
+
+
+def env_number(name, default, kind=int, minimum=None, maximum=None):
+    """The value of environment variable name as kind (int or float), default if it is unset or invalid."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        number = kind(value)
+    except ValueError:
+        number = None
+    if number is None or not math.isfinite(number):
+        print(f"Warning: {name}={value!r} is not a valid {'whole number' if kind is int else 'number'}, using {default}.")
+        return default
+    clamped = max(minimum, number) if minimum is not None else number
+    clamped = min(maximum, clamped) if maximum is not None else clamped
+    if clamped != number:
+        print(f"Warning: {name}={value} is out of range, using {clamped}.")
+    return clamped
@@ -0,0 +1,13 @@
+# app_paths.py
+# Per-user locations shared by the app modules (XDG base directories).
+import os
+
+APP_NAME = "ubuntu-ai-app"
+
+
+def get_cache_dir(*subdirs):
+    """Returns (and creates) the app's cache directory, or a subdirectory of it."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    cache_dir = os.path.join(base, APP_NAME, *subdirs)
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    return cache_dir
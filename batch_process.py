@@ -0,0 +1,255 @@
+# batch_process.py
+# Headless OCR + Gemini over directories of existing images, without any window.
+#
+# Images stream through a three-stage pipeline:
+#
+#   1. OCR in worker processes (the shared pool of ocr_tiling, one image per worker at a time);
+#   2. the requested Gemini operations (translate / summarize / format), several images at a time,
+#      with the request rate capped by the token bucket of gemini_requests.py (--rpm);
+#   3. one JSON line per image appended to the output file as soon as the image is complete.
+#
+# Only a bounded number of images is in flight, so memory stays flat over tens of thousands of
+# files. The output file doubles as the checkpoint: a run that is interrupted (Ctrl+C, crash, power
+# loss) is resumed by running the same command again, and images that already have a result without
+# errors are skipped. Images with an error are retried on the next run, and their new line is
+# appended (the last line for a path wins).
+#
+#   python3 batch_process.py ~/Pictures/Screenshots --output screenshots.jsonl
+#   python3 batch_process.py scans/ --translate pt-BR --translate es --summarize short --rpm 60
+#   GEMINI_BACKEND=simulate python3 batch_process.py scans/ --format --output formatted.jsonl
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gemini_requests import REQUESTS_PER_MINUTE, get_gemini_requests
+from ocr_tiling import OCR_WORKERS, get_process_pool
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tiff", ".tif", ".bmp", ".gif")
+DEFAULT_GEMINI_CONCURRENCY = 4
+PROGRESS_SECONDS = 5
+
+
+def find_images(inputs):
+    """Yields the image files among inputs (files, or directories searched recursively) in a stable order."""
+    for input_path in inputs:
+        if os.path.isfile(input_path):
+            yield os.path.abspath(input_path)
+            continue
+        for root, dirs, names in os.walk(input_path):
+            dirs.sort()
+            for name in sorted(names):
+                if name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith("."):
+                    yield os.path.abspath(os.path.join(root, name))
+
+
+def load_checkpoint(output_path):
+    """
+    Reads the results already in output_path and returns {path: (mtime, size)} of the images done
+    without errors. A line cut short by an interrupted run is removed from the file.
+    """
+    done = {}
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        complete_length = data.rfind(b"\n") + 1
+        if complete_length < len(data):
+            print(f"Batch: dropping an incomplete last line from '{output_path}'.", file=sys.stderr)
+            f.truncate(complete_length)
+    for line in data[:complete_length].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("errors"):
+            done.pop(record.get("path"), None)
+        else:
+            done[record.get("path")] = (record.get("mtime"), record.get("size"))
+    return done
+
+
+def parse_operations(args):
+    """
+    (name, function, option) for every Gemini operation requested on the command line, e.g. ('translate:pt-BR', ...).
+    Each function returns the result and raises on failure.
+    """
+    # The raising variants: a reply that happens to start with "Error" (a screenshot of an error message) is a result
+    from gemini_utils import request_translation, request_summary, request_formatting
+    operations = [(f"translate:{language}", request_translation, language)
+                  for language in dict.fromkeys(args.translate or [])]
+    if args.summarize:
+        operations.append((f"summarize:{args.summarize}", request_summary, args.summarize))
+    if args.format:
+        operations.append(("format", request_formatting, None))
+    return operations
+
+
+def ocr_file(path, lang, psm):
+    """Runs in an OCR worker process. Returns (text, width, height, error, ocr seconds) for one image file."""
+    from captured_image import CapturedImage
+    from ocr_result import OCRResult
+    from ocr_utils import extract_words_from_image
+    start = time.perf_counter()
+    try:
+        captured_image = CapturedImage.from_file(path)
+    except OSError as e:
+        return None, None, None, f"Could not read image: {e}", time.perf_counter() - start
+    # Each worker already has a core of its own; the OCR cache would only churn with one-off images.
+    result = extract_words_from_image(captured_image, lang=lang, psm=psm, use_cache=False, allow_tiling=False)
+    if isinstance(result, OCRResult):
+        return result.text, captured_image.width, captured_image.height, None, time.perf_counter() - start
+    return None, captured_image.width, captured_image.height, result or "OCR failed", time.perf_counter() - start
+
+
+class BatchStats:
+    def __init__(self, total):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.ocr_seconds = 0.0
+        self.gemini_seconds = 0.0
+        self.start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        with self._lock:
+            self.completed += 1
+            self.failed += 1 if record["errors"] else 0
+            self.ocr_seconds += record["ocr_ms"] / 1000
+            self.gemini_seconds += record["gemini_ms"] / 1000
+
+    def summary(self):
+        elapsed = time.monotonic() - self.start
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        return (f"{self.completed}/{self.total} images ({self.failed} with errors) in {elapsed:.1f} s, "
+                f"{rate:.2f} images/s; per image: OCR {self.ocr_seconds / max(1, self.completed) * 1000:.0f} ms, "
+                f"Gemini {self.gemini_seconds / max(1, self.completed) * 1000:.0f} ms")
+
+
+class BatchPipeline:
+    def __init__(self, output_path, operations, lang=None, psm=None, gemini_concurrency=DEFAULT_GEMINI_CONCURRENCY,
+                 requests_per_minute=REQUESTS_PER_MINUTE, max_in_flight=None):
+        self.output_path = output_path
+        self.operations = operations
+        self.lang = lang
+        self.psm = psm
+        # All Gemini calls of the process share one rate limit; cached answers do not use it up
+        get_gemini_requests().set_rate_limit(requests_per_minute, burst=gemini_concurrency)
+        self._gemini_executor = ThreadPoolExecutor(max_workers=gemini_concurrency, thread_name_prefix="batch-gemini")
+        # Images between "OCR submitted" and "line written"; bounds memory and the work lost on a crash
+        self._slots = threading.Semaphore(max_in_flight or 2 * (OCR_WORKERS + gemini_concurrency))
+        self._results = queue.Queue() # Finished records, written by one thread in completion order
+        self._submitted = 0
+        self._all_submitted = threading.Event()
+
+    def run(self, paths, done=None):
+        """Processes paths (skipping those in done, see load_checkpoint) and returns the BatchStats."""
+        done = done or {}
+        todo = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if done.get(path) != (stat.st_mtime, stat.st_size):
+                todo.append((path, stat.st_mtime, stat.st_size))
+        print(f"Batch: {len(todo)} images to process ({len(done)} already done), {OCR_WORKERS} OCR workers, "
+              f"operations: {', '.join(name for name, _, _ in self.operations) or 'OCR only'}.", file=sys.stderr)
+        stats = BatchStats(len(todo))
+        # Daemon thread: a second Ctrl+C abandons the images in flight instead of waiting for them
+        writer = threading.Thread(target=self._write_results, args=(stats,), name="batch-writer", daemon=True)
+        writer.start()
+        pool = get_process_pool()
+        try:
+            for path, mtime, size in todo:
+                self._slots.acquire()
+                future = pool.submit(ocr_file, path, self.lang, self.psm)
+                self._submitted += 1
+                future.add_done_callback(lambda f, p=path, m=mtime, s=size: self._on_ocr_done(f, p, m, s))
+        except KeyboardInterrupt:
+            print("Batch: interrupted, finishing the images in flight (Ctrl+C again to abandon them).", file=sys.stderr)
+        finally:
+            self._all_submitted.set()
+        writer.join()
+        self._gemini_executor.shutdown()
+        if stats.completed < len(todo):
+            print("Batch: stopped early; run the same command again to continue.", file=sys.stderr)
+        return stats
+
+    def _on_ocr_done(self, future, path, mtime, size):
+        # Called in the process pool's management thread: hand the image over, never block here
+        record = {"path": path, "mtime": mtime, "size": size, "width": None, "height": None, "text": None,
+                  "results": {}, "errors": {}, "ocr_ms": 0.0, "gemini_ms": 0.0}
+        try:
+            text, record["width"], record["height"], error, ocr_seconds = future.result()
+            record["text"], record["ocr_ms"] = text, round(ocr_seconds * 1000, 1)
+            if error:
+                record["errors"]["ocr"] = error
+        except Exception as e: # e.g. a worker process that died
+            record["errors"]["ocr"] = f"OCR worker failed: {e}"
+        if record["text"] and self.operations:
+            self._gemini_executor.submit(self._run_operations, record)
+        else:
+            self._results.put(record)
+
+    def _run_operations(self, record):
+        start = time.perf_counter()
+        for name, function, option in self.operations:
+            try:
+                record["results"][name] = function(record["text"], option) if option is not None else function(record["text"])
+            except Exception as e:
+                record["errors"][name] = str(e) or type(e).__name__
+        record["gemini_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self._results.put(record)
+
+    def _write_results(self, stats):
+        last_progress = time.monotonic()
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            while not (self._all_submitted.is_set() and stats.completed >= self._submitted):
+                try:
+                    record = self._results.get(timeout=0.5)
+                except queue.Empty:
+                    record = None
+                if record is not None:
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush() # A finished image must survive a crash of the run
+                    stats.record(record)
+                    self._slots.release()
+                if time.monotonic() - last_progress >= PROGRESS_SECONDS:
+                    print(f"Batch: {stats.summary()}", file=sys.stderr)
+                    last_progress = time.monotonic()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OCR (and optionally translate, summarize or format) every image "
+                                                 "in directories, writing one JSON line per image.")
+    parser.add_argument("inputs", nargs="+", help="Image files or directories (searched recursively)")
+    parser.add_argument("--output", "-o", default="batch_results.jsonl",
+                        help="JSONL file the results are appended to; also the checkpoint for resuming")
+    parser.add_argument("--translate", metavar="LANG", action="append", help="Translate the text (repeatable)")
+    parser.add_argument("--summarize", nargs="?", const="medium", choices=("short", "medium", "long"),
+                        help="Summarize the text (default length: medium)")
+    parser.add_argument("--format", action="store_true", help="Improve the formatting of the text")
+    parser.add_argument("--lang", help="Tesseract languages, e.g. eng+por (default: UBUNTU_AI_OCR_LANGS)")
+    parser.add_argument("--psm", type=int, help="Tesseract page segmentation mode")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_GEMINI_CONCURRENCY,
+                        help="Images whose Gemini operations run at the same time")
+    parser.add_argument("--rpm", type=float, default=REQUESTS_PER_MINUTE,
+                        help="Upper bound on Gemini API requests per minute")
+    parser.add_argument("--restart", action="store_true", help="Ignore the results already in the output file")
+    args = parser.parse_args()
+
+    operations = parse_operations(args)
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+    done = load_checkpoint(args.output)
+    pipeline = BatchPipeline(args.output, operations, lang=args.lang, psm=args.psm,
+                             gemini_concurrency=args.concurrency, requests_per_minute=args.rpm)
+    stats = pipeline.run(find_images(args.inputs), done)
+    print(f"Batch: {stats.summary()}", file=sys.stderr)
+    print(f"Batch: results in '{args.output}'.", file=sys.stderr)
@@ -0,0 +1,97 @@
+# benchmarks/bench_capture.py
+# Full-screen capture latency per backend (capture + decode into a CapturedImage).
+# Without a DISPLAY it starts its own Xvfb server, so it also runs headless (e.g. in CI):
+#
+#   python3 benchmarks/bench_capture.py --captures 20 --screen 1920x1080
+#   python3 benchmarks/bench_capture.py --backend gdk --json capture.json
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def start_xvfb(screen="1920x1080", display=":97"):
+    """Starts Xvfb on display and points DISPLAY at it. Returns the process, or None if Xvfb is missing."""
+    if shutil.which("Xvfb") is None:
+        return None
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", f"{screen}x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket_path = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Xvfb did not start on {display}")
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = display
+    os.environ["XDG_SESSION_TYPE"] = "x11"
+    return process
+
+
+def run_benchmark(captures=20, backend_names=None):
+    import gi
+    gi.require_version('Gtk', '3.0') # The in-process backend imports Gtk when it captures
+    from capture_backends import CaptureBackendRegistry
+
+    registry = CaptureBackendRegistry()
+    results = {}
+    for backend in registry.candidates(full_screen=True):
+        if backend_names and backend.name not in backend_names:
+            continue
+        if hasattr(backend, "settle_seconds"):
+            backend.settle_seconds = 0 # No dialog to wait for here
+        latencies = []
+        size = None
+        for i in range(captures):
+            start = time.perf_counter()
+            captured_image = backend.capture(True, f"bench-{backend.name}-{i}", registry.clean_env)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if captured_image is None:
+                raise RuntimeError(f"Backend {backend.name} failed to capture")
+            size = f"{captured_image.width}x{captured_image.height}"
+        results[backend.name] = {
+            "captures": captures,
+            "size": size,
+            "mean_ms": round(statistics.mean(latencies), 2),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full-screen capture latency per capture backend.")
+    parser.add_argument("--captures", type=int, default=20)
+    parser.add_argument("--backend", action="append", help="Only measure this backend (repeatable)")
+    parser.add_argument("--screen", default="1920x1080", help="Xvfb screen size when no DISPLAY is set")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    xvfb = None
+    if not os.environ.get("DISPLAY"):
+        xvfb = start_xvfb(args.screen)
+        if xvfb is None:
+            sys.exit("No DISPLAY and Xvfb is not installed (sudo apt install xvfb).")
+    try:
+        results = run_benchmark(args.captures, args.backend)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    print(f"{'backend':<18} {'size':>10} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, r in results.items():
+        print(f"{name:<18} {r['size']:>10} {r['mean_ms']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
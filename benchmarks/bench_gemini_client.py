@@ -0,0 +1,72 @@
+# benchmarks/bench_gemini_client.py
+# Latency and throughput of GeminiClient against the local stand-in server, fully offline.
+# Compares the shared client (warm keep-alive connections) with a new client per call.
+#
+#   python3 benchmarks/bench_gemini_client.py --requests 200 --concurrency 8 --latency 0.02
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gemini_client import GeminiClient, HttpBackend
+from gemini_standin import start_standin_server
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def run_case(make_client, requests, concurrency):
+    """Sends `requests` prompts with `concurrency` threads. Returns a result dict (latencies in ms)."""
+    latencies = []
+    def one_request(i):
+        client = make_client()
+        start = time.perf_counter()
+        client.generate(f'Translate the following text into fr:\n\n"benchmark sentence number {i}"')
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one_request, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+    }
+
+
+def run_benchmark(requests=200, concurrency=8, latency=0.02):
+    server, url = start_standin_server(latency=latency)
+    try:
+        shared_client = GeminiClient(HttpBackend(url), model_name="standin")
+        return {
+            "warm_shared_client": run_case(lambda: shared_client, requests, concurrency),
+            "new_client_per_call": run_case(lambda: GeminiClient(HttpBackend(url), model_name="standin"), requests, concurrency),
+        }
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark GeminiClient against a local stand-in server.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated server latency in seconds")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.requests, args.concurrency, args.latency)
+    print(f"{'case':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for case, r in results.items():
+        print(f"{case:<22} {r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
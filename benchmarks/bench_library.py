@@ -0,0 +1,100 @@
+# benchmarks/bench_library.py
+# Search latency of the screenshot library (screenshot_library.ScreenshotLibrary) as it grows:
+# a synthetic library of N screenshots with OCR-like text is stored in a temporary database, then
+# whole-word, multi-word and search-as-you-type (prefix) queries are timed against it.
+#
+#   python3 benchmarks/bench_library.py
+#   python3 benchmarks/bench_library.py --entries 1000 10000 50000 --json library.json
+#
+# No images are decoded or recognized: this measures the index, not OCR (see bench_ocr_cache.py).
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screenshot_library import ScreenshotLibrary
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_SCREENSHOT = 300
+QUERIES = {
+    "one word": lambda rng, vocab: pick_word(rng, vocab, skip=20),
+    "two words": lambda rng, vocab: f"{pick_word(rng, vocab, skip=20)} {pick_word(rng, vocab)}",
+    "prefix (typing)": lambda rng, vocab: pick_word(rng, vocab, skip=20)[:3],
+    "common word": lambda rng, vocab: vocab[0],
+}
+
+
+def make_vocabulary(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(VOCABULARY_SIZE)]
+
+
+def pick_word(rng, vocab, skip=0):
+    # Zipf-like: a few words are everywhere (like "File" or "the"), most are rare
+    return vocab[min(skip + int(rng.paretovariate(1.1)) - 1, len(vocab) - 1)]
+
+
+def make_text(rng, vocab):
+    words = [pick_word(rng, vocab) for _ in range(WORDS_PER_SCREENSHOT)]
+    return "\n".join(" ".join(words[i:i + 12]) for i in range(0, len(words), 12))
+
+
+def fill_library(library, count, rng, vocab, start=0):
+    begin = time.perf_counter()
+    for i in range(start, count):
+        library.store(f"/screenshots/Screenshot_{i:06d}.png", 1700000000.0 + i, 100000 + i,
+                      make_text(rng, vocab), 1920, 1080, thumbnail=b"\xff" * 6000)
+    return time.perf_counter() - begin
+
+
+def time_queries(library, rng, vocab, repeats=50):
+    results = {}
+    for name, make_query in QUERIES.items():
+        timings, hits = [], []
+        for _ in range(repeats):
+            query = make_query(rng, vocab)
+            start = time.perf_counter()
+            hits.append(len(library.search(query)))
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {"median_ms": round(statistics.median(timings), 2),
+                         "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 2),
+                         "mean_hits": round(statistics.mean(hits), 1)}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark screenshot library search latency.")
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000],
+                        help="Library sizes to measure (filled incrementally)")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    vocab = make_vocabulary(rng)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        library = ScreenshotLibrary(os.path.join(tmp_dir, "library.sqlite3"), directory=tmp_dir)
+        stored = 0
+        for count in sorted(args.entries):
+            fill_seconds = fill_library(library, count, rng, vocab, start=stored)
+            added, stored = max(1, count - stored), count
+            results[count] = {"store_ms_per_entry": round(fill_seconds * 1000 / added, 3),
+                              "queries": time_queries(library, rng, vocab, args.repeats)}
+            results[count]["db_mb"] = round(os.path.getsize(library.db_path) / 1024 / 1024, 1)
+
+    print(f"{'entries':>8} {'query':<16} {'median ms':>10} {'p95 ms':>8} {'hits':>6}")
+    for count, r in results.items():
+        for name, q in r["queries"].items():
+            print(f"{count:>8} {name:<16} {q['median_ms']:>10} {q['p95_ms']:>8} {q['mean_hits']:>6}")
+        print(f"{count:>8} database {r['db_mb']} MB, {r['store_ms_per_entry']} ms per stored entry")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,122 @@
+# benchmarks/bench_live_watch.py
+# Change detection of the live region watch (live_watch.RegionWatcher): a synthetic subtitle track
+# (each subtitle faded in over a few frames, then held) is fed frame by frame, and we measure what
+# the per-frame diff costs and how many frames reach OCR compared with the number of subtitles.
+#
+#   python3 benchmarks/bench_live_watch.py
+#   python3 benchmarks/bench_live_watch.py --subtitles 40 --size 1920x200 --json watch.json
+#
+# OCR is replaced by a counter: this measures which frames are chosen, not Tesseract (see
+# bench_ocr_engine.py). "missed" counts subtitles whose settled frame never reached OCR; "extra"
+# counts OCR runs beyond one per subtitle (half-faded frames, noise mistaken for a change).
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from captured_image import CapturedImage
+from live_watch import FrameDiff, RegionWatcher
+from ocr_result import OCRResult
+
+from bench_ocr_preprocess import WORDS, load_font
+
+FADE_FRAMES = 3
+HOLD_FRAMES = 8 # 4 s at the default 2 fps
+CASES = {"static background": 0, "noisy background": 6} # Gray-level sigma of per-frame noise (video compression)
+
+
+def make_frames(subtitles, size, noise, rng):
+    """[(PIL frame, subtitle index)] for the whole track."""
+    np_rng = np.random.default_rng(rng.randint(0, 2 ** 31))
+    font = load_font(max(16, size[1] // 5))
+    background = Image.new("RGB", size, (30, 34, 40))
+    frames = []
+    previous = background
+    for index in range(subtitles):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 9))).capitalize()
+        subtitle = background.copy()
+        ImageDraw.Draw(subtitle).text((size[0] // 20, size[1] // 3), text, fill=(240, 240, 240), font=font)
+        for step in range(1, FADE_FRAMES + 1):
+            frames.append((Image.blend(previous, subtitle, step / FADE_FRAMES), index))
+        frames.extend((subtitle, index) for _ in range(HOLD_FRAMES))
+        previous = subtitle
+    if noise:
+        noisy_frames = []
+        for frame, index in frames:
+            pixels = np.asarray(frame, dtype=np.int16) + np_rng.normal(0, noise, (size[1], size[0], 1)).astype(np.int16)
+            noisy_frames.append((Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)), index))
+        frames = noisy_frames
+    return frames
+
+
+def run_case(frames, fps):
+    recognized = [] # Subtitle index of every frame that reached OCR
+    done = threading.Semaphore(0)
+    current = {}
+
+    def count_ocr(captured_image, **kwargs):
+        recognized.append(current["index"])
+        done.release()
+        return OCRResult()
+
+    watcher = RegionWatcher((0, 0, frames[0][0].width, frames[0][0].height), ocr=count_ocr)
+    diff_times = []
+    for number, (frame, index) in enumerate(frames):
+        current["index"] = index
+        start = time.perf_counter()
+        submitted = watcher.process_frame(CapturedImage(frame, source="bench"), now=number / fps)
+        diff_times.append((time.perf_counter() - start) * 1000)
+        if submitted:
+            done.acquire() # The counter is instant; waiting keeps "OCR busy" out of the measurement
+    watcher.close()
+    subtitles = frames[-1][1] + 1
+    diff_times.sort()
+    return {"frames": len(frames), "subtitles": subtitles, "ocr_runs": len(recognized),
+            "missed": subtitles - len(set(recognized)), "extra": len(recognized) - len(set(recognized)),
+            "diff_median_ms": round(statistics.median(diff_times), 3),
+            "diff_p95_ms": round(diff_times[int(len(diff_times) * 0.95)], 3)}
+
+
+def time_signature(size, repeats):
+    frame_diff = FrameDiff()
+    image = Image.new("RGB", size, (30, 34, 40))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        frame_diff.differs(frame_diff.signature(image), frame_diff.signature(image))
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark change detection of the live region watch.")
+    parser.add_argument("--subtitles", type=int, default=20)
+    parser.add_argument("--size", default="1280x160", help="Watched region size, WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=float, default=2.0)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    size = tuple(int(value) for value in args.size.split("x"))
+    results = {"cases": [], "full_screen_diff_ms": time_signature((3840, 2160), 10)}
+    for case, noise in CASES.items():
+        frames = make_frames(args.subtitles, size, noise, random.Random(1))
+        results["cases"].append(dict(run_case(frames, args.fps), case=case))
+
+    print(f"{'case':<20} {'frames':>7} {'subtitles':>9} {'OCR runs':>9} {'missed':>7} {'extra':>6} "
+          f"{'diff median ms':>15} {'diff p95 ms':>12}")
+    for r in results["cases"]:
+        print(f"{r['case']:<20} {r['frames']:>7} {r['subtitles']:>9} {r['ocr_runs']:>9} {r['missed']:>7} "
+              f"{r['extra']:>6} {r['diff_median_ms']:>15} {r['diff_p95_ms']:>12}")
+    print(f"Diff of a 3840x2160 frame: {results['full_screen_diff_ms']} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,78 @@
+# benchmarks/bench_ocr_engine.py
+# End-to-end OCR time and accuracy of ocr_utils.extract_words_from_image (preprocessing, the warm
+# engine, tiling of large captures) on synthetic screenshots, per capture size and Tesseract
+# language set. The text is English, so extra languages show what loading and searching more
+# language models costs.
+#
+#   python3 benchmarks/bench_ocr_engine.py
+#   python3 benchmarks/bench_ocr_engine.py --sizes 1920x1080,3840x2160 --langs eng,eng+por --json ocr.json
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_ocr_preprocess import STYLES, accuracy, make_sample
+from ocr_engine import OCREngineUnavailable, get_ocr_engine
+from ocr_result import OCRResult
+from ocr_utils import extract_words_from_image
+
+
+def run_benchmark(sizes, language_sets, repeats=3, seed=1):
+    engine = get_ocr_engine()
+    results = {}
+    for width, height in sizes:
+        rng = random.Random(seed)
+        image, expected = make_sample(STYLES[0], rng, lines=max(4, height // 40), size=(width, height))
+        for languages in language_sets:
+            engine.warm_up(languages) # Engine start-up is not measured
+            timings, result = [], None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = extract_words_from_image(image, lang=languages, use_cache=False)
+                timings.append((time.perf_counter() - start) * 1000.0)
+            if not isinstance(result, OCRResult):
+                raise RuntimeError(f"OCR failed for {width}x{height} ({languages}): {result}")
+            results[f"{width}x{height}/{languages}"] = {
+                "size": f"{width}x{height}",
+                "languages": languages,
+                "median_ms": round(statistics.median(timings), 1),
+                "min_ms": round(min(timings), 1),
+                "words": len(result),
+                "accuracy": round(accuracy(expected, result.text), 4),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark OCR time and accuracy per capture size and language set.")
+    parser.add_argument("--sizes", default="1280x720,1920x1080,3840x2160")
+    parser.add_argument("--langs", default="eng,eng+por", help="Comma-separated Tesseract language sets; "
+                        "sets with a language that is not installed are skipped")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    try:
+        installed = set(get_ocr_engine().available_languages())
+    except (OCREngineUnavailable, ImportError) as e: # ImportError: neither tesserocr nor pytesseract
+        sys.exit(f"Tesseract is not available: {e}")
+    language_sets = []
+    for languages in args.langs.split(","):
+        missing = [language for language in languages.split("+") if language not in installed]
+        if missing:
+            print(f"Skipping '{languages}': not installed: {', '.join(missing)}")
+        else:
+            language_sets.append(languages)
+    sizes = [tuple(int(v) for v in size.split("x")) for size in args.sizes.split(",")]
+    results = run_benchmark(sizes, language_sets, args.repeats)
+
+    print(f"{'size':>10} {'languages':<12} {'median ms':>10} {'min ms':>8} {'words':>6} {'accuracy':>9}")
+    for r in results.values():
+        print(f"{r['size']:>10} {r['languages']:<12} {r['median_ms']:>10} {r['min_ms']:>8} {r['words']:>6} {r['accuracy']:>9}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
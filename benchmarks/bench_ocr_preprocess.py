@@ -0,0 +1,126 @@
+# benchmarks/bench_ocr_preprocess.py
+# OCR wall time and accuracy on a synthetic corpus of screenshot-like text images, with the full
+# preprocessing pipeline (ocr_preprocess.py), without it, and with each stage left out in turn.
+#
+#   python3 benchmarks/bench_ocr_preprocess.py --images 12
+#   python3 benchmarks/bench_ocr_preprocess.py --no-ocr          # preprocessing time only, no Tesseract needed
+#   python3 benchmarks/bench_ocr_preprocess.py --json preprocess.json
+import argparse
+import difflib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ocr_preprocess import PreprocessConfig, preprocess_image
+
+WORDS = ("screenshot translate window preview settings network display keyboard language document "
+         "clipboard capture server request response library terminal process memory update version "
+         "account password download folder message button cancel select system battery").split()
+
+# (name, background, text color, font size, left/top margin)
+STYLES = [
+    ("light", (255, 255, 255), (20, 20, 20), 15, 40),
+    ("dark_theme", (36, 36, 40), (225, 225, 225), 15, 40),
+    ("small_font", (250, 250, 250), (40, 40, 40), 11, 40),
+    ("wide_margins", (242, 242, 242), (30, 30, 30), 15, 400),
+    ("gradient", None, (15, 15, 15), 15, 40),
+]
+
+
+def load_font(size):
+    for name in ("DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def make_sample(style, rng, lines=8, size=(1280, 720)):
+    """Returns (PIL image, expected text) for one synthetic screenshot."""
+    name, background, color, font_size, margin = style
+    if background is None: # Horizontal light-to-mid gray gradient, like a themed panel
+        row = Image.linear_gradient("L").rotate(90).resize((size[0], 1))
+        image = row.resize(size).point(lambda v: 250 - v // 3).convert("RGB")
+    else:
+        image = Image.new("RGB", size, background)
+    draw = ImageDraw.Draw(image)
+    font = load_font(font_size)
+    text_lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 8))).capitalize() for _ in range(lines)]
+    for i, line in enumerate(text_lines):
+        draw.text((margin, margin + i * int(font_size * 1.8)), line, fill=color, font=font)
+    return image, "\n".join(text_lines)
+
+
+def accuracy(expected, recognized):
+    """Character-level similarity of the whitespace-normalized texts (1.0 is a perfect match)."""
+    return difflib.SequenceMatcher(None, " ".join(expected.split()), " ".join(recognized.split())).ratio()
+
+
+def benchmark_configs():
+    configs = {"raw": None, "all_stages": PreprocessConfig(), "grayscale_only": PreprocessConfig(
+        invert=False, crop_margins=False, upscale=False, binarize=False)}
+    for stage in ("invert", "crop_margins", "upscale", "binarize"):
+        configs[f"without_{stage}"] = PreprocessConfig(**{stage: False})
+    return configs
+
+
+def run_benchmark(images_per_style=4, run_ocr=True, seed=1):
+    if run_ocr:
+        import pytesseract
+    rng = random.Random(seed)
+    corpus = [(style[0],) + make_sample(style, rng) for style in STYLES for _ in range(images_per_style)]
+
+    results = {}
+    for config_name, config in benchmark_configs().items():
+        stage_seconds = {}
+        preprocess_ms, ocr_ms, scores = [], [], {}
+        for style_name, image, expected in corpus:
+            start = time.perf_counter()
+            prepared = preprocess_image(image, config, timings=stage_seconds) if config else image
+            preprocess_ms.append((time.perf_counter() - start) * 1000.0)
+            if run_ocr:
+                start = time.perf_counter()
+                recognized = pytesseract.image_to_string(prepared)
+                ocr_ms.append((time.perf_counter() - start) * 1000.0)
+                scores.setdefault(style_name, []).append(accuracy(expected, recognized))
+        result = {
+            "images": len(corpus),
+            "preprocess_ms": round(statistics.mean(preprocess_ms), 2),
+            "stage_ms": {stage: round(seconds * 1000.0 / len(corpus), 2) for stage, seconds in stage_seconds.items()},
+        }
+        if run_ocr:
+            result["ocr_ms"] = round(statistics.mean(ocr_ms), 2)
+            result["accuracy"] = round(statistics.mean(s for style_scores in scores.values() for s in style_scores), 4)
+            result["accuracy_by_style"] = {style: round(statistics.mean(s), 4) for style, s in scores.items()}
+        results[config_name] = result
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark OCR preprocessing stages on a synthetic corpus.")
+    parser.add_argument("--images", type=int, default=4, help="Images per style (styles: " +
+                        ", ".join(style[0] for style in STYLES) + ")")
+    parser.add_argument("--no-ocr", action="store_true", help="Only time the preprocessing stages")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.images, run_ocr=not args.no_ocr, seed=args.seed)
+    print(f"{'configuration':<22} {'prep ms':>8} {'ocr ms':>8} {'total ms':>9} {'accuracy':>9}")
+    for name, r in results.items():
+        ocr_ms = r.get("ocr_ms", 0.0)
+        print(f"{name:<22} {r['preprocess_ms']:>8} {ocr_ms if 'ocr_ms' in r else '-':>8} "
+              f"{round(r['preprocess_ms'] + ocr_ms, 2):>9} {r.get('accuracy', '-'):>9}")
+    print("\nPer-stage time (ms per image) with all stages:")
+    for stage, ms in results["all_stages"]["stage_ms"].items():
+        print(f"  {stage:<14} {ms:>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,100 @@
+# benchmarks/bench_ocr_tiling.py
+# Speedup of tiled multi-process OCR (ocr_tiling.py) over a single Tesseract call, as the capture
+# grows from one Full HD screen to two 4K screens and as more worker processes are used.
+#
+#   python3 benchmarks/bench_ocr_tiling.py
+#   python3 benchmarks/bench_ocr_tiling.py --sizes 3840x2160,7680x2160 --workers 1,2,4,8 --json tiling.json
+#   python3 benchmarks/bench_ocr_tiling.py --plan-only     # tile plans only, no Tesseract needed
+import argparse
+import difflib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_ocr_preprocess import WORDS, load_font
+import ocr_tiling
+from ocr_engine import get_ocr_engine, words_to_text
+
+SCREEN_WIDTH = 1920 # Width of one text column in the synthetic captures
+
+
+def make_capture(width, height, seed=1):
+    """A white capture with one column of paragraphs per 1920 pixels, like windows side by side."""
+    rng = random.Random(seed)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    font = load_font(16)
+    for column_left in range(0, width, SCREEN_WIDTH):
+        y = 40
+        while y < height - 60:
+            for _ in range(rng.randint(3, 8)):
+                if y >= height - 60:
+                    break
+                draw.text((column_left + 40, y), " ".join(rng.choice(WORDS) for _ in range(14)), fill=0, font=font)
+                y += 22
+            y += 30
+    return image
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, " ".join(a.split()), " ".join(b.split())).ratio()
+
+
+def run_benchmark(sizes, worker_counts, plan_only=False):
+    results = []
+    for width, height in sizes:
+        image = make_capture(width, height)
+        gray = np.asarray(image)
+        row = {"size": f"{width}x{height}", "megapixels": round(width * height / 1e6, 1), "workers": {}}
+        if not plan_only:
+            start = time.perf_counter()
+            baseline_text = get_ocr_engine().recognize(image).strip()
+            row["single_call_s"] = round(time.perf_counter() - start, 3)
+        for workers in worker_counts:
+            start = time.perf_counter()
+            tiles = ocr_tiling.plan_tiles(gray, max(ocr_tiling.MIN_TILE_PIXELS, gray.size // (2 * workers)))
+            case = {"tiles": len(tiles), "plan_ms": round((time.perf_counter() - start) * 1000, 1)}
+            if not plan_only:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=ocr_tiling._init_worker) as pool:
+                    for future in [pool.submit(ocr_tiling._warm_worker) for _ in range(workers)]:
+                        future.result() # Process start-up is not measured
+                    start = time.perf_counter()
+                    text = words_to_text(ocr_tiling.ocr_tiled(image, executor=pool, workers=workers))
+                    case["tiled_s"] = round(time.perf_counter() - start, 3)
+                case["speedup"] = round(row["single_call_s"] / case["tiled_s"], 2)
+                case["text_similarity"] = round(similarity(baseline_text, text), 3)
+            row["workers"][workers] = case
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tiled multi-process OCR against a single call.")
+    parser.add_argument("--sizes", default="1920x1080,3840x2160,7680x2160")
+    default_workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)))
+    parser.add_argument("--plan-only", action="store_true", help="Only plan the tiles (no OCR)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(v) for v in size.split("x")) for size in args.sizes.split(",")]
+    worker_counts = [int(v) for v in args.workers.split(",")]
+    results = run_benchmark(sizes, worker_counts, plan_only=args.plan_only)
+
+    print(f"{'size':>10} {'workers':>7} {'tiles':>5} {'plan ms':>8} {'single s':>9} {'tiled s':>8} {'speedup':>8} {'similar':>8}")
+    for row in results:
+        for workers, case in row["workers"].items():
+            print(f"{row['size']:>10} {workers:>7} {case['tiles']:>5} {case['plan_ms']:>8} {row.get('single_call_s', '-'):>9} "
+                  f"{case.get('tiled_s', '-'):>8} {case.get('speedup', '-'):>8} {case.get('text_similarity', '-'):>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,143 @@
+# benchmarks/bench_preview.py
+# Time to first paint and peak memory of the screenshot preview for very large captures (8K by
+# default): the old path (full-size GdkPixbuf, then scale_simple) against decode-at-scale
+# (captured_image.scaled_pixbuf), and the cost of the first zoomed view rendered from tiles
+# (preview_tiles.TileCache). Every case runs in a fresh process, so peak RSS is its own.
+#
+#   python3 benchmarks/bench_preview.py
+#   python3 benchmarks/bench_preview.py --size 7680x4320 --screen 2560x1440 --json preview.json
+#   python3 benchmarks/bench_preview.py --image capture.png
+#
+# Without PyGObject only the pixel work is measured (PIL tiles instead of pixbufs, no painting).
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CASES = ("full_pixbuf_then_scale", "decode_at_scale", "zoom_to_100_percent")
+
+
+def make_capture_file(path, width, height):
+    from bench_ocr_preprocess import STYLES, make_sample
+    image, _ = make_sample(STYLES[0], random.Random(1), lines=height // 28, size=(width, height))
+    image.save(path, compress_level=1)
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) # ru_maxrss is in KiB on Linux
+
+
+def run_case(case, path, screen_width, screen_height):
+    """Runs one case in this process and returns its measurements."""
+    try:
+        import gi
+        gi.require_version('Gdk', '3.0')
+        from gi.repository import Gdk, GdkPixbuf
+        import cairo
+    except (ImportError, ValueError):
+        gi = None
+    from captured_image import CapturedImage, pil_to_pixbuf
+    from preview_tiles import TileCache
+
+    max_width, max_height = int(screen_width * 0.85), int(screen_height * 0.85)
+    result = {"case": case, "gtk": gi is not None, "rss_before_mb": peak_rss_mb()}
+
+    def paint(pixbuf_or_image, surface):
+        if gi is not None:
+            cr = cairo.Context(surface)
+            Gdk.cairo_set_source_pixbuf(cr, pixbuf_or_image, 0, 0)
+            cr.paint()
+
+    start = time.perf_counter()
+    captured_image = CapturedImage.from_file(path)
+    result["decode_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, max_width, max_height) if gi is not None else None
+
+    if case == "full_pixbuf_then_scale":
+        if gi is None:
+            return dict(result, skipped="needs PyGObject")
+        from captured_image import fit_size
+        pixbuf = captured_image.to_pixbuf()
+        pixbuf = pixbuf.scale_simple(*fit_size(pixbuf.get_width(), pixbuf.get_height(), max_width, max_height),
+                                     GdkPixbuf.InterpType.BILINEAR)
+        paint(pixbuf, surface)
+    else:
+        if gi is not None:
+            preview = captured_image.scaled_pixbuf(max_width, max_height)
+        else:
+            preview = captured_image.scaled_image(max_width, max_height)
+        paint(preview, surface)
+    result["first_paint_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    if case == "zoom_to_100_percent":
+        tile_cache = TileCache(captured_image.image, convert=pil_to_pixbuf if gi is not None else None)
+        zoom_start = time.perf_counter()
+        # The view around the center of the capture at one screen pixel per capture pixel
+        view_left = max(0, captured_image.width // 2 - max_width // 2)
+        view_top = max(0, captured_image.height // 2 - max_height // 2)
+        for x, y, tile in tile_cache.tiles_in_view(1.0, view_left, view_top, max_width, max_height):
+            if gi is not None:
+                cr = cairo.Context(surface)
+                Gdk.cairo_set_source_pixbuf(cr, tile, x, y)
+                cr.paint()
+        result["zoomed_view_ms"] = round((time.perf_counter() - zoom_start) * 1000, 1)
+        result["tiles_rendered"] = tile_cache.renders
+        result["tile_cache_mb"] = round(tile_cache.bytes / 1024 / 1024, 1)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_benchmark(path, screen_width, screen_height, repeats=3):
+    results = {}
+    for case in CASES:
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", case, "--image", path,
+                                     "--screen", f"{screen_width}x{screen_height}"],
+                                    check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        # Report the run with the median first-paint time
+        runs.sort(key=lambda run: run.get("first_paint_ms", 0))
+        results[case] = runs[len(runs) // 2]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark preview time to first paint and peak RSS.")
+    parser.add_argument("--size", default="7680x4320", help="Size of the generated capture")
+    parser.add_argument("--image", help="Use this image instead of a generated one")
+    parser.add_argument("--screen", default="1920x1080", help="Size of the monitor the preview is shown on")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--child", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+    screen_width, screen_height = (int(v) for v in args.screen.split("x"))
+
+    if args.child:
+        print(json.dumps(run_case(args.child, args.image, screen_width, screen_height)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.image
+        if not path:
+            path = os.path.join(tmp_dir, "capture.png")
+            make_capture_file(path, *(int(v) for v in args.size.split("x")))
+        results = run_benchmark(path, screen_width, screen_height, args.repeats)
+
+    print(f"{'case':<24} {'decode ms':>10} {'first paint ms':>15} {'zoom ms':>8} {'peak RSS MB':>12}")
+    for case, r in results.items():
+        if "skipped" in r:
+            print(f"{case:<24} skipped ({r['skipped']})")
+            continue
+        print(f"{case:<24} {r['decode_ms']:>10} {r['first_paint_ms']:>15} {r.get('zoomed_view_ms', '-'):>8} "
+              f"{r['peak_rss_mb']:>12}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,116 @@
+# benchmarks/gemini_standin.py
+# Local HTTP stand-in for the Gemini API, spoken to by gemini_client.HttpBackend.
+# It answers with a deterministic echo of the prompt after a configurable delay, so the client,
+# caches and UI can be exercised and measured offline.
+#
+#   python3 benchmarks/gemini_standin.py --port 8765 --latency 0.4 --chunk-delay 0.05
+#   python3 benchmarks/gemini_standin.py --error-rate 0.3    # answer 30% of requests with HTTP 429
+#   GEMINI_BACKEND=http://127.0.0.1:8765 python3 main_app_launcher.py
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS_PER_CHUNK = 4
+
+
+def make_response_text(model_name, prompt):
+    """Echoes the quoted source text of the app's prompts (or the whole prompt) tagged with the model name."""
+    start, end = prompt.find('"'), prompt.rfind('"')
+    source_text = prompt[start + 1:end] if 0 <= start < end else prompt
+    return f"[{model_name}] {source_text}"
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, like the real API's transport
+    disable_nagle_algorithm = True # Headers and body are separate writes; avoid delayed-ACK stalls on reused connections
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output readable
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = self._read_json()
+        model_name = request.get("model", "standin")
+        prompt = request.get("prompt", "")
+        config = self.server.standin_config
+        with self.server.stats_lock:
+            self.server.request_count += 1
+
+        if self.path == "/count_tokens":
+            self._send_json({"total_tokens": max(1, len(prompt) // 4)})
+            return
+
+        time.sleep(config["latency"])
+        if config["error_rate"] and random.random() < config["error_rate"]:
+            with self.server.stats_lock:
+                self.server.error_count += 1
+            self._send_json({"error": "Resource has been exhausted (simulated)."}, status=429)
+            return
+        text = make_response_text(model_name, prompt)
+        if self.path == "/generate":
+            time.sleep(config["chunk_delay"] * max(0, len(text.split()) // WORDS_PER_CHUNK))
+            self._send_json({"text": text})
+        elif self.path == "/stream":
+            # One JSON object per line; the connection is closed at the end instead of sizing the body.
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            words = text.split(" ")
+            for i in range(0, len(words), WORDS_PER_CHUNK):
+                piece = " ".join(words[i:i + WORDS_PER_CHUNK]) + (" " if i + WORDS_PER_CHUNK < len(words) else "")
+                try:
+                    self.wfile.write((json.dumps({"text": piece}) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return # Client cancelled
+                time.sleep(config["chunk_delay"])
+            self.close_connection = True
+        else:
+            self._send_json({"error": f"unknown path {self.path}"}, status=404)
+
+
+def start_standin_server(port=0, latency=0.0, chunk_delay=0.0, error_rate=0.0):
+    """
+    Starts the stand-in in a background thread. Returns (server, base_url); call server.shutdown() when done.
+    error_rate is the share of generate/stream requests answered with HTTP 429 instead.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinHandler)
+    server.daemon_threads = True
+    server.standin_config = {"latency": latency, "chunk_delay": chunk_delay, "error_rate": error_rate}
+    server.request_count = 0
+    server.error_count = 0
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first byte of every answer")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of requests answered with HTTP 429 (to exercise retries)")
+    args = parser.parse_args()
+
+    server, url = start_standin_server(args.port, args.latency, args.chunk_delay, args.error_rate)
+    print(f"Gemini stand-in listening on {url} (latency {args.latency}s, chunk delay {args.chunk_delay}s). Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
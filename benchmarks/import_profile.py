@@ -0,0 +1,97 @@
+# benchmarks/import_profile.py
+# Start-up import-time profile of the app modules (python -X importtime), grouped per top-level package.
+#
+#   python3 benchmarks/import_profile.py                    # profile display_window (what a launch imports)
+#   python3 benchmarks/import_profile.py --module gemini_utils --json profile.json
+#   python3 benchmarks/import_profile.py --check            # fail if import_budget.json is exceeded
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+
+def profile_import(module_name, python=sys.executable):
+    """
+    Imports module_name in a fresh interpreter with -X importtime.
+    Returns a list of (module, self_us, cumulative_us) in import order.
+    """
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module_name}"],
+                            cwd=APP_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module_name} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue # Header line
+        entries.append((parts[2].strip(), self_us, cumulative_us))
+    return entries
+
+
+def group_by_package(entries):
+    """Sums self time per top-level package, e.g. all google.* modules under 'google'."""
+    packages = {}
+    for module, self_us, _ in entries:
+        top_level = module.split(".")[0]
+        stats = packages.setdefault(top_level, {"self_ms": 0.0, "modules": 0})
+        stats["self_ms"] += self_us / 1000.0
+        stats["modules"] += 1
+    return dict(sorted(packages.items(), key=lambda item: item[1]["self_ms"], reverse=True))
+
+
+def check_budget(module_name, entries, packages):
+    """Returns a list of budget violations for module_name (empty if within budget)."""
+    with open(BUDGET_FILE, "r") as f:
+        budget = json.load(f).get(module_name, {})
+    violations = []
+    imported = {module for module, _, _ in entries}
+    for forbidden in budget.get("forbidden_modules", []):
+        if forbidden in imported:
+            violations.append(f"{forbidden} is imported eagerly by {module_name}")
+    total_ms = sum(stats["self_ms"] for stats in packages.values())
+    max_total_ms = budget.get("max_total_ms")
+    if max_total_ms is not None and total_ms > max_total_ms:
+        violations.append(f"total import time {total_ms:.1f} ms exceeds budget of {max_total_ms} ms")
+    return violations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start-up import-time profile of the app modules.")
+    parser.add_argument("--module", default="display_window", help="Module to import (default: display_window)")
+    parser.add_argument("--top", type=int, default=25, help="Number of packages to list")
+    parser.add_argument("--json", metavar="PATH", help="Also write the per-package profile as JSON")
+    parser.add_argument("--check", action="store_true", help=f"Compare against {os.path.basename(BUDGET_FILE)}")
+    args = parser.parse_args()
+
+    entries = profile_import(args.module)
+    packages = group_by_package(entries)
+    total_ms = sum(stats["self_ms"] for stats in packages.values())
+
+    print(f"Import profile for '{args.module}' ({len(entries)} modules, {total_ms:.1f} ms total)")
+    print(f"{'package':<32} {'self ms':>10} {'share':>7} {'modules':>8}")
+    for name, stats in list(packages.items())[:args.top]:
+        share = 100.0 * stats["self_ms"] / total_ms if total_ms else 0.0
+        print(f"{name:<32} {stats['self_ms']:>10.1f} {share:>6.1f}% {stats['modules']:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"module": args.module, "python": sys.version.split()[0], "total_ms": round(total_ms, 2),
+                       "packages": packages}, f, indent=2)
+        print(f"Profile written to {args.json}")
+
+    if args.check:
+        violations = check_budget(args.module, entries, packages)
+        for violation in violations:
+            print(f"BUDGET EXCEEDED: {violation}")
+        sys.exit(1 if violations else 0)
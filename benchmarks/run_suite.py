@@ -0,0 +1,274 @@
+# benchmarks/run_suite.py
+# Runs the whole benchmark suite headless and writes every result into one JSON file, so runs on
+# different commits can be compared. Each benchmark runs in its own process with a throwaway cache
+# directory; benchmarks whose requirements are missing (Tesseract, PyGObject, Xvfb) are recorded
+# as skipped, or run in their no-OCR variant, instead of failing the suite. Capture is always timed
+# under a private Xvfb server, never on the desktop the suite happens to be started from.
+#
+#   python3 benchmarks/run_suite.py --quick                                # about a minute
+#   python3 benchmarks/run_suite.py --output before.json                   # full run
+#   python3 benchmarks/run_suite.py --only ocr_engine,gemini_client --gemini-latency 0.2
+#   python3 benchmarks/run_suite.py --baseline before.json --output after.json
+#   python3 benchmarks/run_suite.py --compare before.json after.json       # compare two saved runs
+#
+# Comparisons exit with status 1 when a metric got worse by more than --threshold (relative) and
+# by more than its noise floor (absolute), so the suite can gate a CI job. Quick runs measure most
+# things once and swing by tens of percent between identical runs; compare full runs.
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+SUITE_FORMAT_VERSION = 1
+DEFAULT_TIMEOUT_SECONDS = 900
+DEFAULT_THRESHOLD = 0.20
+
+# requires: subset of {"gi", "xvfb", "tesseract"}; the benchmark is skipped without them.
+# arguments(quick, options, environment) returns its command line arguments (without --json).
+Benchmark = namedtuple("Benchmark", "name script requires arguments")
+
+# Metric name suffix -> (direction, noise floor). Changes smaller than the floor are never reported.
+# Numbers whose name matches none of these (counts, sizes, hit counts) are context, not metrics.
+METRIC_RULES = [
+    ("_ms", "lower", 1.0),
+    ("_s", "lower", 0.01),
+    ("_mb", "lower", 2.0),
+    ("_rps", "higher", 1.0),
+    ("speedup", "higher", 0.05),
+    ("accuracy", "higher", 0.005),
+    ("similarity", "higher", 0.005),
+]
+
+
+def _ocr_workers():
+    return sorted({1, os.cpu_count() or 1})
+
+
+SUITE = [
+    Benchmark("capture", "bench_capture.py", {"gi", "xvfb"},
+              lambda quick, options, env: ["--captures", "5" if quick else "20", "--screen", options.screen]),
+    Benchmark("preview", "bench_preview.py", set(),
+              lambda quick, options, env: ["--size", "3840x2160" if quick else "7680x4320",
+                                           "--repeats", "1" if quick else "3"]),
+    Benchmark("ocr_preprocess", "bench_ocr_preprocess.py", set(),
+              lambda quick, options, env: ["--images", "1" if quick else "4"] +
+                                          ([] if env["tesseract"] else ["--no-ocr"])),
+    Benchmark("ocr_engine", "bench_ocr_engine.py", {"tesseract"},
+              lambda quick, options, env: ["--sizes", "1280x720,1920x1080" if quick else "1280x720,1920x1080,3840x2160",
+                                           "--langs", options.ocr_langs, "--repeats", "1" if quick else "3"]),
+    Benchmark("ocr_tiling", "bench_ocr_tiling.py", set(),
+              lambda quick, options, env: ["--sizes", "3840x2160" if quick else "1920x1080,3840x2160,7680x2160",
+                                           "--workers", ",".join(map(str, _ocr_workers()))] +
+                                          ([] if env["tesseract"] else ["--plan-only"])),
+    Benchmark("gemini_client", "bench_gemini_client.py", set(),
+              lambda quick, options, env: ["--requests", "50" if quick else "200",
+                                           "--latency", str(options.gemini_latency)]),
+    Benchmark("library", "bench_library.py", set(),
+              lambda quick, options, env: ["--entries"] + (["1000"] if quick else ["1000", "10000"]) +
+                                          ["--repeats", "20" if quick else "50"]),
+    Benchmark("live_watch", "bench_live_watch.py", set(),
+              lambda quick, options, env: ["--subtitles", "10" if quick else "40"]),
+    Benchmark("import_profile", "import_profile.py", set(),
+              lambda quick, options, env: ["--module", "display_window" if env["gi"] else "ocr_utils"]),
+]
+
+
+def detect_environment():
+    """What the benchmarks may rely on in this environment."""
+    has_tesseract_binding = any(importlib.util.find_spec(name) for name in ("tesserocr", "pytesseract"))
+    return {
+        "gi": importlib.util.find_spec("gi") is not None,
+        "xvfb": shutil.which("Xvfb") is not None,
+        "tesseract": has_tesseract_binding and shutil.which("tesseract") is not None,
+    }
+
+
+def git_revision():
+    """(commit hash, working tree has uncommitted changes), or (None, None) outside a git checkout."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                                check=True, capture_output=True, text=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def run_benchmark(benchmark, quick, options, environment, cache_dir):
+    """Runs one benchmark in a child process and returns its entry for the results file."""
+    missing = sorted(benchmark.requires - {name for name, present in environment.items() if present})
+    if missing:
+        return {"status": "skipped", "reason": f"missing: {', '.join(missing)}"}
+    arguments = benchmark.arguments(quick, options, environment)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, "results.json")
+        command = [sys.executable, os.path.join(BENCHMARK_DIR, benchmark.script)] + arguments + ["--json", json_path]
+        child_env = dict(os.environ, XDG_CACHE_HOME=cache_dir, PYTHONDONTWRITEBYTECODE="1")
+        if "xvfb" in benchmark.requires:
+            # bench_capture starts its own Xvfb when there is no display
+            for name in ("DISPLAY", "WAYLAND_DISPLAY"):
+                child_env.pop(name, None)
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run(command, cwd=REPO_DIR, env=child_env, capture_output=True, text=True,
+                                       timeout=options.timeout)
+        except subprocess.TimeoutExpired:
+            return {"status": "failed", "reason": f"timed out after {options.timeout} s", "arguments": arguments}
+        entry = {"arguments": arguments, "seconds": round(time.perf_counter() - start, 2)}
+        if completed.returncode != 0 or not os.path.exists(json_path):
+            output_tail = (completed.stderr or completed.stdout).strip().splitlines()[-5:]
+            return dict(entry, status="failed", reason=" | ".join(output_tail) or f"exit status {completed.returncode}")
+        with open(json_path, "r") as f:
+            return dict(entry, status="ok", results=json.load(f))
+
+
+def run_suite(quick, options, only=None):
+    environment = detect_environment()
+    commit, dirty = git_revision()
+    document = {
+        "format_version": SUITE_FORMAT_VERSION,
+        "profile": "quick" if quick else "full",
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "environment": environment,
+        "options": {"gemini_latency": options.gemini_latency, "ocr_langs": options.ocr_langs, "screen": options.screen},
+        "benchmarks": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench-cache-") as cache_dir:
+        for benchmark in SUITE:
+            if only and benchmark.name not in only:
+                continue
+            print(f"{benchmark.name:<16} ...", end=" ", flush=True)
+            entry = run_benchmark(benchmark, quick, options, environment, cache_dir)
+            document["benchmarks"][benchmark.name] = entry
+            print(entry["status"] + (f" in {entry['seconds']} s" if "seconds" in entry and entry["status"] == "ok" else "")
+                  + (f" ({entry['reason']})" if "reason" in entry else ""))
+    return document
+
+
+def flatten_metrics(value, prefix=""):
+    """{'a/b/c_ms': number} for every numeric leaf of a results tree whose name matches METRIC_RULES."""
+    metrics = {}
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        # Lists of rows are keyed by their "size" (or "case") field when they have one, so rows can be added
+        items = ((str(item.get("size") or item.get("case") or i) if isinstance(item, dict) else str(i), item)
+                 for i, item in enumerate(value))
+    else:
+        return metrics
+    for key, item in items:
+        path = f"{prefix}/{key}" if prefix else str(key)
+        if isinstance(item, (int, float)) and not isinstance(item, bool):
+            if metric_rule(key):
+                metrics[path] = float(item)
+        else:
+            metrics.update(flatten_metrics(item, path))
+    return metrics
+
+
+def metric_rule(name):
+    for suffix, direction, noise_floor in METRIC_RULES:
+        if str(name).endswith(suffix):
+            return direction, noise_floor
+    return None
+
+
+def compare_documents(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Returns (regressions, improvements): lists of (metric path, old, new, relative change)."""
+    regressions, improvements = [], []
+    for name, entry in current["benchmarks"].items():
+        old_entry = baseline.get("benchmarks", {}).get(name)
+        if entry.get("status") != "ok" or not old_entry or old_entry.get("status") != "ok":
+            continue
+        if old_entry.get("arguments") != entry.get("arguments"):
+            print(f"Note: {name} ran with different arguments in the two runs; comparing anyway.")
+        old_metrics = flatten_metrics(old_entry["results"])
+        for path, new_value in flatten_metrics(entry["results"]).items():
+            old_value = old_metrics.get(path)
+            if old_value is None:
+                continue
+            direction, noise_floor = metric_rule(path.rsplit("/", 1)[-1])
+            if abs(new_value - old_value) <= noise_floor or old_value == 0:
+                continue
+            change = (new_value - old_value) / abs(old_value)
+            if abs(change) <= threshold:
+                continue
+            worse = change > 0 if direction == "lower" else change < 0
+            (regressions if worse else improvements).append((f"{name}/{path}", old_value, new_value, change))
+    return regressions, improvements
+
+
+def print_comparison(baseline, current, threshold):
+    def describe(document):
+        commit = (document.get("commit") or "unknown")[:10]
+        return f"{commit}{' (dirty)' if document.get('dirty') else ''}, {document.get('profile')}, {document.get('created')}"
+    print(f"Baseline: {describe(baseline)}")
+    print(f"Current:  {describe(current)}")
+    if baseline.get("machine") != current.get("machine"):
+        print("Note: the runs come from different machines or Python versions.")
+    regressions, improvements = compare_documents(baseline, current, threshold)
+    for title, rows in (("Regressions", regressions), ("Improvements", improvements)):
+        print(f"\n{title} (more than {threshold:.0%}):" if rows else f"\nNo {title.lower()} (more than {threshold:.0%}).")
+        for path, old_value, new_value, change in sorted(rows, key=lambda row: -abs(row[3])):
+            print(f"  {path:<60} {old_value:>10.2f} -> {new_value:>10.2f} ({change:+.0%})")
+    return regressions
+
+
+def load_document(path):
+    with open(path, "r") as f:
+        document = json.load(f)
+    if document.get("format_version") != SUITE_FORMAT_VERSION:
+        sys.exit(f"{path} was written by a different version of the suite runner.")
+    return document
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite and compare runs.")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer repeats")
+    parser.add_argument("--only", help="Comma-separated benchmarks to run (" + ", ".join(b.name for b in SUITE) + ")")
+    parser.add_argument("--output", "-o", metavar="PATH", help="Results file (default: bench-<commit>.json)")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare the new run against this results file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Only compare two results files")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative change reported as a regression or improvement (default: 0.20)")
+    parser.add_argument("--gemini-latency", type=float, default=0.05, help="Latency of the Gemini stand-in server, in seconds")
+    parser.add_argument("--ocr-langs", default="eng,eng+por", help="Tesseract language sets for ocr_engine")
+    parser.add_argument("--screen", default="1920x1080", help="Xvfb screen size for capture")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT_SECONDS, help="Seconds per benchmark")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = print_comparison(load_document(args.compare[0]), load_document(args.compare[1]), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    only = set(args.only.split(",")) if args.only else None
+    unknown = (only or set()) - {benchmark.name for benchmark in SUITE}
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+    document = run_suite(args.quick, args, only)
+    output_path = args.output or f"bench-{(document['commit'] or 'nogit')[:10]}{'-dirty' if document['dirty'] else ''}.json"
+    with open(output_path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {output_path}")
+
+    if args.baseline:
+        print()
+        regressions = print_comparison(load_document(args.baseline), document, args.threshold)
+        sys.exit(1 if regressions else 0)
+    if any(entry["status"] == "failed" for entry in document["benchmarks"].values()):
+        sys.exit(1)
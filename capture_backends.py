@@ -0,0 +1,297 @@
+# capture_backends.py
+# The ways this app can take a screenshot, probed once per process.
+#
+#   gdk               In-process grab of the X11 root window (no fork/exec). Full screen only.
+#   scrot             X11 subprocess tool; also does area selection.
+#   gnome-screenshot  GNOME tool for X11 and Wayland.
+#   grim              wlroots Wayland tool, with slurp for area selection; writes to stdout.
+#
+# gdk, scrot and grim can also capture a given rectangle without any user interaction, which is
+# what the live region watch (watch_overlay.py) does several times per second.
+#
+# UBUNTU_AI_CAPTURE_BACKEND=<name> puts one backend first (if it is available in this session).
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from shutil import which
+
+from captured_image import CapturedImage
+from tracing import span
+
+
+def get_session_type():
+    return os.environ.get('XDG_SESSION_TYPE', 'x11').lower()
+
+
+def get_capture_buffer_dir():
+    """
+    Where tools that can only write to a file put the screenshot. XDG_RUNTIME_DIR and /dev/shm are
+    tmpfs, so the buffer file never reaches the disk; it is read back and removed right away.
+    """
+    for candidate in (os.environ.get('XDG_RUNTIME_DIR'), '/dev/shm'):
+        if candidate and os.path.isdir(candidate) and os.access(candidate, os.W_OK):
+            return candidate
+    return tempfile.gettempdir()
+
+
+def build_clean_env():
+    # --- Create a Sanitized Environment for Popen ---
+    clean_env = {}
+    # Essential for finding system commands and for GUI apps to connect to display server
+    essential_vars = ['PATH', 'HOME', 'DISPLAY', 'XAUTHORITY', 'XDG_RUNTIME_DIR', 'WAYLAND_DISPLAY', 'DBUS_SESSION_BUS_ADDRESS']
+
+    # Ensure a minimal, standard PATH. Crucially, do NOT include Snap paths if they were in os.environ['PATH']
+    # You might want to be even more restrictive, e.g., PATH="/usr/bin:/bin"
+    system_paths = [p for p in os.environ.get('PATH', '').split(os.pathsep) if not p.startswith('/snap/')]
+    clean_env['PATH'] = os.pathsep.join(system_paths) if system_paths else "/usr/local/bin:/usr/bin:/bin"
+    if '/usr/bin' not in clean_env['PATH'].split(os.pathsep): # Ensure /usr/bin is present
+         clean_env['PATH'] = f"/usr/bin:{clean_env['PATH']}"
+
+    # Only the variables above are copied, so Snap variables (SNAP_*, LD_PRELOAD) never reach the tools
+    for var_name in essential_vars:
+        if var_name == 'PATH': continue # Already handled
+        if var_name in os.environ:
+            clean_env[var_name] = os.environ[var_name]
+
+    return clean_env
+
+
+def run_capture_command(capture_id, tool_used, command, clean_env, verbose=True):
+    """
+    Runs a screenshot tool. Returns its stdout (bytes) if it exited with code 0, otherwise None.
+    verbose=False leaves out the per-call log line (for the frames of a region watch).
+    """
+    if verbose:
+        print(f"[{capture_id}] Using tool: {tool_used}. Executing Popen with command: {' '.join(command)}")
+    # print(f"[{capture_id}] Full sanitized env: {clean_env}") # For deep debugging
+
+    try:
+        with span("capture_tool", capture_id, tool=tool_used):
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=clean_env) # Pass the sanitized env
+            stdout, stderr = process.communicate(timeout=60)
+        return_code = process.returncode
+    except subprocess.TimeoutExpired:
+        process.kill()
+        stdout_t, stderr_t = process.communicate()
+        print(f"[{capture_id}] Error: Screenshot command ({tool_used}) timed out.")
+        if stderr_t: print(f"[{capture_id}] STDERR on timeout: {stderr_t.decode(errors='ignore')}")
+        return None
+
+    stderr_str = stderr.decode(errors='ignore').strip()
+    if return_code != 0:
+        print(f"[{capture_id}] Error: Screenshot command ({tool_used}) failed with return code {return_code}.")
+        if stderr_str: print(f"[{capture_id}] STDERR from {tool_used} (RC={return_code}): {stderr_str}")
+        return None
+    if stderr_str: print(f"[{capture_id}] STDERR from {tool_used} (RC=0): {stderr_str}")
+    return stdout
+
+
+class GdkRootWindowBackend:
+    """Copies the X11 root window into memory through Gdk. Must run on the GTK main thread."""
+    name = "gdk"
+    session_types = ("x11",)
+    supports_area = False
+    supports_region = True
+    main_thread_only = True
+    # Lets the compositor repaint after the capture mode dialog closes, so it is not in the shot.
+    settle_seconds = 0.1
+
+    def is_available(self):
+        if not os.environ.get('DISPLAY'):
+            return False
+        try:
+            import gi
+            gi.require_version('Gdk', '3.0')
+            from gi.repository import Gdk
+        except (ImportError, ValueError):
+            return False
+        display = Gdk.Display.get_default()
+        return display is not None and type(display).__name__ == "X11Display"
+
+    def capture(self, full_screen, capture_id, clean_env):
+        from gi.repository import Gdk, Gtk
+        while Gtk.events_pending():
+            Gtk.main_iteration_do(False)
+        Gdk.Display.get_default().sync()
+        if self.settle_seconds:
+            time.sleep(self.settle_seconds)
+
+        root_window = Gdk.get_default_root_window()
+        width, height = root_window.get_width(), root_window.get_height()
+        with span("capture_grab", capture_id, width=width, height=height):
+            pixbuf = Gdk.pixbuf_get_from_window(root_window, 0, 0, width, height)
+        if pixbuf is None:
+            print(f"[{capture_id}] Error: Could not read the root window through Gdk.")
+            return None
+        return CapturedImage.from_pixbuf(pixbuf, source=self.name)
+
+    def capture_region(self, box, capture_id, clean_env):
+        from gi.repository import Gdk
+        root_window = Gdk.get_default_root_window()
+        scale = root_window.get_scale_factor() # box is in capture pixels, Gdk wants logical ones
+        left, top, right, bottom = (value // scale for value in box)
+        pixbuf = Gdk.pixbuf_get_from_window(root_window, left, top, right - left, bottom - top)
+        if pixbuf is None:
+            print(f"[{capture_id}] Error: Could not read {box} of the root window through Gdk.")
+            return None
+        return CapturedImage.from_pixbuf(pixbuf, source=self.name)
+
+
+class _SubprocessBackend:
+    """
+    A screenshot tool that writes a PNG into a tmpfs buffer file. Subclasses define
+    build_command(full_screen, buffer_path), and build_region_command(box, buffer_path) if the tool
+    can capture a given rectangle.
+    """
+    tool = None
+    session_types = ()
+    supports_area = True
+    main_thread_only = False
+
+    @property
+    def name(self):
+        return self.tool
+
+    @property
+    def supports_region(self):
+        return hasattr(self, "build_region_command")
+
+    def is_available(self):
+        return which(self.tool) is not None
+
+    def capture(self, full_screen, capture_id, clean_env):
+        buffer_path = os.path.join(get_capture_buffer_dir(), f"ubuntu-ai-capture-{capture_id}.png")
+        return self._capture_to_buffer(self.build_command(full_screen, buffer_path), buffer_path, capture_id, clean_env)
+
+    def capture_region(self, box, capture_id, clean_env):
+        if not self.supports_region:
+            raise NotImplementedError(f"{self.tool} cannot capture a given region")
+        buffer_path = os.path.join(get_capture_buffer_dir(), f"ubuntu-ai-capture-{capture_id}.png")
+        return self._capture_to_buffer(self.build_region_command(box, buffer_path), buffer_path, capture_id, clean_env,
+                                       verbose=False)
+
+    def _capture_to_buffer(self, command, buffer_path, capture_id, clean_env, verbose=True):
+        try:
+            if run_capture_command(capture_id, self.tool, command, clean_env, verbose) is None:
+                return None
+            if not os.path.exists(buffer_path) or os.path.getsize(buffer_path) == 0:
+                print(f"[{capture_id}] Error: {self.tool} exited with code 0 but produced no image data.")
+                return None
+            with open(buffer_path, "rb") as buffer_file:
+                return CapturedImage.from_bytes(buffer_file.read(), source=self.tool)
+        finally:
+            if os.path.exists(buffer_path):
+                os.remove(buffer_path)
+
+
+class ScrotBackend(_SubprocessBackend):
+    tool = "scrot"
+    session_types = ("x11",)
+
+    def build_command(self, full_screen, buffer_path):
+        # -q 100 asks for the least PNG compression: the buffer is decoded once and then discarded.
+        if full_screen:
+            return ["scrot", "-z", "-q", "100", buffer_path]
+        time.sleep(0.3)
+        return ["scrot", "-s", "-z", "-f", "-q", "100", buffer_path]
+
+    def build_region_command(self, box, buffer_path):
+        left, top, right, bottom = box
+        return ["scrot", "-a", f"{left},{top},{right - left},{bottom - top}", "-z", "-q", "100", buffer_path]
+
+
+class GnomeScreenshotBackend(_SubprocessBackend):
+    tool = "gnome-screenshot"
+    session_types = ("x11", "wayland")
+
+    def build_command(self, full_screen, buffer_path):
+        if full_screen:
+            return ["gnome-screenshot", "-f", buffer_path]
+        return ["gnome-screenshot", "-a", "-f", buffer_path]
+
+
+class GrimBackend:
+    """grim writes an uncompressed PPM to stdout; slurp provides the area for area captures."""
+    name = "grim"
+    session_types = ("wayland",)
+    supports_area = True
+    supports_region = True
+    main_thread_only = False
+
+    def is_available(self):
+        return which("grim") is not None
+
+    def capture(self, full_screen, capture_id, clean_env):
+        command = ["grim", "-t", "ppm", "-"]
+        if not full_screen:
+            if which("slurp") is None:
+                print(f"[{capture_id}] Error: slurp is needed for area selection with grim.")
+                return None
+            geometry = run_capture_command(capture_id, "slurp", ["slurp"], clean_env)
+            if not geometry:
+                print(f"[{capture_id}] Area selection cancelled or failed.")
+                return None
+            command = ["grim", "-g", geometry.decode().strip(), "-t", "ppm", "-"]
+        image_data = run_capture_command(capture_id, self.name, command, clean_env)
+        if not image_data:
+            return None
+        return CapturedImage.from_bytes(image_data, source=self.name)
+
+    def capture_region(self, box, capture_id, clean_env):
+        left, top, right, bottom = box
+        command = ["grim", "-g", f"{left},{top} {right - left}x{bottom - top}", "-t", "ppm", "-"]
+        image_data = run_capture_command(capture_id, self.name, command, clean_env, verbose=False)
+        if not image_data:
+            return None
+        return CapturedImage.from_bytes(image_data, source=self.name)
+
+
+# In order of preference; the in-process grab comes first where it works.
+ALL_BACKENDS = (GdkRootWindowBackend, ScrotBackend, GnomeScreenshotBackend, GrimBackend)
+
+
+class CaptureBackendRegistry:
+    """The backends usable in this session, found once; capture_screen asks it which one to use."""
+    def __init__(self, session_type=None, preferred=None, backend_classes=ALL_BACKENDS):
+        self.session_type = session_type or get_session_type()
+        self.clean_env = build_clean_env() # Same for every capture, so built once
+        start = time.perf_counter()
+        self.backends = [backend_class() for backend_class in backend_classes]
+        self.backends = [backend for backend in self.backends
+                         if self.session_type in backend.session_types and backend.is_available()]
+        if preferred:
+            self.backends.sort(key=lambda backend: backend.name != preferred)
+        print(f"[capture] Backends for a {self.session_type} session: {', '.join(self.names()) or 'none'} "
+              f"(probed in {(time.perf_counter() - start) * 1000:.1f} ms).")
+
+    def names(self):
+        return [backend.name for backend in self.backends]
+
+    def get(self, name):
+        for backend in self.backends:
+            if backend.name == name:
+                return backend
+        return None
+
+    def candidates(self, full_screen):
+        """Backends that can take this kind of capture, best first."""
+        return [backend for backend in self.backends if full_screen or backend.supports_area]
+
+    def region_backend(self):
+        """The best backend that captures a given screen rectangle without user interaction, or None."""
+        return next((backend for backend in self.backends if backend.supports_region), None)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_capture_registry():
+    """The process-wide registry, probed on first use (the daemon does this at start-up)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CaptureBackendRegistry(preferred=os.environ.get('UBUNTU_AI_CAPTURE_BACKEND'))
+        return _registry
@@ -14,7 +14,7 @@ class CaptureModeSelectionDialog(Gtk.Dialog):
         self.set_decorated(False) # Borderless
         self.set_position(Gtk.WindowPosition.CENTER_ALWAYS)
 
-        self.selected_mode = None # To store 'area' or 'full'
+        self.selected_mode = None # To store 'area', 'full' or 'library'
 
         content_area = self.get_content_area() # This is a Gtk.Box
         content_area.set_orientation(Gtk.Orientation.VERTICAL)
@@ -61,10 +61,14 @@ class CaptureModeSelectionDialog(Gtk.Dialog):
         # Icons: "image-x-generic", "computer", "video-display"
         btn_full_screen = create_mode_button("video-display", "Full Screen", "full", "2")
 
+        # Not a capture: search the text of the screenshots saved so far
+        btn_library = create_mode_button("system-search", "Search Library", "library", "3")
+
         button_box.pack_start(btn_select_area, True, True, 0)
         button_box.pack_start(btn_full_screen, True, True, 0)
+        button_box.pack_start(btn_library, True, True, 0)
 
-        # Connect key press event for 1 and 2
+        # Connect key press event for 1, 2 and 3
         self.connect("key-press-event", self.on_key_press)
 
         self.show_all()
@@ -84,6 +88,10 @@ class CaptureModeSelectionDialog(Gtk.Dialog):
             print("Key '2' pressed for Full Screen.")
             self.selected_mode = "full"
             self.response(Gtk.ResponseType.OK)
+        elif keyval == Gdk.KEY_3:
+            print("Key '3' pressed for Search Library.")
+            self.selected_mode = "library"
+            self.response(Gtk.ResponseType.OK)
         elif keyval == Gdk.KEY_Escape:
             print("Escape pressed on mode selection. Closing.")
             self.response(Gtk.ResponseType.CANCEL)
@@ -0,0 +1,118 @@
+# captured_image.py
+# A screenshot held in memory, decoded exactly once.
+#
+# The capture tools hand over raw bytes (PPM on stdout, or a lightly compressed PNG in a tmpfs
+# buffer), which are decoded with PIL here. The preview, OCR and "Save" all work from the same
+# decoded pixels; PNG compression only happens when the user actually saves. The preview never
+# copies the full-size pixels into a GdkPixbuf: it is resampled straight to display size.
+import io
+import os
+
+from PIL import Image
+
+from ocr_cache import image_digest
+from tracing import span
+
+
+def pil_to_pixbuf(image):
+    """Wraps the pixels of an RGB(A) PIL image in a GdkPixbuf without going through an encoded file."""
+    from gi.repository import GdkPixbuf, GLib
+    has_alpha = image.mode == "RGBA"
+    channels = 4 if has_alpha else 3
+    return GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(image.tobytes()), GdkPixbuf.Colorspace.RGB,
+                                           has_alpha, 8, image.width, image.height, image.width * channels)
+
+
+def fit_size(width, height, max_width, max_height):
+    """The largest size with the aspect ratio of width x height that fits in max_width x max_height (never larger)."""
+    scale = min(1.0, max_width / width, max_height / height)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+class CapturedImage:
+    def __init__(self, image, source="unknown"):
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+        self.image = image
+        self.source = source # Tool or file the pixels came from, for log messages
+        self.capture_id = None # Trace id of the interaction that captured it (set by capture_screen)
+        self.screen_origin = None # (x, y) of the top-left pixel on the screen, when known (full-screen captures)
+        self._digest = None
+
+    @classmethod
+    def from_bytes(cls, data, source="unknown"):
+        """Decodes an encoded image (PPM, PNG, ...) held in memory."""
+        with span("decode", source=source, bytes=len(data)):
+            image = Image.open(io.BytesIO(data))
+            image.load()
+            return cls(image, source=source)
+
+    @classmethod
+    def from_pixbuf(cls, pixbuf, source="unknown"):
+        """Copies the pixels of an 8-bit RGB(A) GdkPixbuf, e.g. one grabbed from a window."""
+        mode = "RGBA" if pixbuf.get_has_alpha() else "RGB"
+        width, height, rowstride = pixbuf.get_width(), pixbuf.get_height(), pixbuf.get_rowstride()
+        with span("decode", source=source, bytes=rowstride * height):
+            data = pixbuf.read_pixel_bytes().get_data()
+            data += b"\0" * (rowstride * height - len(data)) # GdkPixbuf does not pad the last row
+            return cls(Image.frombytes(mode, (width, height), data, "raw", mode, rowstride), source=source)
+
+    @classmethod
+    def from_file(cls, path):
+        with Image.open(path) as image:
+            image.load()
+            return cls(image, source=path)
+
+    @property
+    def width(self):
+        return self.image.width
+
+    @property
+    def height(self):
+        return self.image.height
+
+    def digest(self):
+        """Content hash of the pixels (see ocr_cache.image_digest), computed once."""
+        if self._digest is None:
+            self._digest = image_digest(self.image)
+        return self._digest
+
+    def crop(self, box):
+        """A CapturedImage of the (left, top, right, bottom) region of this one."""
+        left, top, right, bottom = box
+        region = CapturedImage(self.image.crop(box), source=f"{self.source} [{right - left}x{bottom - top}+{left}+{top}]")
+        region.capture_id = self.capture_id
+        if self.screen_origin is not None:
+            region.screen_origin = (self.screen_origin[0] + left, self.screen_origin[1] + top)
+        return region
+
+    def to_pixbuf(self):
+        """The full-size pixels as a GdkPixbuf (a copy of the whole image; see scaled_pixbuf for previews)."""
+        return pil_to_pixbuf(self.image)
+
+    def scaled_image(self, max_width, max_height):
+        """
+        The capture shrunk to fit in max_width x max_height (never enlarged). It is resampled directly
+        from the decoded pixels, reducing by whole factors first, so only the small result is allocated.
+        """
+        size = fit_size(self.width, self.height, max_width, max_height)
+        if size == self.image.size:
+            return self.image
+        return self.image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+    def scaled_pixbuf(self, max_width, max_height):
+        return pil_to_pixbuf(self.scaled_image(max_width, max_height))
+
+    def save(self, path, image_format=None, **options):
+        """
+        Encodes the image to path. The format follows the file extension unless image_format is given;
+        options go to the PIL encoder (e.g. optimize=True, quality=90, lossless=True).
+        """
+        image_format = image_format or os.path.splitext(path)[1].lstrip(".").upper() or "PNG"
+        if image_format == "JPG":
+            image_format = "JPEG"
+        image = self.image
+        if image_format == "JPEG" and image.mode == "RGBA":
+            image = image.convert("RGB") # JPEG has no alpha channel
+        image.save(path, format=image_format, **options)
+        return path
@@ -0,0 +1,83 @@
+# clipboard.py
+# The system clipboard, owned by this process through GTK: no xclip/xsel process per copy.
+#
+# A copy can hold text, an image, or both. It is offered to other applications in every text and
+# image format GTK can produce, and the image is only converted and encoded when an application
+# actually pastes it. The owner is an invisible widget that lives as long as the process, so in daemon
+# mode the clipboard keeps its contents after the preview window closes. A process that is about to
+# exit hands its contents to the clipboard manager instead (store_on_exit).
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gdk, Gtk
+
+TARGET_TEXT = 1
+TARGET_IMAGE = 2
+
+
+class ClipboardOwner:
+    """Serves the CLIPBOARD selection from memory. Use it from the GTK main thread only."""
+    def __init__(self):
+        self._widget = Gtk.Invisible() # Realized by the first selection_owner_set
+        self._widget.connect("selection-get", self.on_selection_get)
+        self._widget.connect("selection-clear-event", self.on_selection_clear)
+        self.text = None
+        self.image = None # CapturedImage; its pixels become a GdkPixbuf on the first paste
+        self._pixbuf = None
+
+    def copy(self, text=None, image=None):
+        """Puts text and/or image (a CapturedImage) on the clipboard. Returns False if it could not be taken over."""
+        targets = Gtk.TargetList.new([])
+        if text is not None:
+            targets.add_text_targets(TARGET_TEXT)
+        if image is not None:
+            targets.add_image_targets(TARGET_IMAGE, True)
+        Gtk.selection_clear_targets(self._widget, Gdk.SELECTION_CLIPBOARD)
+        Gtk.selection_add_targets(self._widget, Gdk.SELECTION_CLIPBOARD, Gtk.target_table_new_from_list(targets))
+        if not Gtk.selection_owner_set(self._widget, Gdk.SELECTION_CLIPBOARD, Gtk.get_current_event_time()):
+            print("Clipboard: could not become the owner of the clipboard.")
+            return False
+        self.text, self.image, self._pixbuf = text, image, None
+        return True
+
+    def get_pixbuf(self):
+        if self._pixbuf is None and self.image is not None:
+            self._pixbuf = self.image.to_pixbuf()
+        return self._pixbuf
+
+    def on_selection_get(self, widget, selection_data, info, time):
+        if info == TARGET_TEXT and self.text is not None:
+            selection_data.set_text(self.text, -1)
+        elif info == TARGET_IMAGE and self.image is not None:
+            selection_data.set_pixbuf(self.get_pixbuf()) # Encoded here, in the format the pasting application asked for
+
+    def on_selection_clear(self, widget, event):
+        # Another application (or another copy in this one) owns the clipboard now; free the pixels
+        self.text = self.image = self._pixbuf = None
+        return False # Let GTK update its own selection bookkeeping
+
+    def store_on_exit(self):
+        """
+        Hands the contents to the clipboard manager, so they can still be pasted after this process exits.
+        Only contents set through Gtk.Clipboard can be stored, which from Python means one kind of data:
+        the text if there is any, otherwise the image.
+        """
+        if self.text is None and self.image is None:
+            return
+        clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
+        if self.text is not None:
+            clipboard.set_text(self.text, -1)
+        else:
+            clipboard.set_image(self.get_pixbuf())
+        clipboard.set_can_store(None)
+        clipboard.store() # Waits (briefly) for the clipboard manager to take a copy
+
+
+_owner = None
+
+
+def get_clipboard():
+    """The process-wide ClipboardOwner (created on first use, on the GTK main thread)."""
+    global _owner
+    if _owner is None:
+        _owner = ClipboardOwner()
+    return _owner
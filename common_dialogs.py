@@ -63,6 +63,50 @@ class LanguageSelectionDialog(Gtk.Dialog):
             return SUPPORTED_LANGUAGES.get(active_text) # Look up the code
         return None
 
+class MultiLanguageSelectionDialog(Gtk.Dialog):
+    def __init__(self, parent_window, default_language_display_names):
+        super().__init__(title="Select Target Languages", transient_for=parent_window, flags=0)
+        self.add_buttons(
+            Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL, Gtk.STOCK_OK, Gtk.ResponseType.OK
+        )
+
+        self.set_default_size(300, 100)
+        self.set_modal(True) # Make it modal to the parent
+
+        box = self.get_content_area() # This is a Gtk.Box
+        box.set_spacing(6)
+        box.set_border_width(10) # Add some padding around the content area
+
+        label = Gtk.Label(label="Translate to (select one or more):")
+        label.props.xalign = 0 # Left align the label
+        box.pack_start(label, False, False, 0)
+
+        # Two columns of check buttons, one per entry of SUPPORTED_LANGUAGES
+        grid = Gtk.Grid(column_spacing=12, row_spacing=2)
+        box.pack_start(grid, True, True, 0)
+        self.language_checks = {}
+        for idx, display_name in enumerate(SUPPORTED_LANGUAGES.keys()):
+            check = Gtk.CheckButton(label=display_name)
+            check.set_active(display_name in default_language_display_names)
+            check.connect("toggled", self.on_selection_changed)
+            grid.attach(check, idx % 2, idx // 2, 1, 1)
+            self.language_checks[display_name] = check
+
+        self.on_selection_changed(None)
+        self.show_all()
+
+    def on_selection_changed(self, widget):
+        # OK only makes sense with at least one language ticked
+        self.set_response_sensitive(Gtk.ResponseType.OK, bool(self.get_selected_languages()))
+
+    def get_selected_languages(self):
+        """
+        Returns a list of (display name, language code) pairs for the ticked languages,
+        in the order of SUPPORTED_LANGUAGES.
+        """
+        return [(display_name, SUPPORTED_LANGUAGES[display_name])
+                for display_name, check in self.language_checks.items() if check.get_active()]
+
 if __name__ == '__main__':
     # Simple test for LanguageSelectionDialog
     # This allows you to run `python common_dialogs.py` to test this dialog independently.
@@ -1,29 +1,92 @@
 # display_window.py
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk, GdkPixbuf, Pango, GLib
+from gi.repository import Gtk, Gdk, Pango, GLib
 import os
-import shutil
-import datetime
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Import your utility functions
-from ocr_utils import extract_text_from_image
-from gemini_utils import translate_text_with_gemini
-import pyperclip
+from ocr_utils import extract_words_from_image, extract_words_from_region
+from ocr_result import OCRResult
+from captured_image import CapturedImage, pil_to_pixbuf
+from gemini_utils import translate_text_with_gemini, stream_translate_text_with_gemini, submit_translations, get_client, GeminiError
+from clipboard import get_clipboard
 
 # Import the shared LanguageSelectionDialog and constants
-from common_dialogs import LanguageSelectionDialog, SUPPORTED_LANGUAGES, DEFAULT_TARGET_LANGUAGE_DISPLAY
+from common_dialogs import LanguageSelectionDialog, MultiLanguageSelectionDialog, SUPPORTED_LANGUAGES, DEFAULT_TARGET_LANGUAGE_DISPLAY
+from result_window import StreamingResultWindow, MultiTranslationResultWindow
+from preview_canvas import PreviewCanvas, ZOOM_STEP
+from preview_tiles import TileCache
+from save_queue import get_save_queue, available_save_formats, SAVE_FORMATS, DEFAULT_SAVE_FORMAT
+from tracing import new_trace_id, record_span, span, traced
+
+# OCR starts as soon as the preview is shown; when it finishes, the text is also translated in the
+# background into the last used language, so the common "Translate" click only has to show a result.
+SPECULATIVE_PRETRANSLATE = True
+PREVIEW_SCREEN_FRACTION = 0.85 # Largest share of the monitor's work area the preview may cover
+STATUS_SECONDS = 4 # How long a status message (e.g. "Saved as ...") stays under the preview
+
+# OCR and Gemini calls run here, never on the GTK main thread.
+_background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="preview-bg")
+
+
+def run_on_main_thread(func, *args):
+    """Schedules func(*args) once on the GTK main thread (safe to call from worker threads)."""
+    def run():
+        func(*args)
+        return False # One-shot idle callback
+    GLib.idle_add(run)
+
+
+def run_when_done(future, callback, *args):
+    """Calls callback(future, *args) on the GTK main thread once future has completed."""
+    future.add_done_callback(lambda finished_future: run_on_main_thread(callback, finished_future, *args))
+
+
+def is_ocr_error(extracted_text):
+    return isinstance(extracted_text, str) and extracted_text.startswith("Error:")
+
+
+def is_translation_error(translated_text):
+    known_errors = ["Gemini API not configured", "Error during translation", "Tesseract not found", "No text provided"]
+    return any(err_msg.lower() in translated_text.lower() for err_msg in known_errors) and "error:" in translated_text.lower()
+
+
+class OCRTarget:
+    """The OCR of the whole capture (region None) or of one region of it, and the translations of its text."""
+    def __init__(self, region=None):
+        self.region = region # (left, top, right, bottom) in capture pixels
+        self.future = None # Future of an OCRResult, or of an error message / None
+        self.translations = {} # language code -> Future of translate_text_with_gemini
 
 
 class ScreenshotDisplayWindow(Gtk.Window):
-    def __init__(self, image_path):
+    def __init__(self, image, quit_on_close=True):
+        """image is the CapturedImage to show, or the path of an image file."""
         super().__init__(title="Screenshot Preview")
 
-        self.image_path = image_path
+        # The decoded capture is shared by the preview, OCR and Save; nothing is re-read from disk.
+        self.captured_image = image if isinstance(image, CapturedImage) else None
+        self.image_path = None if self.captured_image else image
+        # Interaction trace (see tracing.py): the capture's, or a new one for an image opened from a file
+        self.trace_id = getattr(image, "capture_id", None) or new_trace_id()
         self.temp_file_to_delete = None
+        # In daemon mode the process outlives the window, so closing it must not stop Gtk.main()
+        self.quit_on_close = quit_on_close
         self.default_save_dir = os.path.expanduser("~/Pictures/Screenshots")
+        self.save_format = DEFAULT_SAVE_FORMAT # Right-click on Save to change it
+        self.status_timeout_id = None
         # Use the imported constant for the initial last selected language
         self.last_selected_language_display = DEFAULT_TARGET_LANGUAGE_DISPLAY
+        self.last_selected_multi_languages = [DEFAULT_TARGET_LANGUAGE_DISPLAY]
+        # Background work, shared by every action on this capture
+        # Actions work on the region of interest dragged on the preview, or on the whole capture
+        self.ocr_targets = {None: OCRTarget()} # region -> OCRTarget
+        self.ocr_target = self.ocr_targets[None]
+        self.active_streams = set() # GeminiStreams still running, cancelled when the window closes
+        self.busy_counts = {} # button -> number of pending tasks shown on it
+        self.is_closed = False
 
         self.set_decorated(False)
         self.set_keep_above(True)
@@ -31,40 +94,45 @@ class ScreenshotDisplayWindow(Gtk.Window):
 
         self.outer_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
         self.add(self.outer_box)
+        image_column = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        self.outer_box.pack_start(image_column, True, True, 0)
 
         # --- Image Area ---
         self.pixbuf = None
+        self.preview = None # PreviewCanvas: the scaled capture with the selectable OCR words on top
         try:
-            self.pixbuf = GdkPixbuf.Pixbuf.new_from_file(self.image_path)
-            screen = self.get_screen()
-            if screen:
-                monitor = screen.get_primary_monitor()
-                monitor_geometry = screen.get_monitor_geometry(monitor)
-                max_img_width = int(monitor_geometry.width * 0.85) 
-                max_img_height = int(monitor_geometry.height * 0.85)
-                img_width = self.pixbuf.get_width()
-                img_height = self.pixbuf.get_height()
-                scaled = False
-                if img_width > max_img_width:
-                    aspect_ratio = float(img_height) / img_width
-                    img_width = max_img_width
-                    img_height = int(img_width * aspect_ratio)
-                    scaled = True
-                if img_height > max_img_height:
-                    aspect_ratio = float(img_width) / img_height
-                    img_height = max_img_height
-                    img_width = int(img_height * aspect_ratio)
-                    scaled = True
-                if scaled:
-                    self.pixbuf = self.pixbuf.scale_simple(img_width, img_height, GdkPixbuf.InterpType.BILINEAR)
-            image_widget = Gtk.Image.new_from_pixbuf(self.pixbuf)
-            self.outer_box.pack_start(image_widget, True, True, 0)
-        except GLib.Error as e:
-            print(f"Error loading image '{self.image_path}': {e}")
+            if self.captured_image is None:
+                self.captured_image = CapturedImage.from_file(self.image_path)
+                self.captured_image.capture_id = self.trace_id
+            # Decode-at-scale: the preview is resampled straight from the capture to the size it is shown at,
+            # on the monitor the window opens on; zoomed views are rendered tile by tile on demand.
+            max_img_width, max_img_height = self.captured_image.width, self.captured_image.height
+            workarea = self.get_target_monitor_workarea()
+            if workarea is not None:
+                max_img_width = int(workarea.width * PREVIEW_SCREEN_FRACTION)
+                max_img_height = int(workarea.height * PREVIEW_SCREEN_FRACTION)
+            with span("preview", self.trace_id, max_width=max_img_width, max_height=max_img_height):
+                self.pixbuf = self.captured_image.scaled_pixbuf(max_img_width, max_img_height)
+                tile_cache = TileCache(self.captured_image.image, convert=pil_to_pixbuf)
+                self.preview = PreviewCanvas(self.pixbuf, self.captured_image.width, self.captured_image.height, tile_cache)
+            self.preview.on_selection_changed = self.on_text_selection_changed
+            self.preview.on_region_changed = self.on_region_changed
+            image_column.pack_start(self.preview, True, True, 0)
+        except (GLib.Error, OSError) as e: # PIL reports unreadable files as OSError
+            print(f"Error loading image '{self.image_path or self.captured_image.source}': {e}")
             error_label = Gtk.Label(label=f"Error: Could not load image.\n{e}")
-            self.outer_box.pack_start(error_label, True, True, 0)
+            image_column.pack_start(error_label, True, True, 0)
             self.set_default_size(350, 150)
 
+        # Non-modal status line under the image (e.g. for finished saves)
+        self.status_label = Gtk.Label(xalign=0)
+        self.status_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        self.status_label.set_margin_start(6); self.status_label.set_margin_end(6)
+        self.status_label.set_margin_top(4); self.status_label.set_margin_bottom(4)
+        self.status_revealer = Gtk.Revealer(transition_type=Gtk.RevealerTransitionType.SLIDE_UP)
+        self.status_revealer.add(self.status_label)
+        image_column.pack_end(self.status_revealer, False, False, 0)
+
         # --- Buttons Area ---
         button_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
         button_box.set_margin_start(6); button_box.set_margin_end(6)
@@ -89,11 +157,22 @@ class ScreenshotDisplayWindow(Gtk.Window):
             return button
 
         self.btn_save = create_icon_button("document-save", "Save Image", self.on_save_clicked)
+        self.btn_save.connect("button-press-event", self.on_save_button_press)
+        self.update_save_tooltip()
         button_box.pack_start(self.btn_save, False, False, 0)
         self.btn_translate = create_icon_button("accessories-dictionary", "Translate Text from Image", self.on_translate_clicked)
         button_box.pack_start(self.btn_translate, False, False, 0)
+        self.btn_translate_multi = create_icon_button("preferences-desktop-locale", "Translate Text into Several Languages", self.on_translate_multi_clicked)
+        button_box.pack_start(self.btn_translate_multi, False, False, 0)
         self.btn_copy_text = create_icon_button("edit-copy", "Copy Text from Image", self.on_copy_text_clicked)
         button_box.pack_start(self.btn_copy_text, False, False, 0)
+        self.btn_copy_image = create_icon_button("image-x-generic", "Copy Image (Ctrl+Shift+C)", self.on_copy_image_clicked)
+        button_box.pack_start(self.btn_copy_image, False, False, 0)
+        self.btn_watch = create_icon_button("media-record", "Watch Region: keep its text translated as it changes",
+                                            self.on_watch_clicked)
+        # Only a full-screen capture knows where its regions are on the screen
+        self.btn_watch.set_sensitive(getattr(self.captured_image, "screen_origin", None) is not None)
+        button_box.pack_start(self.btn_watch, False, False, 0)
         button_box.pack_start(Gtk.Box(), True, True, 0) # Spacer
         self.btn_close = create_icon_button("window-close", "Close Window (Esc)", lambda w: self.close())
         button_box.pack_start(self.btn_close, False, False, 0)
@@ -104,16 +183,74 @@ class ScreenshotDisplayWindow(Gtk.Window):
         if self.pixbuf: self.resize(1,1) 
         else: self.set_default_size(450, 250) 
 
+    def get_target_monitor_workarea(self):
+        """Work area of the monitor the window opens on (the one under the pointer), or None without a display."""
+        display = Gdk.Display.get_default()
+        if display is None:
+            return None
+        monitor = None
+        seat = display.get_default_seat()
+        if seat is not None and seat.get_pointer() is not None:
+            _, x, y = seat.get_pointer().get_position()
+            monitor = display.get_monitor_at_point(x, y)
+        monitor = monitor or display.get_primary_monitor() or display.get_monitor(0)
+        return monitor.get_workarea() if monitor is not None else None
+
     def on_key_press(self, widget, event):
         if event.keyval == Gdk.KEY_Escape:
             self.close() # This will trigger the "destroy" signal
+        elif self.preview is not None and event.keyval in (Gdk.KEY_plus, Gdk.KEY_equal, Gdk.KEY_KP_Add):
+            self.preview.zoom_at(ZOOM_STEP)
+            return True
+        elif self.preview is not None and event.keyval in (Gdk.KEY_minus, Gdk.KEY_KP_Subtract):
+            self.preview.zoom_at(1 / ZOOM_STEP)
+            return True
+        elif self.preview is not None and event.keyval in (Gdk.KEY_0, Gdk.KEY_KP_0):
+            self.preview.reset_zoom()
+            return True
+        elif event.state & Gdk.ModifierType.CONTROL_MASK and event.state & Gdk.ModifierType.SHIFT_MASK \
+                and event.keyval in (Gdk.KEY_c, Gdk.KEY_C):
+            self.on_copy_image_clicked(self.btn_copy_image)
+            return True
+        elif event.state & Gdk.ModifierType.CONTROL_MASK and self.preview is not None and self.preview.words is not None:
+            if event.keyval in (Gdk.KEY_c, Gdk.KEY_C) and self.preview.has_selection():
+                self.copy_to_clipboard(self.preview.get_selected_text(), "Selected text has been copied to the clipboard.")
+                return True
+            if event.keyval in (Gdk.KEY_a, Gdk.KEY_A):
+                self.preview.select_all()
+                return True
         return False
 
+    def on_text_selection_changed(self):
+        self.update_action_tooltips()
+
+    def on_region_changed(self, region):
+        print(f"[ACTION] Region of interest: {region or 'whole capture'}.")
+        self.ocr_target = self.ocr_targets.setdefault(region, OCRTarget(region))
+        self.update_action_tooltips()
+        self.start_background_ocr() # Only the region is recognized (or looked up in a finished full OCR)
+
+    def update_action_tooltips(self):
+        source = "Selected Region" if self.ocr_target.region else "Image"
+        self.btn_copy_image.set_tooltip_text(f"Copy {source} (Ctrl+Shift+C)")
+        self.btn_translate.set_tooltip_text(f"Translate Text from {source}")
+        self.btn_translate_multi.set_tooltip_text(f"Translate Text from {source} into Several Languages")
+        if self.preview is not None and self.preview.has_selection():
+            self.btn_copy_text.set_tooltip_text("Copy Selected Text (Ctrl+C)")
+        else:
+            self.btn_copy_text.set_tooltip_text(f"Copy Text from {source}")
+
     def set_temp_file_to_delete(self, filepath):
         self.temp_file_to_delete = filepath
 
     def on_destroy(self, widget):
         print("Display window destroyed.")
+        self.is_closed = True # Late background results are dropped from now on
+        for stream in list(self.active_streams):
+            stream.cancel()
+        for target in self.ocr_targets.values():
+            for future in target.translations.values():
+                future.cancel() # Only affects translations that have not started yet
         if self.temp_file_to_delete and os.path.exists(self.temp_file_to_delete):
             try:
                 os.remove(self.temp_file_to_delete)
@@ -121,32 +258,89 @@ class ScreenshotDisplayWindow(Gtk.Window):
             except OSError as e:
                 print(f"Error deleting temporary file '{self.temp_file_to_delete}': {e}")
         
-        print("Quitting Gtk.main() loop.")
-        Gtk.main_quit()
+        if self.quit_on_close:
+            get_clipboard().store_on_exit() # What was copied stays pasteable after the process exits
+            print("Quitting Gtk.main() loop.")
+            Gtk.main_quit()
 
     def on_save_clicked(self, widget):
         print("[ACTION] Save Image button clicked.")
-        if not os.path.exists(self.default_save_dir):
-            try:
-                os.makedirs(self.default_save_dir, exist_ok=True)
-            except OSError as e:
-                self.show_error_dialog("Save Error", f"Could not create save directory.\n{e}")
-                return
-        now = datetime.datetime.now()
-        filename = f"Screenshot_{now.strftime('%Y-%m-%d_%H%M%S')}.png"
-        save_path = os.path.join(self.default_save_dir, filename)
+        if self.captured_image is None:
+            self.show_error_dialog("Save Error", "No image was loaded.")
+            return
+        # Encoding and writing happen on the save queue's worker; the window stays responsive.
+        self.set_button_busy(self.btn_save, True)
+        save_future = get_save_queue().submit(self.captured_image, self.default_save_dir, self.save_format)
+        run_when_done(save_future, self.on_save_finished)
+
+    def on_save_finished(self, save_future):
+        if self.is_closed:
+            return
+        self.set_button_busy(self.btn_save, False)
         try:
-            shutil.copy2(self.image_path, save_path)
-            self.show_info_dialog("Image Saved", f"Screenshot saved as\n{save_path}")
+            result = save_future.result()
         except Exception as e:
-            self.show_error_dialog("Save Error", f"Could not save image to {save_path}.\n{e}")
+            self.show_status(f"Could not save the image: {e}", is_error=True)
+            return
+        if result.duplicate:
+            self.show_status(f"Already saved as {result.path}")
+        else:
+            self.show_status(f"Saved as {result.path}")
+
+    def on_save_button_press(self, button, event):
+        if event.button != 3:
+            return False
+        # Right-click: choose the format of the next saves
+        menu = Gtk.Menu()
+        group = None
+        for format_name in available_save_formats():
+            item = Gtk.RadioMenuItem.new_with_label_from_widget(group, SAVE_FORMATS[format_name].label)
+            group = group or item
+            item.set_active(format_name == self.save_format)
+            item.connect("activate", self.on_save_format_selected, format_name)
+            menu.append(item)
+        menu.show_all()
+        menu.attach_to_widget(button, None)
+        menu.popup_at_pointer(event)
+        return True
+
+    def on_save_format_selected(self, item, format_name):
+        if item.get_active():
+            self.save_format = format_name
+            self.update_save_tooltip()
+
+    def update_save_tooltip(self):
+        self.btn_save.set_tooltip_text(f"Save Image as {SAVE_FORMATS[self.save_format].label}\n(right-click to change the format)")
+
+    def show_status(self, message, is_error=False):
+        """Shows message under the image for STATUS_SECONDS, without interrupting the user."""
+        print(f"[STATUS] {message}")
+        self.status_label.set_text(message)
+        self.status_label.set_tooltip_text(message)
+        context = self.status_label.get_style_context()
+        if is_error:
+            context.add_class("error")
+        else:
+            context.remove_class("error")
+        self.status_revealer.set_reveal_child(True)
+        if self.status_timeout_id is not None:
+            GLib.source_remove(self.status_timeout_id)
+        self.status_timeout_id = GLib.timeout_add_seconds(STATUS_SECONDS, self.hide_status)
+
+    def hide_status(self):
+        self.status_timeout_id = None
+        if not self.is_closed:
+            self.status_revealer.set_reveal_child(False)
+        return False # One-shot timeout
 
     def on_translate_clicked(self, widget):
         print("[ACTION] Translate Text button clicked.")
-        if not self.image_path or not os.path.exists(self.image_path):
-            self.show_error_dialog("Translation Error", "Image path is invalid or file does not exist.")
+        if self.captured_image is None:
+            self.show_error_dialog("Translation Error", "No image was loaded.")
             return
+        self.start_background_ocr() # No-op if it is already running or done
 
+        # The language dialog is shown while OCR may still be running in the background.
         lang_dialog = LanguageSelectionDialog(self, self.last_selected_language_display)
         response = lang_dialog.run()
         selected_lang_code = None
@@ -163,49 +357,299 @@ class ScreenshotDisplayWindow(Gtk.Window):
             # self.show_info_dialog("Translation Cancelled", "No target language was selected.")
             return
 
-        extracted_text = extract_text_from_image(self.image_path)
-        if not extracted_text:
+        self.set_button_busy(self.btn_translate, True)
+        target = self.ocr_target
+        run_when_done(target.future, self.on_ocr_ready_for_translation, target, selected_lang_code, selected_lang_display_name)
+
+    def on_ocr_ready_for_translation(self, ocr_future, target, selected_lang_code, selected_lang_display_name):
+        if self.is_closed:
+            return
+        extracted_text = self.get_ocr_result(ocr_future)
+        if not extracted_text or is_ocr_error(extracted_text):
+            self.set_button_busy(self.btn_translate, False)
             error_msg = "Could not extract text from the image, or no text was found."
-            if isinstance(extracted_text, str) and "Error:" in extracted_text:
+            if is_ocr_error(extracted_text):
                 error_msg = extracted_text
             self.show_error_dialog("OCR Problem", error_msg)
             return
 
-        translated_text = translate_text_with_gemini(extracted_text, target_language=selected_lang_code)
-        if translated_text:
-            known_errors = ["Gemini API not configured", "Error during translation", "Tesseract not found", "No text provided"]
-            is_error = any(err_msg.lower() in translated_text.lower() for err_msg in known_errors) and "error:" in translated_text.lower()
-            if is_error:
-                self.show_error_dialog("Translation Failed", translated_text)
-            else:
-                self.show_info_dialog(f"Translation to {selected_lang_display_name}", translated_text)
+        # Results go to a live, non-modal view instead of a modal dialog
+        result_window = StreamingResultWindow(self, f"Translation to {selected_lang_display_name}")
+        pretranslation_future = target.translations.get(selected_lang_code)
+        if pretranslation_future is not None:
+            # The speculative translation already covers this language; wait for it instead of asking again.
+            run_when_done(pretranslation_future, self.on_pretranslation_ready, target, selected_lang_code, result_window)
         else:
-            self.show_error_dialog("Translation Failed", "An unknown error occurred, or no translation was returned.")
+            self.start_streaming_translation(extracted_text, selected_lang_code, result_window)
+
+    def on_pretranslation_ready(self, translation_future, target, selected_lang_code, result_window):
+        if self.is_closed:
+            return
+        self.set_button_busy(self.btn_translate, False)
+        try:
+            translated_text = translation_future.result()
+        except Exception as e:
+            translated_text = f"Error during translation: {e}"
+        if not translated_text or is_translation_error(translated_text):
+            target.translations.pop(selected_lang_code, None) # Let the next click retry
+        if result_window.is_closed:
+            return
+        if not translated_text:
+            result_window.finish(error_message="An unknown error occurred, or no translation was returned.")
+        elif is_translation_error(translated_text):
+            result_window.finish(error_message=translated_text)
+        else:
+            result_window.set_text(translated_text)
+            result_window.finish()
+
+    def start_streaming_translation(self, extracted_text, selected_lang_code, result_window):
+        stream = stream_translate_text_with_gemini(extracted_text, target_language=selected_lang_code)
+        self.active_streams.add(stream)
+        result_window.on_cancel = stream.cancel # Esc / closing the result view aborts the request
+
+        def consume_stream():
+            error_message = None
+            with span("translate_stream", self.trace_id, lang=selected_lang_code) as stream_span:
+                started, first_chunk = time.time(), True
+                try:
+                    for chunk in stream:
+                        if first_chunk: # The latency the user feels: when text starts to appear
+                            record_span("translate_first_chunk", self.trace_id, started, time.time(), lang=selected_lang_code)
+                            first_chunk = False
+                        run_on_main_thread(self.on_stream_chunk, result_window, chunk)
+                    if not stream.text.strip() and not stream.cancelled:
+                        error_message = "An unknown error occurred, or no translation was returned."
+                except GeminiError as e:
+                    error_message = str(e)
+                stream_span.set(cancelled=stream.cancelled, failed=error_message is not None)
+            run_on_main_thread(self.on_stream_finished, stream, result_window, error_message)
+
+        _background_executor.submit(consume_stream)
+
+    def on_stream_chunk(self, result_window, chunk):
+        if not result_window.is_closed:
+            result_window.append_text(chunk)
+
+    def on_stream_finished(self, stream, result_window, error_message):
+        self.active_streams.discard(stream)
+        if self.is_closed:
+            return
+        self.set_button_busy(self.btn_translate, False)
+        if stream.cancelled or result_window.is_closed:
+            return
+        result_window.finish(error_message=error_message)
+
+    def on_translate_multi_clicked(self, widget):
+        print("[ACTION] Translate to Several Languages button clicked.")
+        if self.captured_image is None:
+            self.show_error_dialog("Translation Error", "No image was loaded.")
+            return
+        self.start_background_ocr()
+
+        lang_dialog = MultiLanguageSelectionDialog(self, self.last_selected_multi_languages)
+        response = lang_dialog.run()
+        selected_languages = lang_dialog.get_selected_languages() if response == Gtk.ResponseType.OK else []
+        lang_dialog.destroy()
+        if not selected_languages:
+            print("Language selection cancelled or empty.")
+            return
+        self.last_selected_multi_languages = [display_name for display_name, _ in selected_languages]
+
+        self.set_button_busy(self.btn_translate_multi, True)
+        target = self.ocr_target
+        run_when_done(target.future, self.on_ocr_ready_for_multi_translation, target, selected_languages)
+
+    def on_ocr_ready_for_multi_translation(self, ocr_future, target, selected_languages):
+        if self.is_closed:
+            return
+        extracted_text = self.get_ocr_result(ocr_future)
+        if not extracted_text or is_ocr_error(extracted_text):
+            self.set_button_busy(self.btn_translate_multi, False)
+            error_msg = "Could not extract text from the image, or no text was found."
+            if is_ocr_error(extracted_text):
+                error_msg = extracted_text
+            self.show_error_dialog("OCR Problem", error_msg)
+            return
+
+        # Languages already translated (or being translated, e.g. speculatively) are not requested again.
+        missing_codes = [lang_code for _, lang_code in selected_languages if lang_code not in target.translations]
+        new_futures = submit_translations(extracted_text, missing_codes, trace_id=self.trace_id)
+        target.translations.update(new_futures)
+
+        def cancel_new_translations():
+            for future in new_futures.values():
+                future.cancel()
+
+        result_window = MultiTranslationResultWindow(self, selected_languages, on_cancel=cancel_new_translations)
+        for _, lang_code in selected_languages:
+            run_when_done(target.translations[lang_code], self.on_multi_translation_finished, target, lang_code, result_window)
+
+    def on_multi_translation_finished(self, translation_future, target, lang_code, result_window):
+        if self.is_closed:
+            return
+        result_window.request_finished()
+        if result_window.is_complete():
+            # One busy count per click (see set_button_busy): the spinner stays until every window is complete
+            self.set_button_busy(self.btn_translate_multi, False)
+        try:
+            translated_text = translation_future.result()
+        except Exception as e: # Includes CancelledError for translations the user abandoned
+            translated_text = f"Error during translation: {e!r}"
+        error_message = None
+        if not translated_text or is_translation_error(translated_text):
+            target.translations.pop(lang_code, None) # Let a later click retry
+            error_message = translated_text or "An unknown error occurred, or no translation was returned."
+        if not result_window.is_closed:
+            result_window.set_result(lang_code, translated_text, error_message=error_message)
 
     def on_copy_text_clicked(self, widget):
         print("[ACTION] Copy Text button clicked.")
-        if not self.image_path or not os.path.exists(self.image_path):
-            self.show_error_dialog("Copy Error", "Image path is invalid or file does not exist.")
+        if self.captured_image is None:
+            self.show_error_dialog("Copy Error", "No image was loaded.")
             return
-        extracted_text = extract_text_from_image(self.image_path)
-        if extracted_text:
-            try:
-                pyperclip.copy(extracted_text)
-                self.show_info_dialog("Text Copied", "Extracted text has been copied to the clipboard.")
-            except pyperclip.PyperclipException as e:
-                error_message = f"Could not copy text to clipboard.\nError: {e}\n" \
-                                "Please ensure xclip or xsel is installed."
-                self.show_error_dialog("Clipboard Error", error_message)
-            except Exception as e:
-                self.show_error_dialog("Clipboard Error", f"An unexpected error occurred: {e}")
+        if self.preview is not None and self.preview.has_selection():
+            # The selection comes from the finished OCR result; nothing has to be recognized again.
+            self.copy_to_clipboard(self.preview.get_selected_text(), "Selected text has been copied to the clipboard.")
+            return
+        self.start_background_ocr()
+        self.set_button_busy(self.btn_copy_text, True)
+        run_when_done(self.ocr_target.future, self.on_ocr_ready_for_copy)
+
+    def on_ocr_ready_for_copy(self, ocr_future):
+        if self.is_closed:
+            return
+        self.set_button_busy(self.btn_copy_text, False)
+        extracted_text = self.get_ocr_result(ocr_future)
+        if extracted_text and not is_ocr_error(extracted_text):
+            self.copy_to_clipboard(extracted_text, "Extracted text has been copied to the clipboard.")
         elif extracted_text == "":
             self.show_info_dialog("Copy Text", "No text was found in the image.")
         else: 
             error_msg = "Could not extract text from the image."
-            if isinstance(extracted_text, str) and "Error:" in extracted_text:
+            if is_ocr_error(extracted_text):
                 error_msg = extracted_text 
             self.show_error_dialog("OCR Error", error_msg)
 
+    def on_copy_image_clicked(self, widget):
+        print("[ACTION] Copy Image button clicked.")
+        if self.captured_image is None:
+            self.show_error_dialog("Copy Error", "No image was loaded.")
+            return
+        target = self.ocr_target
+        image = self.captured_image.crop(target.region) if target.region else self.captured_image
+        # Offered together with the image when OCR has already finished: text editors paste the text instead
+        words = self.get_ocr_words(target.future) if target.future is not None and target.future.done() else None
+        text = words.text if isinstance(words, OCRResult) and words.text else None
+        if self.copy_to_clipboard(text, None, image=image):
+            self.show_status(f"{'Selected region' if target.region else 'Image'} copied to the clipboard.")
+
+    def on_watch_clicked(self, widget):
+        print("[ACTION] Watch Region button clicked.")
+        region = self.ocr_target.region
+        if region is None:
+            self.show_info_dialog("Watch Region", "Drag a rectangle around the text to watch on the preview first.")
+            return
+        from watch_overlay import start_watch # Not needed until a watch starts
+        origin_x, origin_y = self.captured_image.screen_origin
+        left, top, right, bottom = region
+        box = (origin_x + left, origin_y + top, origin_x + right, origin_y + bottom)
+        start_watch(box, SUPPORTED_LANGUAGES.get(self.last_selected_language_display), quit_on_close=self.quit_on_close)
+        self.quit_on_close = False # The overlay now owns the main loop (when this process has one to quit)
+        self.close()
+
+    def copy_to_clipboard(self, text, success_message, image=None):
+        """Puts text and/or image (a CapturedImage) on the clipboard; success_message (if any) is shown in a dialog."""
+        try:
+            with span("clipboard", self.trace_id, characters=len(text or ""), image=image is not None):
+                copied = get_clipboard().copy(text=text, image=image)
+        except Exception as e:
+            self.show_error_dialog("Clipboard Error", f"An unexpected error occurred: {e}")
+            return False
+        if not copied:
+            self.show_error_dialog("Clipboard Error", "Could not take over the clipboard.")
+        elif success_message:
+            self.show_info_dialog("Text Copied", success_message)
+        return copied
+
+    # --- Background work ---
+    def start_background_ocr(self):
+        """
+        Starts OCR of the current target (the region of interest, or the whole capture) in a worker
+        thread; the result is shared by Copy, Translate and the preview.
+        """
+        target = self.ocr_target
+        if target.future is not None:
+            return
+        full_future = self.ocr_targets[None].future
+        full_words = self.get_ocr_words(full_future) if full_future is not None and full_future.done() else None
+        if target.region is None:
+            print("[BACKGROUND] Starting OCR of the capture.")
+            target.future = _background_executor.submit(traced("ocr", self.trace_id, extract_words_from_image), self.captured_image)
+        elif isinstance(full_words, OCRResult):
+            # The whole capture is already recognized: the region's words are a lookup, not another OCR call.
+            target.future = Future()
+            target.future.set_result(full_words.subset(full_words.indices_in_rect(*target.region)))
+        else:
+            print(f"[BACKGROUND] Starting OCR of region {target.region}.")
+            ocr_region = traced("ocr", self.trace_id, extract_words_from_region, region=target.region)
+            target.future = _background_executor.submit(ocr_region, self.captured_image, target.region)
+        self.set_button_busy(self.btn_copy_text, True)
+        self.set_button_busy(self.btn_translate, True)
+        run_when_done(target.future, self.on_background_ocr_finished, target)
+
+    def on_background_ocr_finished(self, ocr_future, target):
+        if self.is_closed:
+            return
+        self.set_button_busy(self.btn_copy_text, False)
+        self.set_button_busy(self.btn_translate, False)
+        words = self.get_ocr_words(ocr_future)
+        if isinstance(words, OCRResult) and self.preview is not None and (target.region is None or self.preview.words is None):
+            self.preview.set_words(words) # The recognized words become selectable on the preview
+        extracted_text = self.get_ocr_result(ocr_future)
+        print(f"[BACKGROUND] OCR finished ({len(extracted_text or '')} characters).")
+        if SPECULATIVE_PRETRANSLATE and extracted_text and not is_ocr_error(extracted_text) and get_client().is_configured():
+            lang_code = SUPPORTED_LANGUAGES.get(self.last_selected_language_display)
+            if lang_code:
+                print(f"[BACKGROUND] Pre-translating into {self.last_selected_language_display}.")
+                self.request_translation(target, extracted_text, lang_code)
+
+    def get_ocr_words(self, ocr_future):
+        """The OCRResult of a finished OCR task, or its error message / None."""
+        try:
+            return ocr_future.result()
+        except Exception as e:
+            print(f"[BACKGROUND] OCR task failed: {e}")
+            return None
+
+    def get_ocr_result(self, ocr_future):
+        """The text of a finished OCR task ("" if there is none), or its error message / None."""
+        words = self.get_ocr_words(ocr_future)
+        return words.text if isinstance(words, OCRResult) else words
+
+    def request_translation(self, target, extracted_text, lang_code):
+        """Returns the (possibly already running or finished) translation Future of target's text for lang_code."""
+        future = target.translations.get(lang_code)
+        if future is None:
+            translate = traced("translate", self.trace_id, translate_text_with_gemini, lang=lang_code)
+            future = _background_executor.submit(translate, extracted_text, target_language=lang_code)
+            target.translations[lang_code] = future
+        return future
+
+    def set_button_busy(self, button, busy):
+        """Shows a spinner on button while at least one task it waits for is pending."""
+        count = self.busy_counts.get(button, 0) + (1 if busy else -1)
+        count = max(count, 0)
+        self.busy_counts[button] = count
+        if count and not hasattr(button, "idle_image"):
+            button.idle_image = button.get_image()
+            spinner = Gtk.Spinner()
+            spinner.start()
+            spinner.show()
+            button.set_image(spinner)
+        elif not count and hasattr(button, "idle_image"):
+            button.set_image(button.idle_image)
+            del button.idle_image
+
     # --- Helper Dialogs ---
     def show_info_dialog(self, title, message):
         dialog = Gtk.MessageDialog(transient_for=self, flags=0, message_type=Gtk.MessageType.INFO,
@@ -231,11 +675,15 @@ class ScreenshotDisplayWindow(Gtk.Window):
                     child_widget.props.xalign = 0
         dialog.run(); dialog.destroy()
 
-def show_screenshot(image_path, is_temporary_file=False):
-    win = ScreenshotDisplayWindow(image_path)
-    if is_temporary_file:
-        win.set_temp_file_to_delete(image_path)
+def show_screenshot(image, is_temporary_file=False, quit_on_close=True):
+    """Shows a CapturedImage (or an image file; is_temporary_file deletes it when the window closes)."""
+    win = ScreenshotDisplayWindow(image, quit_on_close=quit_on_close)
+    if is_temporary_file and isinstance(image, str):
+        win.set_temp_file_to_delete(image)
     win.show_all()
+    if win.pixbuf:
+        win.start_background_ocr()
+    return win
 
 if __name__ == "__main__":
     test_image_file = "test_image.png" 
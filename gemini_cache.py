@@ -0,0 +1,171 @@
+# gemini_cache.py
+# Persistent cache for Gemini text results (translate / summarize / format), stored in SQLite
+# under the XDG cache dir. Entries expire after a TTL and the table is capped at a maximum
+# number of rows (least recently used rows are dropped first).
+#
+#   python3 gemini_cache.py --stats     # hit/miss counters and size
+#   python3 gemini_cache.py --clear
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from app_paths import get_cache_dir
+
+CACHE_DB_NAME = "gemini_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+# Set UBUNTU_AI_GEMINI_CACHE=0 to always go to the network.
+CACHE_ENABLED = os.environ.get("UBUNTU_AI_GEMINI_CACHE", "1") != "0"
+
+
+def normalize_text(text):
+    """
+    Normalizes source text for cache keys: Unicode NFC, unified line endings, no trailing spaces
+    on lines and no leading/trailing blank space. Line structure is kept, since it matters for formatting.
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def make_cache_key(operation, text, option, model_name, prompt_version):
+    """operation is 'translate' / 'summarize' / 'format'; option the target language or summary length."""
+    material = json.dumps([operation, normalize_text(text), option, model_name, prompt_version], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class GeminiResponseCache:
+    def __init__(self, db_path, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # One connection shared by the UI thread and background workers, serialized by self._lock.
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                operation TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used_at);
+            CREATE TABLE IF NOT EXISTS counters (
+                operation TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (operation, name)
+            );
+        """)
+        self._conn.commit()
+
+    def get(self, key, operation):
+        """Returns the cached response, or None on a miss (missing or expired)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+                self._count(operation, "hits")
+                self._conn.commit()
+                return row[0]
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count(operation, "misses")
+            self._conn.commit()
+            return None
+
+    def put(self, key, operation, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, operation, response, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, operation, response, now, now))
+            self._evict(now)
+            self._conn.commit()
+
+    def stats(self):
+        """Returns {operation: {'hits', 'misses', 'hit_rate', 'entries'}} plus a 'total' row."""
+        with self._lock:
+            counters = self._conn.execute("SELECT operation, name, value FROM counters").fetchall()
+            entries = dict(self._conn.execute("SELECT operation, COUNT(*) FROM responses GROUP BY operation").fetchall())
+        stats = {}
+        for operation, name, value in counters:
+            stats.setdefault(operation, {"hits": 0, "misses": 0})[name] = value
+        for operation, count in entries.items():
+            stats.setdefault(operation, {"hits": 0, "misses": 0})["entries"] = count
+        total = {"hits": 0, "misses": 0, "entries": 0}
+        for operation_stats in stats.values():
+            operation_stats.setdefault("entries", 0)
+            lookups = operation_stats["hits"] + operation_stats["misses"]
+            operation_stats["hit_rate"] = operation_stats["hits"] / lookups if lookups else 0.0
+            for name in total:
+                total[name] += operation_stats[name]
+        lookups = total["hits"] + total["misses"]
+        total["hit_rate"] = total["hits"] / lookups if lookups else 0.0
+        stats["total"] = total
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM counters")
+            self._conn.commit()
+
+    def _count(self, operation, name):
+        # Caller holds self._lock
+        self._conn.execute(
+            "INSERT INTO counters (operation, name, value) VALUES (?, ?, 1) "
+            "ON CONFLICT(operation, name) DO UPDATE SET value = value + 1", (operation, name))
+
+    def _evict(self, now):
+        # Caller holds self._lock
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used_at ASC LIMIT ?)",
+                (count - self.max_entries,))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_gemini_cache():
+    """Process-wide response cache, or None if caching is disabled or the database cannot be opened."""
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = GeminiResponseCache(os.path.join(get_cache_dir(), CACHE_DB_NAME))
+            except (OSError, sqlite3.Error) as e:
+                print(f"Gemini cache disabled, could not open database: {e}")
+                return None
+        return _default_cache
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect the Gemini response cache.")
+    parser.add_argument("--stats", action="store_true", help="Print hit/miss counters (default)")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached responses and counters")
+    args = parser.parse_args()
+
+    cache = get_gemini_cache()
+    if cache is None:
+        print("Gemini cache is disabled.")
+    elif args.clear:
+        cache.clear()
+        print(f"Cleared {cache.db_path}")
+    else:
+        print(f"Gemini response cache: {cache.db_path}")
+        print(f"{'operation':<12} {'hits':>8} {'misses':>8} {'hit rate':>9} {'entries':>8}")
+        for operation, s in cache.stats().items():
+            print(f"{operation:<12} {s['hits']:>8} {s['misses']:>8} {100 * s['hit_rate']:>8.1f}% {s['entries']:>8}")
@@ -0,0 +1,254 @@
+# gemini_client.py
+# One long-lived client object for all Gemini requests.
+#
+# The client keeps model instances (and, through the SDK, its gRPC channel) alive across calls,
+# and takes the model name from configuration instead of hard-coding it. The backend is pluggable:
+#
+#   GEMINI_BACKEND=genai                   Google's google-generativeai SDK (default)
+#   GEMINI_BACKEND=http://127.0.0.1:8765   A local HTTP stand-in (benchmarks/gemini_standin.py), for offline tests
+#   GEMINI_BACKEND=simulate                No network at all, echoes the prompt (replaces SIMULATE_GEMINI)
+#
+#   GEMINI_MODEL=gemini-2.0-flash          Model name used when a call does not ask for a specific one
+import http.client
+import json
+import threading
+from urllib.parse import urlsplit
+
+DEFAULT_MODEL_NAME = 'gemini-2.0-flash'
+HTTP_TIMEOUT_SECONDS = 60
+
+
+class HttpStatusError(RuntimeError):
+    """A non-200 answer from the HTTP backend; code is the status (used to tell transient failures apart)."""
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class GenaiBackend:
+    """Talks to the Gemini API through google-generativeai. The SDK is imported on first use."""
+    name = "genai"
+
+    def __init__(self, api_key_loader):
+        self._api_key_loader = api_key_loader
+        self._genai = None
+        self._models = {} # model name -> GenerativeModel, reused across calls
+        self._lock = threading.Lock()
+
+    def is_configured(self):
+        return bool(self._api_key_loader())
+
+    def get_model(self, model_name):
+        with self._lock:
+            if self._genai is None:
+                api_key = self._api_key_loader()
+                if not api_key:
+                    raise RuntimeError("Gemini API not configured (API key missing).")
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                self._genai = genai
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._genai.GenerativeModel(model_name)
+                self._models[model_name] = model
+            return model
+
+    def generate(self, model_name, prompt):
+        response = self.get_model(model_name).generate_content(prompt)
+        return response.text
+
+    def stream(self, model_name, prompt):
+        return _GenaiStream(self.get_model(model_name), prompt)
+
+    def count_tokens(self, model_name, text):
+        return self.get_model(model_name).count_tokens(text).total_tokens
+
+
+class _GenaiStream:
+    def __init__(self, model, prompt):
+        self._model = model
+        self._prompt = prompt
+        self._response = None
+        self._cancelled = False
+
+    def __iter__(self):
+        self._response = self._model.generate_content(self._prompt, stream=True)
+        if self._cancelled: # cancel() may have run before there was a response to cancel
+            self._cancel_response()
+            return
+        for chunk in self._response:
+            try:
+                piece = chunk.text
+            except ValueError:
+                continue # Chunk without text parts (e.g. only safety or finish metadata)
+            if piece:
+                yield piece
+
+    def cancel(self):
+        self._cancelled = True
+        self._cancel_response()
+
+    def _cancel_response(self):
+        # The SDK has no public cancel; cancelling the underlying gRPC call unblocks the
+        # waiting iterator and stops generation on the server side as well.
+        iterator = getattr(self._response, "_iterator", None)
+        cancel_call = getattr(iterator, "cancel", None)
+        if callable(cancel_call):
+            cancel_call()
+
+
+class HttpBackend:
+    """
+    Client for a local stand-in server (see benchmarks/gemini_standin.py) with a tiny JSON protocol:
+    POST /generate and /count_tokens take {"model", "prompt"}; POST /stream answers with one JSON object per line.
+    Each thread keeps its own keep-alive connection, so repeated calls do not pay a TCP handshake.
+    """
+    name = "http"
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self._local = threading.local()
+
+    def is_configured(self):
+        return True
+
+    def _new_connection(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=HTTP_TIMEOUT_SECONDS)
+
+    def _post_json(self, path, payload):
+        body = json.dumps(payload).encode("utf-8")
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = self._new_connection()
+            try:
+                conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise HttpStatusError(response.status, f"HTTP {response.status} from {self.base_url}{path}: {data[:200]!r}")
+            return json.loads(data)
+
+    def generate(self, model_name, prompt):
+        return self._post_json("/generate", {"model": model_name, "prompt": prompt})["text"]
+
+    def stream(self, model_name, prompt):
+        return _HttpStream(self, model_name, prompt)
+
+    def count_tokens(self, model_name, text):
+        return self._post_json("/count_tokens", {"model": model_name, "prompt": text})["total_tokens"]
+
+
+class _HttpStream:
+    def __init__(self, backend, model_name, prompt):
+        self._backend = backend
+        self._model_name = model_name
+        self._prompt = prompt
+        self._conn = None
+        self._cancelled = False
+
+    def __iter__(self):
+        # Streams get their own connection so cancel() can close it without disturbing pooled ones.
+        self._conn = self._backend._new_connection()
+        try:
+            body = json.dumps({"model": self._model_name, "prompt": self._prompt}).encode("utf-8")
+            self._conn.request("POST", "/stream", body=body, headers={"Content-Type": "application/json"})
+            response = self._conn.getresponse()
+            if response.status != 200:
+                raise HttpStatusError(response.status, f"HTTP {response.status} from {self._backend.base_url}/stream")
+            while not self._cancelled:
+                line = response.readline()
+                if not line:
+                    break
+                piece = json.loads(line).get("text")
+                if piece:
+                    yield piece
+        finally:
+            self._conn.close()
+
+    def cancel(self):
+        self._cancelled = True
+        if self._conn is not None and self._conn.sock is not None:
+            try:
+                self._conn.sock.shutdown(2) # Unblocks a readline() waiting in the worker thread
+            except OSError:
+                pass
+
+
+class SimulatedBackend:
+    """Offline backend that answers instantly by echoing the prompt. Useful for UI work without an API key."""
+    name = "simulate"
+
+    def is_configured(self):
+        return True
+
+    def generate(self, model_name, prompt):
+        return f"(Simulated {model_name}) {prompt}"
+
+    def stream(self, model_name, prompt):
+        return _SimulatedStream(self.generate(model_name, prompt))
+
+    def count_tokens(self, model_name, text):
+        return max(1, len(text) // 4)
+
+
+class _SimulatedStream:
+    def __init__(self, text):
+        self._text = text
+        self._cancelled = False
+
+    def __iter__(self):
+        for word in self._text.split(" "):
+            if self._cancelled:
+                return
+            yield word + " "
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class GeminiClient:
+    def __init__(self, backend, model_name=DEFAULT_MODEL_NAME):
+        self.backend = backend
+        self.model_name = model_name
+
+    def is_configured(self):
+        return self.backend.is_configured()
+
+    def generate(self, prompt, model_name=None):
+        """Returns the complete response text for prompt."""
+        return self.backend.generate(model_name or self.model_name, prompt)
+
+    def stream(self, prompt, model_name=None):
+        """Returns an iterable of response text chunks with a thread-safe cancel() method."""
+        return self.backend.stream(model_name or self.model_name, prompt)
+
+    def count_tokens(self, text, model_name=None):
+        return self.backend.count_tokens(model_name or self.model_name, text)
+
+    def warm_up(self):
+        """Pays the one-time costs (SDK import, configuration, model objects) ahead of the first request."""
+        if isinstance(self.backend, GenaiBackend) and self.backend.is_configured():
+            self.backend.get_model(self.model_name)
+
+
+def create_backend(spec, api_key_loader):
+    """Builds a backend from a GEMINI_BACKEND value."""
+    spec = (spec or "genai").strip()
+    if spec == "genai":
+        return GenaiBackend(api_key_loader)
+    if spec == "simulate":
+        return SimulatedBackend()
+    if spec.startswith("http://"):
+        return HttpBackend(spec)
+    raise ValueError(f"Unknown GEMINI_BACKEND '{spec}' (expected 'genai', 'simulate' or an http:// URL)")
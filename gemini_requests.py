@@ -0,0 +1,237 @@
+# gemini_requests.py
+# The path every Gemini API request takes, shared by translate, summarize, format and the streams.
+#
+#   - Rate limit: a token bucket caps requests per minute for the whole process, so a burst (a
+#     multi-language translation, a long text split into chunks, a batch run) queues up here instead
+#     of being answered with 429s.
+#   - Retries: transient failures (429, 5xx, deadline exceeded, dropped connections) are retried with
+#     jittered exponential backoff; other errors (bad request, missing key) fail at once.
+#   - Circuit breaker: after several transient failures in a row the API is considered down and
+#     requests fail immediately for a while, instead of each one waiting through its retries. One
+#     probe request is let through when the pause is over.
+#   - Coalescing: identical requests that are in flight at the same time (a double-click, repeated
+#     text in a batch) make one API call, and its result or error goes to every caller.
+#
+#   GEMINI_REQUESTS_PER_MINUTE=60   Sustained request rate (bursts of up to GEMINI_REQUEST_BURST)
+#   GEMINI_REQUEST_BURST=8
+#   GEMINI_MAX_ATTEMPTS=4           Attempts per request, including the first
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from app_env import env_number
+
+REQUESTS_PER_MINUTE = env_number("GEMINI_REQUESTS_PER_MINUTE", 60.0, float, minimum=1.0)
+REQUEST_BURST = env_number("GEMINI_REQUEST_BURST", 8, minimum=1)
+MAX_ATTEMPTS = env_number("GEMINI_MAX_ATTEMPTS", 4, minimum=1)
+BACKOFF_BASE_SECONDS = 1.0 # Upper bound of the first retry delay; doubled after every failed attempt
+BACKOFF_MAX_SECONDS = 20.0
+BREAKER_FAILURE_THRESHOLD = 5 # Transient failures in a row that open the circuit
+BREAKER_RESET_SECONDS = 30.0
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# google.api_core exception classes, matched by name so the SDK is not imported here
+RETRYABLE_ERROR_NAMES = {"TooManyRequests", "ResourceExhausted", "InternalServerError", "ServiceUnavailable",
+                         "GatewayTimeout", "DeadlineExceeded", "Aborted"}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without contacting the API while the circuit breaker is open."""
+
+
+def is_retryable_error(error):
+    """True for failures worth retrying: rate limiting, server errors, timeouts and dropped connections."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    code = getattr(error, "code", None) # HTTP status of google.api_core and gemini_client.HttpStatusError errors
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+class RateLimiter:
+    """Token bucket: at most rate_per_minute acquisitions per minute on average, bursts up to burst."""
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold transient failures in a row; lets one probe through after reset_seconds."""
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may go out now. While open, only one probe is allowed once the pause is over."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                print("[Gemini] API answering again, closing the circuit breaker.")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release_probe(self):
+        """Hands back the probe of a request that ended without an outcome (cancelled), so another one can probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                print(f"[Gemini] {self._failures} transient failures in a row, pausing requests for "
+                      f"{self.reset_seconds:.0f}s.")
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving while it runs wait for and share its outcome."""
+    def __init__(self):
+        self._calls = {} # key -> Future of the running call
+        self._lock = threading.Lock()
+        self.coalesced = 0 # Calls answered by another caller's request
+
+    def do(self, key, func, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not is_leader:
+            return future.result() # Raises the leader's exception, if any
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class GeminiRequests:
+    def __init__(self, rate_limiter, circuit_breaker, max_attempts=MAX_ATTEMPTS,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS):
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.single_flight = SingleFlight()
+
+    def set_rate_limit(self, requests_per_minute, burst):
+        self.rate_limiter = RateLimiter(requests_per_minute, burst)
+
+    def acquire(self):
+        """Waits for the rate limiter; raises CircuitOpenError while the API is considered down."""
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError(f"Gemini API unavailable after repeated failures, "
+                                   f"retrying in {self.circuit_breaker.retry_after():.0f}s.")
+        self.rate_limiter.acquire()
+
+    def record(self, error=None):
+        """Reports the outcome of a request to the circuit breaker (errors that are not transient count as answers)."""
+        if isinstance(error, CircuitOpenError):
+            return # Never reached the API
+        if error is not None and is_retryable_error(error):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def release(self):
+        """For a request that was acquired but ended without an outcome to record (e.g. cancelled by the user)."""
+        self.circuit_breaker.release_probe()
+
+    def retry_delay(self, error, attempt, max_attempts=None):
+        """Seconds to wait before retrying after a failed attempt (1-based), or None if it should not be retried."""
+        if attempt >= (max_attempts or self.max_attempts) or not is_retryable_error(error):
+            return None
+        # "Full jitter": callers that failed together do not retry together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def call(self, func, *args, key=None, max_attempts=None, cancel_event=None):
+        """
+        Returns func(*args), made within the rate limit and retried on transient errors. Calls with the same
+        key while one is in flight share its result. cancel_event (a threading.Event) cuts a backoff wait short.
+        """
+        if key is None:
+            return self._call_with_retries(func, args, max_attempts, cancel_event)
+        return self.single_flight.do(key, self._call_with_retries, func, args, max_attempts, cancel_event)
+
+    def _call_with_retries(self, func, args, max_attempts, cancel_event):
+        attempt = 0
+        while True:
+            attempt += 1
+            self.acquire()
+            try:
+                result = func(*args)
+            except Exception as e:
+                self.record(e)
+                delay = self.retry_delay(e, attempt, max_attempts)
+                if delay is None:
+                    raise
+                print(f"[Gemini] Request failed ({e}), retry {attempt} in {delay:.1f}s.")
+                if cancel_event is None:
+                    time.sleep(delay)
+                elif cancel_event.wait(delay):
+                    raise
+                continue
+            self.record()
+            return result
+
+
+_requests = None
+_requests_lock = threading.Lock()
+
+
+def get_gemini_requests():
+    """The process-wide request layer (one rate limit and one circuit breaker for all Gemini calls)."""
+    global _requests
+    with _requests_lock:
+        if _requests is None:
+            _requests = GeminiRequests(RateLimiter(REQUESTS_PER_MINUTE, REQUEST_BURST), CircuitBreaker())
+    return _requests
@@ -1,82 +1,233 @@
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv, set_key
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 
-text = ""
-with open("GOOGLE_API_KEY.env", "r") as key_file:
-    text = key_file.read()
-    set_key(".env", "GOOGLE_API_KEY", text)
+from app_env import env_number
+from gemini_cache import get_gemini_cache, make_cache_key
+from gemini_client import GeminiClient, create_backend, DEFAULT_MODEL_NAME
+from gemini_requests import get_gemini_requests
+from text_chunking import split_text_into_chunks
+from tracing import span, traced
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv(text)
-genai.configure(api_key=GOOGLE_API_KEY)
+# Nothing heavy is imported or touched on disk at module load: google.generativeai (and grpc
+# behind it) is imported, and the API key read, on the first translate/summarize/format call.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+API_KEY_FILE = os.path.join(APP_DIR, "GOOGLE_API_KEY.env") # Bare key, no KEY=value syntax
+DOTENV_FILE = os.path.join(APP_DIR, ".env")
 
-SIMULATE_GEMINI = False
+# Upper bound on concurrent requests for multi-language fan-out, shared by all callers in the process.
+MAX_CONCURRENT_TRANSLATIONS = 4
 
-def get_gemini_response_text(prompt):
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    response = model.generate_content(prompt)
-    return response.text
+# Long texts are translated in pieces of at most CHUNK_TOKEN_BUDGET tokens (as counted by the model),
+# up to MAX_PARALLEL_CHUNKS pieces at a time per document. A failed piece is retried on its own
+# (by the request layer in gemini_requests.py, like every other request).
+CHUNK_TOKEN_BUDGET = 1500
+MAX_PARALLEL_CHUNKS = env_number("GEMINI_MAX_PARALLEL_CHUNKS", 4, minimum=1)
+CHARS_PER_TOKEN_ESTIMATE = 4.0 # Only used to skip counting tokens for obviously short texts
+
+# Bump the version of an operation whenever its prompt changes, so cached responses to the old prompt are not reused.
+PROMPT_VERSIONS = {"translate": 1, "summarize": 1, "format": 1}
+
+_client = None
+_client_lock = threading.Lock()
+_fanout_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TRANSLATIONS, thread_name_prefix="gemini-fanout")
+
+
+def load_api_key():
+    """
+    Returns the Gemini API key, or None if none is configured.
+    Looked up (read-only) in the GOOGLE_API_KEY environment variable, then .env, then GOOGLE_API_KEY.env.
+    """
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if api_key:
+        return api_key.strip()
+    if os.path.exists(DOTENV_FILE):
+        from dotenv import dotenv_values
+        api_key = dotenv_values(DOTENV_FILE).get("GOOGLE_API_KEY")
+        if api_key:
+            return api_key.strip()
+    try:
+        with open(API_KEY_FILE, "r") as key_file:
+            api_key = key_file.read().strip()
+    except OSError:
+        return None
+    return api_key or None
+
+
+def get_client():
+    """
+    The process-wide GeminiClient. Backend and model come from GEMINI_BACKEND and GEMINI_MODEL
+    (see gemini_client.py); the default is the real API through google-generativeai.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            backend = create_backend(os.getenv("GEMINI_BACKEND"), load_api_key)
+            _client = GeminiClient(backend, model_name=os.getenv("GEMINI_MODEL") or DEFAULT_MODEL_NAME)
+            print(f"[Gemini] Using backend '{backend.name}' with model '{_client.model_name}'.")
+    return _client
+
+
+def set_client(client):
+    """Replaces the process-wide client, e.g. with one pointing at a local stand-in server."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def get_gemini_response_text(prompt, cancel_event=None):
+    """
+    The response to prompt, through the request layer: rate limited, retried on transient errors, and
+    shared with any identical request already in flight (see gemini_requests.py).
+    """
+    client = get_client()
+    return get_gemini_requests().call(client.generate, prompt, key=("generate", client.model_name, prompt),
+                                      cancel_event=cancel_event)
+
+
+def lookup_cached_response(operation, source_text, option=None):
+    """
+    Checks the persistent response cache before any network call.
+    Returns (cache_key, cached_text); cached_text is None on a miss, cache_key is None if caching is off.
+    """
+    cache = get_gemini_cache()
+    if cache is None:
+        return None, None
+    cache_key = make_cache_key(operation, source_text, option, get_client().model_name, PROMPT_VERSIONS[operation])
+    with span("gemini_cache_lookup", operation=operation) as lookup_span:
+        cached_text = cache.get(cache_key, operation)
+        lookup_span.set(hit=cached_text is not None)
+    if cached_text is not None:
+        print(f"[Gemini] Cache hit for {operation} ({option}), skipping the API call.")
+    return cache_key, cached_text
+
+
+def store_cached_response(operation, cache_key, response_text):
+    cache = get_gemini_cache()
+    if cache is not None and cache_key and response_text:
+        cache.put(cache_key, operation, response_text)
 
 def is_api_configured():
-    if SIMULATE_GEMINI: # If simulating, we don't strictly need a key for these functions to "work"
-        return True
-    # Check if genai is configured (assuming API_KEY was set and genai.configure called)
-    # A more robust check would be to see if genai.get_model throws an error or if the API key var is set
-    api_key_present = bool(os.getenv("GOOGLE_API_KEY"))
+    # Only looks for a key; the client library itself is not imported until a request is made.
+    # The offline backends (simulate, local HTTP stand-in) are always configured.
+    api_key_present = get_client().is_configured()
     if not api_key_present:
-        print("ERROR: GOOGLE_API_KEY environment variable not set. Cannot make live API calls.")
+        print("ERROR: No Gemini API key found (GOOGLE_API_KEY, .env or GOOGLE_API_KEY.env). Cannot make live API calls.")
     return api_key_present
 
 
+def build_translation_prompt(text_to_translate, target_language):
+    # Crafting a good prompt is key
+    return f"Translate the following text into {target_language} (be precise, if {target_language} is 'pt-BR', use Brazilian Portuguese variant):\n\n\"{text_to_translate}\""
+
+
 def translate_text_with_gemini(text_to_translate, target_language="pt-BR"):
     if not text_to_translate:
         return "No text provided for translation."
     
     print(f"[Gemini] Requesting translation for: '{text_to_translate[:50]}...' to {target_language}")
 
-    if SIMULATE_GEMINI:
-        return f"(Simulated) Translated to {target_language}: '{text_to_translate}'"
+    cache_key, cached_text = lookup_cached_response("translate", text_to_translate, target_language)
+    if cached_text is not None:
+        return cached_text
     
     if not is_api_configured():
         return "Error: Gemini API not configured (API key missing)."
 
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash') # Or specific model for translation if available
-        # Crafting a good prompt is key
-        prompt = f"Translate the following text into {target_language} (be precise, if {target_language} is 'pt-BR', use Brazilian Portuguese variant):\n\n\"{text_to_translate}\""
-        
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        chunks = plan_translation_chunks(text_to_translate)
+        if chunks is not None:
+            # Too long for one request: TranslationStream translates the pieces in parallel and caches the whole result.
+            return "".join(TranslationStream(text_to_translate, target_language, chunks=chunks,
+                                             cache_lookup=(cache_key, None))).strip()
+        prompt = build_translation_prompt(text_to_translate, target_language)
+        with span("gemini_request", operation="translate", characters=len(text_to_translate)):
+            translated_text = get_gemini_response_text(prompt).strip()
+        store_cached_response("translate", cache_key, translated_text)
+        return translated_text
     except Exception as e:
         print(f"Gemini API Error (translate_text_with_gemini): {e}")
         return f"Error during translation: {str(e)}"
 
 
+def submit_translations(text_to_translate, target_languages, trace_id=None):
+    """
+    Starts translating text_to_translate into every language code in target_languages, at most
+    MAX_CONCURRENT_TRANSLATIONS at a time. Returns {language code: Future}; each Future resolves to
+    what translate_text_with_gemini returns. Futures that have not started yet can be cancel()ed.
+    trace_id attributes each translation to an interaction trace (see tracing.py).
+    """
+    futures = {}
+    for target_language in dict.fromkeys(target_languages): # De-duplicated, order kept
+        translate = traced("translate", trace_id, translate_text_with_gemini, lang=target_language)
+        futures[target_language] = _fanout_executor.submit(translate, text_to_translate, target_language)
+    return futures
+
+
+def translate_text_multi_with_gemini(text_to_translate, target_languages):
+    """Yields (language code, translated text) pairs as each translation completes."""
+    futures = submit_translations(text_to_translate, target_languages)
+    languages_by_future = {future: language for language, future in futures.items()}
+    for future in as_completed(languages_by_future):
+        yield languages_by_future[future], future.result()
+
+
+def build_summary_prompt(text_to_summarize, length):
+    if length == "short":
+        return f"Summarize the following text in one or two concise sentences:\n\n\"{text_to_summarize}\""
+    if length == "long":
+        return f"Provide a detailed summary (multiple paragraphs if necessary) of the following text, capturing key points and nuances:\n\n\"{text_to_summarize}\""
+    return f"Summarize the following text in a few sentences (e.g., a short paragraph):\n\n\"{text_to_summarize}\"" # medium
+
+
+def build_formatting_prompt(text_to_format):
+    # Prompt for formatting improvement. This is highly dependent on what kind of "improvement" is desired.
+    # Examples: Fixing markdown, making paragraphs more readable, converting to bullet points, etc.
+    return (
+        "Please improve the formatting of the following text for better readability. "
+        "This might include adjusting paragraph breaks, ensuring consistent spacing, "
+        "using markdown for lists or emphasis if appropriate (like *italic* or **bold**), "
+        "and correcting any obvious formatting errors. "
+        "Return only the improved text, without any introductory phrases like 'Here is the improved text:'.\n\n"
+        f"Original text:\n\"{text_to_format}\""
+    )
+
+
+def _request_cached(operation, source_text, option, prompt, cancel_event=None):
+    """The cached (or new) response to prompt; raises GeminiError without an API key, and any request error as is."""
+    cache_key, cached_text = lookup_cached_response(operation, source_text, option)
+    if cached_text is not None:
+        return cached_text
+    if not is_api_configured():
+        raise GeminiError("Error: Gemini API not configured (API key missing).")
+    response_text = get_gemini_response_text(prompt, cancel_event=cancel_event).strip()
+    store_cached_response(operation, cache_key, response_text)
+    return response_text
+
+
+def request_summary(text_to_summarize, length="medium", cancel_event=None):
+    """Like summarize_text_with_gemini, but raises on failure instead of returning an error string."""
+    return _request_cached("summarize", text_to_summarize, length, build_summary_prompt(text_to_summarize, length),
+                           cancel_event)
+
+
+def request_formatting(text_to_format, cancel_event=None):
+    """Like improve_formatting_with_gemini, but raises on failure instead of returning an error string."""
+    return _request_cached("format", text_to_format, None, build_formatting_prompt(text_to_format), cancel_event)
+
+
 def summarize_text_with_gemini(text_to_summarize, length="medium"): # length can be "short", "medium", "long"
     if not text_to_summarize:
         return "No text provided for summarization."
 
     print(f"[Gemini] Requesting summarization for: '{text_to_summarize[:50]}...' (length: {length})")
 
-    if SIMULATE_GEMINI:
-        return f"(Simulated) {length.capitalize()} summary of: '{text_to_summarize}'"
-
-    if not is_api_configured():
-        return "Error: Gemini API not configured (API key missing)."
-
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        # Prompt engineering for summarization
-        if length == "short":
-            prompt = f"Summarize the following text in one or two concise sentences:\n\n\"{text_to_summarize}\""
-        elif length == "long":
-            prompt = f"Provide a detailed summary (multiple paragraphs if necessary) of the following text, capturing key points and nuances:\n\n\"{text_to_summarize}\""
-        else: # medium
-            prompt = f"Summarize the following text in a few sentences (e.g., a short paragraph):\n\n\"{text_to_summarize}\""
-        
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return request_summary(text_to_summarize, length)
+    except GeminiError as e:
+        return str(e)
     except Exception as e:
         print(f"Gemini API Error (summarize_text_with_gemini): {e}")
         return f"Error during summarization: {str(e)}"
@@ -88,48 +239,263 @@ def improve_formatting_with_gemini(text_to_format):
 
     print(f"[Gemini] Requesting formatting improvement for: '{text_to_format[:50]}...'")
 
-    if SIMULATE_GEMINI:
-        return f"(Simulated) Improved formatting for: '{text_to_format}'\n- Example bullet point 1\n- Example bullet point 2"
-
-    if not is_api_configured():
-        return "Error: Gemini API not configured (API key missing)."
-        
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        # Prompt for formatting improvement. This is highly dependent on what kind of "improvement" is desired.
-        # Examples: Fixing markdown, making paragraphs more readable, converting to bullet points, etc.
-        prompt = (
-            "Please improve the formatting of the following text for better readability. "
-            "This might include adjusting paragraph breaks, ensuring consistent spacing, "
-            "using markdown for lists or emphasis if appropriate (like *italic* or **bold**), "
-            "and correcting any obvious formatting errors. "
-            "Return only the improved text, without any introductory phrases like 'Here is the improved text:'.\n\n"
-            f"Original text:\n\"{text_to_format}\""
-        )
-        
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return request_formatting(text_to_format)
+    except GeminiError as e:
+        return str(e)
     except Exception as e:
         print(f"Gemini API Error (improve_formatting_with_gemini): {e}")
         return f"Error during formatting improvement: {str(e)}"
 
 
+class GeminiError(Exception):
+    """Raised by streaming requests and the request_* functions; the other functions above return error strings instead."""
+
+
+class GeminiStream:
+    """
+    A streaming Gemini request. Iterating yields text chunks as they arrive (the first chunk is what
+    users wait for, not the complete answer). cancel() may be called from any thread, e.g. the GTK
+    main thread while a worker is blocked waiting for the next chunk.
+    Iteration raises GeminiError on failure and simply stops once cancelled.
+    """
+    def __init__(self, operation, source_text, option, prompt):
+        self.operation = operation
+        self.source_text = source_text
+        self.option = option
+        self.prompt = prompt
+        self.text = "" # Everything received so far
+        self._cancel_event = threading.Event()
+        self._backend_stream = None
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        if self._cancel_event.is_set():
+            return
+        print(f"[Gemini] Cancelling streaming {self.operation} request.")
+        self._cancel_event.set()
+        if self._backend_stream is not None:
+            self._backend_stream.cancel()
+
+    def __iter__(self):
+        cache_key, cached_text = lookup_cached_response(self.operation, self.source_text, self.option)
+        if cached_text is not None:
+            self.text = cached_text
+            yield cached_text
+            return
+
+        if not is_api_configured():
+            raise GeminiError("Error: Gemini API not configured (API key missing).")
+
+        requests = get_gemini_requests()
+        attempt = 0
+        while True:
+            attempt += 1
+            acquired = recorded = False
+            try:
+                requests.acquire()
+                acquired = True
+                self._backend_stream = get_client().stream(self.prompt)
+                if self.cancelled: # cancel() may have run before there was a stream to cancel
+                    self._backend_stream.cancel()
+                    return
+                for piece in self._backend_stream:
+                    if self.cancelled:
+                        return
+                    self.text += piece
+                    yield piece
+                requests.record()
+                recorded = True
+                break
+            except Exception as e:
+                if self.cancelled:
+                    return # Errors caused by our own cancellation are not failures
+                requests.record(e)
+                recorded = True
+                # Only a stream that failed before its first chunk is retried; the user is already reading the rest
+                delay = None if self.text else requests.retry_delay(e, attempt)
+                if delay is None:
+                    print(f"Gemini API Error (streaming {self.operation}): {e}")
+                    raise GeminiError(f"Error during {self.operation}: {e}") from e
+                print(f"[Gemini] Streaming {self.operation} failed ({e}), retry {attempt} in {delay:.1f}s.")
+                if self._cancel_event.wait(delay):
+                    return
+            finally:
+                if acquired and not recorded:
+                    # Cancelled or abandoned before the API answered: if this was the circuit breaker's
+                    # half-open probe, it must be handed back or no request would ever be let through again
+                    requests.release()
+
+        if not self.cancelled:
+            store_cached_response(self.operation, cache_key, self.text.strip())
+
+
+def plan_translation_chunks(text, max_chunk_tokens=CHUNK_TOKEN_BUDGET):
+    """
+    Decides whether text needs to be translated in pieces. Returns None if it fits in one request,
+    otherwise the (chunk, separator_after) list from text_chunking.split_text_into_chunks.
+    The character budget per chunk is calibrated with the model's own token count for the whole text.
+    """
+    if len(text) / CHARS_PER_TOKEN_ESTIMATE <= max_chunk_tokens * 0.5:
+        return None # Clearly short; not worth a count_tokens round trip
+    try:
+        client = get_client()
+        # One attempt only: a failed count falls back to the estimate below rather than delaying the translation
+        total_tokens = get_gemini_requests().call(client.count_tokens, text, key=("count_tokens", client.model_name, text),
+                                                  max_attempts=1)
+    except Exception as e:
+        print(f"[Gemini] Token count failed ({e}), estimating from the text length instead.")
+        total_tokens = len(text) / CHARS_PER_TOKEN_ESTIMATE
+    if total_tokens <= max_chunk_tokens:
+        return None
+    chars_per_token = len(text) / max(1, total_tokens)
+    chunks = split_text_into_chunks(text, int(max_chunk_tokens * chars_per_token))
+    print(f"[Gemini] Text has ~{total_tokens} tokens, translating it in {len(chunks)} chunks.")
+    return chunks
+
+
+def request_translation(text_to_translate, target_language, cancel_event=None):
+    """
+    Cached, non-streaming translation of one piece of text. Raises instead of returning error strings,
+    so callers never have to tell a failure from a translation by its wording.
+    """
+    return _request_cached("translate", text_to_translate, target_language,
+                           build_translation_prompt(text_to_translate, target_language), cancel_event)
+
+
+class TranslationStream:
+    """
+    Streaming translation that works for texts of any length; same interface as GeminiStream.
+    Short texts are streamed as a single request. Long texts are split at paragraph/sentence
+    boundaries, the chunks are translated concurrently (at most max_parallel at a time) and yielded
+    in document order as soon as each one and all chunks before it are done.
+    """
+    def __init__(self, source_text, target_language, max_parallel=MAX_PARALLEL_CHUNKS, chunks=None, cache_lookup=None):
+        self.operation = "translate"
+        self.source_text = source_text
+        self.target_language = target_language
+        self.max_parallel = max(1, max_parallel)
+        self.chunks = chunks # Planned on first iteration (off the main thread) when not given
+        self.cache_lookup = cache_lookup # (cache_key, cached_text) of a response-cache lookup the caller already made
+        self.text = "" # Everything yielded so far
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._single_stream = None
+        self._executor = None
+        self._futures = []
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        if self._cancel_event.is_set():
+            return
+        self._cancel_event.set()
+        with self._lock:
+            if self._single_stream is not None:
+                self._single_stream.cancel()
+            for future in self._futures:
+                future.cancel() # Chunks already being translated finish in the background and are dropped
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+
+    def __iter__(self):
+        chunks = self.chunks if self.chunks is not None else plan_translation_chunks(self.source_text)
+        if self.cancelled:
+            return
+        if chunks is None:
+            yield from self._iter_single_request()
+        else:
+            yield from self._iter_chunks(chunks)
+
+    def _iter_single_request(self):
+        stream = GeminiStream("translate", self.source_text, self.target_language,
+                              build_translation_prompt(self.source_text, self.target_language))
+        with self._lock:
+            self._single_stream = stream
+        if self.cancelled:
+            return
+        for piece in stream:
+            self.text += piece
+            yield piece
+
+    def _iter_chunks(self, chunks):
+        cache_key, cached_text = self.cache_lookup or lookup_cached_response("translate", self.source_text,
+                                                                             self.target_language)
+        if cached_text is not None:
+            self.text = cached_text
+            yield cached_text
+            return
+
+        if not is_api_configured():
+            raise GeminiError("Error: Gemini API not configured (API key missing).")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="gemini-chunk")
+        with self._lock:
+            if self.cancelled:
+                executor.shutdown(wait=False)
+                return
+            self._executor = executor
+            self._futures = [executor.submit(self._translate_chunk, chunk, index, len(chunks))
+                             for index, (chunk, _) in enumerate(chunks)]
+        try:
+            for (_, separator), future in zip(chunks, self._futures):
+                # Wait in short steps so a cancel() is noticed without waiting for the running request.
+                while not wait([future], timeout=0.1).done:
+                    if self.cancelled:
+                        return
+                if self.cancelled or future.cancelled():
+                    return
+                piece = future.result() + separator
+                self.text += piece
+                yield piece
+        finally:
+            for future in self._futures:
+                future.cancel() # No-op for finished chunks; drops queued ones after a failure or cancel
+            executor.shutdown(wait=False)
+
+        store_cached_response("translate", cache_key, self.text.strip())
+
+    def _translate_chunk(self, chunk, index, chunk_count):
+        """Translates one chunk; the request layer retries it alone (with jittered backoff) if the request fails."""
+        if not chunk.strip():
+            return chunk
+        if self.cancelled:
+            return ""
+        try:
+            return request_translation(chunk, self.target_language, cancel_event=self._cancel_event)
+        except Exception as e:
+            print(f"Gemini API Error (translating chunk {index + 1}/{chunk_count}): {e}")
+            raise GeminiError(f"Error during translation of part {index + 1} of {chunk_count}: {e}") from e
+
+
+def stream_translate_text_with_gemini(text_to_translate, target_language="pt-BR"):
+    """
+    Streaming variant of translate_text_with_gemini. Returns a TranslationStream; nothing is sent until it is
+    iterated. Long texts are translated in parallel chunks and streamed back chunk by chunk, in order.
+    """
+    print(f"[Gemini] Requesting streaming translation for: '{text_to_translate[:50]}...' to {target_language}")
+    return TranslationStream(text_to_translate, target_language)
+
 
 # --- Direct Test Block ---
 if __name__ == '__main__':
  
     # Ensure your GOOGLE_API_KEY is set as an environment variable for live tests.
-    # Or set SIMULATE_GEMINI = False after configuring the API key in the script for testing.
+    # Or run with GEMINI_BACKEND=simulate (no network) or GEMINI_BACKEND=http://127.0.0.1:8765
+    # against benchmarks/gemini_standin.py.
     
     print("--- Testing Gemini Utils ---")
-    # print("Ensure GOOGLE_API_KEY is set in your environment for live tests, or SIMULATE_GEMINI=False above.")
 
     sample_text_en = "The quick brown fox jumps over the lazy dog. This is a classic pangram used to test typewriters and keyboards. It contains all letters of the English alphabet."
     sample_text_pt = "A rápida raposa marrom salta sobre o cão preguiçoso. Este é um pangrama clássico usado para testar máquinas de escrever e teclados. Ele contém todas as letras do alfabeto."
     
     # Test Translation
     print("\n--- Testing Translation ---")
-    # Set SIMULATE_GEMINI = False and ensure API key is configured to test live
     translated = translate_text_with_gemini(sample_text_en, target_language="pt-BR")
     print(f"To pt-BR: {translated}")
     translated_en = translate_text_with_gemini(sample_text_pt, target_language="en")
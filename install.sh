@@ -2,7 +2,7 @@
 
 # Install system dependencies
 sudo apt update
-sudo apt install -y python3 python3-dev python3-venv python3-pip python3-gi python3-gi-cairo gir1.2-gtk-3.0 libgtk-3-dev tesseract-ocr tesseract-ocr-eng tesseract-ocr-por gnome-screenshot scrot xclip
+sudo apt install -y python3 python3-dev python3-venv python3-pip python3-gi python3-gi-cairo gir1.2-gtk-3.0 libgtk-3-dev tesseract-ocr tesseract-ocr-eng tesseract-ocr-por python3-tesserocr gnome-screenshot scrot
 
 # Create and activate virtual environment
 python3 -m venv --system-site-packages venv
@@ -25,6 +25,18 @@ gsettings set org.gnome.settings-daemon.plugins.media-keys.custom-keybinding:/or
 gsettings set org.gnome.settings-daemon.plugins.media-keys.custom-keybinding:/org/gnome/settings-daemon/plugins/media-keys/custom-keybindings/custom0/ command "$VENV_PYTHON $APP_PATH"
 gsettings set org.gnome.settings-daemon.plugins.media-keys.custom-keybinding:/org/gnome/settings-daemon/plugins/media-keys/custom-keybindings/custom0/ binding "$KEYBINDING"
 
+# Start the resident daemon at login so the shortcut only has to wake up a warm process
+AUTOSTART_DIR="$HOME/.config/autostart"
+mkdir -p "$AUTOSTART_DIR"
+cat > "$AUTOSTART_DIR/ubuntu-ai-app-daemon.desktop" <<EOF
+[Desktop Entry]
+Type=Application
+Name=Screenshot Tool (background)
+Exec=$VENV_PYTHON $APP_PATH --daemon
+X-GNOME-Autostart-enabled=true
+NoDisplay=true
+EOF
+
 echo "Dependencies installed and keyboard shortcut configured!"
 
 echo "Dependencies installed!"
\ No newline at end of file
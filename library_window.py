@@ -0,0 +1,171 @@
+# library_window.py
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GdkPixbuf, Pango, GLib
+import datetime
+import time
+
+from screenshot_library import get_screenshot_library, SNIPPET_START, SNIPPET_END
+
+RESULT_LIMIT = 50
+THUMBNAIL_ROW_SIZE = 96 # Longest side of the thumbnails in the result list
+STATUS_REFRESH_SECONDS = 2
+
+
+def snippet_to_markup(snippet):
+    """Pango markup of a SearchHit snippet, with the matched words in bold."""
+    markup = GLib.markup_escape_text(" ".join((snippet or "").split()))
+    return markup.replace(SNIPPET_START, "<b>").replace(SNIPPET_END, "</b>")
+
+
+class LibraryWindow(Gtk.Window):
+    """
+    Search over the OCR text of every saved screenshot. Results update as you type; activating
+    one opens it in the screenshot preview.
+    """
+    def __init__(self, quit_on_close=True):
+        super().__init__(title="Screenshot Library")
+        self.library = get_screenshot_library()
+        self.quit_on_close = quit_on_close
+
+        self.set_default_size(640, 560)
+        self.set_position(Gtk.WindowPosition.CENTER_ALWAYS)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_border_width(10)
+        self.add(box)
+
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search the text in your screenshots")
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        self.search_entry.connect("activate", self.on_search_activate)
+        box.pack_start(self.search_entry, False, False, 0)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        self.result_list = Gtk.ListBox()
+        self.result_list.set_selection_mode(Gtk.SelectionMode.BROWSE)
+        self.result_list.set_activate_on_single_click(False)
+        self.result_list.connect("row-activated", self.on_row_activated)
+        scrolled.add(self.result_list)
+        box.pack_start(scrolled, True, True, 0)
+
+        bottom_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        box.pack_start(bottom_box, False, False, 0)
+        self.result_label = Gtk.Label(xalign=0)
+        bottom_box.pack_start(self.result_label, True, True, 0)
+        self.status_label = Gtk.Label(xalign=1)
+        bottom_box.pack_start(self.status_label, False, False, 0)
+
+        self.connect("key-press-event", self.on_key_press)
+        self.connect("destroy", self.on_destroy)
+        self.status_timeout_id = GLib.timeout_add_seconds(STATUS_REFRESH_SECONDS, self.update_status)
+        self.update_status()
+        self.run_search("")
+
+    def on_search_changed(self, entry):
+        self.run_search(entry.get_text())
+
+    def on_search_activate(self, entry):
+        row = self.result_list.get_row_at_index(0)
+        if row is not None:
+            self.on_row_activated(self.result_list, row)
+
+    def run_search(self, query):
+        # FTS5 answers from its index in a few milliseconds, so there is no need to leave the main thread.
+        start = time.perf_counter()
+        hits = self.library.search(query, limit=RESULT_LIMIT)
+        search_ms = (time.perf_counter() - start) * 1000
+        for row in self.result_list.get_children():
+            self.result_list.remove(row)
+        for hit in hits:
+            self.result_list.add(self.create_row(hit))
+        self.result_list.show_all()
+        if query.strip():
+            self.result_label.set_text(f"{len(hits)}{'+' if len(hits) == RESULT_LIMIT else ''} matches "
+                                       f"in {search_ms:.1f} ms")
+        else:
+            self.result_label.set_text("Most recent screenshots")
+
+    def create_row(self, hit):
+        row = Gtk.ListBoxRow()
+        row.hit = hit
+        row_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        row_box.set_border_width(4)
+        row.add(row_box)
+
+        thumbnail = self.load_thumbnail(hit.id)
+        image = Gtk.Image.new_from_pixbuf(thumbnail) if thumbnail else \
+            Gtk.Image.new_from_icon_name("image-x-generic", Gtk.IconSize.DIALOG)
+        image.set_size_request(THUMBNAIL_ROW_SIZE, THUMBNAIL_ROW_SIZE)
+        row_box.pack_start(image, False, False, 0)
+
+        text_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        row_box.pack_start(text_box, True, True, 0)
+        when = datetime.datetime.fromtimestamp(hit.mtime).strftime("%Y-%m-%d %H:%M")
+        title_label = Gtk.Label(xalign=0)
+        title_label.set_markup(f"<b>{GLib.markup_escape_text(GLib.path_get_basename(hit.path))}</b>  "
+                               f"<small>{when}, {hit.width}x{hit.height}</small>")
+        title_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        text_box.pack_start(title_label, False, False, 0)
+        snippet_label = Gtk.Label(xalign=0)
+        snippet_label.set_markup(snippet_to_markup(hit.snippet))
+        snippet_label.set_line_wrap(True)
+        snippet_label.set_lines(3)
+        snippet_label.set_ellipsize(Pango.EllipsizeMode.END)
+        text_box.pack_start(snippet_label, False, False, 0)
+        return row
+
+    def load_thumbnail(self, screenshot_id):
+        data = self.library.thumbnail(screenshot_id)
+        if not data:
+            return None
+        loader = GdkPixbuf.PixbufLoader.new_with_type("jpeg")
+        try:
+            loader.write(data)
+            loader.close()
+        except GLib.Error as e:
+            print(f"Library: unreadable thumbnail {screenshot_id}: {e}")
+            return None
+        pixbuf = loader.get_pixbuf()
+        scale = THUMBNAIL_ROW_SIZE / max(pixbuf.get_width(), pixbuf.get_height())
+        if scale < 1:
+            pixbuf = pixbuf.scale_simple(max(1, round(pixbuf.get_width() * scale)),
+                                         max(1, round(pixbuf.get_height() * scale)), GdkPixbuf.InterpType.BILINEAR)
+        return pixbuf
+
+    def on_row_activated(self, list_box, row):
+        from display_window import show_screenshot
+        print(f"Library: opening '{row.hit.path}'.")
+        show_screenshot(row.hit.path, quit_on_close=False)
+
+    def update_status(self):
+        pending = self.library.pending()
+        status = f"{self.library.count()} screenshots indexed"
+        self.status_label.set_text(f"{status}, {pending} waiting" if pending else status)
+        return True # Keep the timeout running
+
+    def on_key_press(self, widget, event):
+        if event.keyval == Gdk.KEY_Escape:
+            self.close()
+            return True
+        return False
+
+    def on_destroy(self, widget):
+        GLib.source_remove(self.status_timeout_id)
+        if self.quit_on_close:
+            Gtk.main_quit()
+
+
+def show_library(quit_on_close=True):
+    """Opens the library search window (and starts the indexer if it is not running yet)."""
+    get_screenshot_library().start()
+    win = LibraryWindow(quit_on_close=quit_on_close)
+    win.show_all()
+    win.search_entry.grab_focus()
+    return win
+
+
+if __name__ == "__main__":
+    show_library()
+    Gtk.main()
@@ -0,0 +1,253 @@
+# live_watch.py
+# Watching one screen region: OCR and translation that follow its text as it changes (subtitles, a
+# chat pane, a game dialog box). This is the engine, without GTK; watch_overlay.py captures the
+# frames and shows the results.
+#
+# Most frames of a watched region are identical to the one before, so each frame is first reduced
+# to a small grayscale signature and compared with the last frame that was recognized; only frames
+# that changed are OCR'd, and only once they stop changing (a fade or a line being typed would
+# otherwise be read half-drawn). The recognized text is split into units (short blocks, or the lines
+# of long ones) and only units not seen before are translated, so a new subtitle is one request and
+# a chat pane that scrolls by one message does not retranslate the others.
+#
+# CpuBudget stretches the capture interval when the watch uses more CPU than it may (capture, diff
+# and OCR all count, including the screenshot tool's child processes) and shrinks it back when it
+# has room.
+#
+#   UBUNTU_AI_WATCH_FPS=2       Highest capture rate, in frames per second
+#   UBUNTU_AI_WATCH_CPU=0.25    CPU budget, as a fraction of one core
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app_env import env_number
+from gemini_utils import request_translation
+from ocr_result import OCRResult
+from ocr_utils import extract_words_from_image
+
+WATCH_FPS = env_number("UBUNTU_AI_WATCH_FPS", 2.0, float, minimum=0.1)
+WATCH_CPU_BUDGET = env_number("UBUNTU_AI_WATCH_CPU", 0.25, float, minimum=0.01, maximum=1.0)
+MAX_INTERVAL_SECONDS = 5.0 # Slowest the budget may push the capture rate
+BUDGET_WINDOW_SECONDS = 3.0 # CPU use is measured over windows this long
+INTERVAL_STEP = 1.5 # Factor the interval grows or shrinks by per window
+
+DIFF_MAX_PIXELS = 40_000 # Signatures are downscaled to at most this many pixels (about 1 ms per frame)
+DIFF_PIXEL_THRESHOLD = 24 # Gray levels a signature pixel must move by to count as changed (encoder/AA noise)
+DIFF_MIN_CHANGED_PIXELS = 6 # Changed signature pixels that make a frame "different" (a changed letter or two)
+MAX_SETTLE_SECONDS = 2.0 # A region that never stops changing (a video behind the text) is OCR'd this often
+
+MAX_BLOCK_LINES = 3 # Blocks up to this many lines are translated whole (a two-line subtitle keeps its context)
+TRANSLATION_MEMORY_UNITS = 500
+FAILED_RETRY_SECONDS = 30.0 # A unit whose translation failed is not sent again before this
+
+
+class FrameDiff:
+    """Cheap change detection: a downscaled grayscale signature per frame, compared pixel by pixel."""
+    def __init__(self, max_pixels=DIFF_MAX_PIXELS, pixel_threshold=DIFF_PIXEL_THRESHOLD,
+                 min_changed_pixels=DIFF_MIN_CHANGED_PIXELS):
+        self.max_pixels = max_pixels
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+
+    def signature(self, image):
+        """The PIL image reduced (box filter, so one-pixel strokes still register) to a small int16 gray array."""
+        factor = max(1, math.ceil(math.sqrt(image.width * image.height / self.max_pixels)))
+        if factor > 1:
+            image = image.reduce(factor)
+        return np.asarray(image.convert("L"), dtype=np.int16)
+
+    def differs(self, signature, other):
+        if other is None or signature.shape != other.shape:
+            return True
+        changed = np.count_nonzero(np.abs(signature - other) > self.pixel_threshold)
+        return changed >= self.min_changed_pixels
+
+
+def cpu_seconds():
+    """CPU time used by this process and its finished child processes (the screenshot tools)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class CpuBudget:
+    """Adapts the capture interval so the process stays under budget (a fraction of one core) on average."""
+    def __init__(self, budget=WATCH_CPU_BUDGET, fps=WATCH_FPS, max_interval=MAX_INTERVAL_SECONDS,
+                 window=BUDGET_WINDOW_SECONDS, clock=time.monotonic, cpu_clock=cpu_seconds):
+        self.budget = budget
+        self.min_interval = 1.0 / max(0.01, fps)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.interval = self.min_interval
+        self.window = window
+        self.usage = 0.0 # CPU use over the last full window, as a fraction of one core
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+        self._window_start = clock()
+        self._window_cpu = cpu_clock()
+
+    def update(self):
+        """Call once per frame; returns the interval to wait before the next one, in seconds."""
+        now = self._clock()
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            cpu = self._cpu_clock()
+            self.usage = (cpu - self._window_cpu) / elapsed
+            self._window_start, self._window_cpu = now, cpu
+            if self.usage > self.budget:
+                self.interval = min(self.max_interval, self.interval * INTERVAL_STEP)
+            elif self.usage < self.budget / 2:
+                self.interval = max(self.min_interval, self.interval / INTERVAL_STEP)
+        return self.interval
+
+
+def split_units(text, max_block_lines=MAX_BLOCK_LINES):
+    """
+    The translation units of OCR text (blocks separated by blank lines, as OCRResult.text lays them
+    out): short blocks whole, long blocks line by line. Whitespace is normalized, so OCR spacing
+    jitter does not make a known unit look new.
+    """
+    units = []
+    for block in text.split("\n\n"):
+        lines = [" ".join(line.split()) for line in block.splitlines()]
+        lines = [line for line in lines if line]
+        if len(lines) <= max_block_lines:
+            if lines:
+                units.append("\n".join(lines))
+        else:
+            units.extend(lines)
+    return units
+
+
+class WatchStats:
+    def __init__(self):
+        self.frames = 0
+        self.unchanged = 0 # Frames skipped because they matched the last recognized one
+        self.recognized = 0
+        self.translated = 0 # Units sent to Gemini (the others were known)
+        self.last_ocr_ms = None
+        self.errors = 0
+
+
+class RegionWatcher:
+    """
+    The state of one watch. Feed it frames with process_frame() (from one thread); it decides which
+    ones to recognize and which units to translate, on its own workers, and calls on_update(watcher)
+    from those workers whenever units() changed.
+    ocr is called like ocr_utils.extract_words_from_image; translate(text, target_language) returns the
+    translation and raises on failure (default: gemini_utils.request_translation).
+    """
+    def __init__(self, box, target_language=None, lang=None, on_update=None, frame_diff=None, ocr=None, translate=None):
+        self.box = box # (left, top, right, bottom) on screen, in capture pixels
+        self.target_language = target_language # None: show the recognized text only
+        self.lang = lang
+        self.on_update = on_update or (lambda watcher: None)
+        self.frame_diff = frame_diff or FrameDiff()
+        self._ocr = ocr or extract_words_from_image
+        self._translate = translate or request_translation
+        self.stats = WatchStats()
+        self.message = None # Why there is no text to show (OCR failed, nothing found), or None
+        self._units = [] # Units of the last recognized frame, in reading order
+        self._translations = OrderedDict() # unit -> translation, least recently shown first
+        self._pending = set() # Units being translated
+        self._failed = {} # unit -> time.monotonic() of its last failed translation
+        self._lock = threading.Lock()
+        self._last_signature = None
+        self._recognized_signature = None
+        self._changing_since = None
+        self._ocr_future = None
+        self._ocr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watch-ocr")
+        self._translate_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="watch-translate")
+
+    def process_frame(self, captured_image, now=None):
+        """Looks at one captured frame; returns True if it was handed to OCR."""
+        now = time.monotonic() if now is None else now
+        self.stats.frames += 1
+        signature = self.frame_diff.signature(captured_image.image)
+        settled = not self.frame_diff.differs(signature, self._last_signature)
+        self._last_signature = signature
+        if not self.frame_diff.differs(signature, self._recognized_signature):
+            self._changing_since = None
+            self.stats.unchanged += 1
+            return False
+        if self._changing_since is None:
+            self._changing_since = now
+        first_frame = self._recognized_signature is None
+        if not (settled or first_frame) and now - self._changing_since < MAX_SETTLE_SECONDS:
+            return False # Still changing: wait for it to settle
+        if self._ocr_future is not None and not self._ocr_future.done():
+            return False # OCR busy with an earlier frame; this one is looked at again on the next tick
+        self._recognized_signature = signature
+        self._changing_since = None
+        self._ocr_future = self._ocr_executor.submit(self._recognize, captured_image)
+        return True
+
+    def _recognize(self, captured_image):
+        start = time.perf_counter()
+        # Frames are not cached: the diff already skips repeats, and they would push real captures out of the OCR cache
+        result = self._ocr(captured_image, lang=self.lang, use_cache=False, allow_tiling=False)
+        self.stats.last_ocr_ms = (time.perf_counter() - start) * 1000
+        self.stats.recognized += 1
+        if not isinstance(result, OCRResult):
+            self.stats.errors += 1
+            with self._lock:
+                self.message = result if isinstance(result, str) else "OCR failed."
+            self.on_update(self)
+            return
+        units = split_units(result.text)
+        with self._lock:
+            self._units = units
+            self.message = None if units else "No text in the region."
+            new_units = []
+            if self.target_language:
+                now = time.monotonic()
+                for unit in units:
+                    if unit in self._translations:
+                        self._translations.move_to_end(unit)
+                    elif unit not in self._pending and not self._failed_recently(unit, now):
+                        self._pending.add(unit)
+                        new_units.append(unit)
+        for unit in new_units:
+            self._translate_executor.submit(self._translate_unit, unit)
+        self.on_update(self)
+
+    def _failed_recently(self, unit, now):
+        failed_at = self._failed.get(unit)
+        return failed_at is not None and now - failed_at < FAILED_RETRY_SECONDS
+
+    def _translate_unit(self, unit):
+        try:
+            translated = self._translate(unit, self.target_language)
+        except Exception as e:
+            print(f"Watch: translation failed: {e}")
+            with self._lock:
+                self._pending.discard(unit)
+                self.stats.translated += 1
+                self.stats.errors += 1
+                self._failed.pop(unit, None)
+                self._failed[unit] = time.monotonic() # Tried again after FAILED_RETRY_SECONDS if still shown
+                while len(self._failed) > TRANSLATION_MEMORY_UNITS:
+                    del self._failed[next(iter(self._failed))]
+            return
+        with self._lock:
+            self._pending.discard(unit)
+            self.stats.translated += 1
+            self._failed.pop(unit, None)
+            self._translations[unit] = translated
+            while len(self._translations) > TRANSLATION_MEMORY_UNITS:
+                self._translations.popitem(last=False)
+            visible = unit in self._units
+        if visible:
+            self.on_update(self)
+
+    def units(self):
+        """[(unit, translation or None while it is pending or when not translating)] of the current text."""
+        with self._lock:
+            return [(unit, self._translations.get(unit)) for unit in self._units]
+
+    def close(self):
+        self._ocr_executor.shutdown(wait=False, cancel_futures=True)
+        self._translate_executor.shutdown(wait=False, cancel_futures=True)
@@ -11,14 +11,14 @@ from display_window import show_screenshot
 
 def run_capture_and_display(full_screen=True):
     print(f"Starting capture (full_screen={full_screen})...")
-    temp_image_path = capture_screen(full_screen=full_screen)
+    captured_image = capture_screen(full_screen=full_screen)
 
-    if temp_image_path:
-        print(f"Screenshot captured: {temp_image_path}")
+    if captured_image:
+        print(f"Screenshot captured: {captured_image.width}x{captured_image.height}")
         # The show_screenshot function will now be responsible for the Gtk.main() loop
         # if it's the only GTK interaction.
         # If we have a persistent main app window later, Gtk.main() will be called once.
-        show_screenshot(temp_image_path, is_temporary_file=True)
+        show_screenshot(captured_image)
         Gtk.main() # Start GTK loop to make the window visible and interactive
         print("Display window closed, Gtk.main() exited.")
     else:
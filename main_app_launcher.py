@@ -1,10 +1,12 @@
 # main_app_launcher.py
-import gi
-gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk
 import os
 import sys
-import time # For any debugging delays if needed
+import time
+import argparse
+
+# Only stdlib imports above this point: when a daemon is running the launcher is a thin
+# client and should exit before paying for Gtk, Gemini, Tesseract, PIL, etc.
+import app_daemon
 
 # Ensure the script's directory is the current working directory
 # This helps with relative imports and finding utility files.
@@ -12,59 +14,174 @@ APP_DIR = os.path.dirname(os.path.abspath(__file__))
 os.chdir(APP_DIR)
 print(f"MAIN_APP: Changed CWD to: {APP_DIR}")
 
-# Import your project modules
-from capture_utils import capture_screen
-from display_window import show_screenshot # This is your ScreenshotDisplayWindow logic
-from capture_mode_dialog import CaptureModeSelectionDialog # The new dialog
 
-def run_main_application_flow(capture_mode_is_full_screen):
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ubuntu AI Screenshot Enhancer")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident in the background and serve capture requests from the launcher.")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Always run the capture flow in this process, even if a daemon is running.")
+    parser.add_argument("--latency-report", action="store_true",
+                        help="Print the recorded cold-start vs warm-start launch latencies and exit.")
+    parser.add_argument("--library", action="store_true",
+                        help="Open the screenshot library search instead of the capture dialog.")
+    return parser.parse_args()
+
+
+def select_capture_mode(launch_time=None, launch_mode="cold", trace_id=None):
+    """
+    Shows the capture mode selection dialog.
+    Returns 'area', 'full', 'library', or None if the user cancelled.
+    """
+    mode_dialog = CaptureModeSelectionDialog()
+    # The dialog calls show_all() in its constructor, so it is on screen once the pending draw happens.
+    mode_dialog.connect("map-event", on_mode_dialog_mapped, launch_mode, launch_time, trace_id)
+    with span("mode_dialog", trace_id) as dialog_span:
+        response = mode_dialog.run() # This blocks until the dialog emits a response
+
+        chosen_mode = None
+        if response == Gtk.ResponseType.OK:
+            chosen_mode = mode_dialog.get_selected_mode()
+            print(f"MAIN_APP: Mode selected from dialog: {chosen_mode}")
+        else:
+            print("MAIN_APP: Capture mode selection cancelled or dialog closed.")
+        dialog_span.set(mode=chosen_mode)
+
+    mode_dialog.destroy() # Important to destroy the dialog
+    return chosen_mode
+
+
+def on_mode_dialog_mapped(widget, event, launch_mode, launch_time, trace_id):
+    app_daemon.record_launch_latency(launch_mode, launch_time)
+    record_span("launch_to_dialog", trace_id, launch_time, time.time(), launch_mode=launch_mode)
+
+
+def run_main_application_flow(capture_mode_is_full_screen, quit_on_close=True, trace_id=None):
     """
     Handles the main flow after capture mode is selected:
     1. Takes screenshot.
     2. Shows display window with buttons.
+    Returns True if the display window was shown.
     """
     print(f"MAIN_APP: Proceeding with capture. Full screen: {capture_mode_is_full_screen}")
-    temp_image_path = capture_screen(full_screen=capture_mode_is_full_screen)
-
-    if temp_image_path:
-        print(f"MAIN_APP: Screenshot captured: {temp_image_path}")
-        # The show_screenshot function from display_window.py handles its own window
-        # and ScreenshotDisplayWindow's on_destroy calls Gtk.main_quit()
-        show_screenshot(temp_image_path, is_temporary_file=True)
-        # Gtk.main() will be started after this function returns, or if already running,
-        # this new window will join the existing loop.
-    else:
-        print("MAIN_APP: Screenshot capture failed or was cancelled. Exiting application.")
-        Gtk.main_quit() # Quit if capture fails early
+    captured_image = capture_screen(full_screen=capture_mode_is_full_screen, capture_id=trace_id)
+
+    if captured_image:
+        print(f"MAIN_APP: Screenshot captured in memory ({captured_image.width}x{captured_image.height}).")
+        # The show_screenshot function from display_window.py handles its own window.
+        # ScreenshotDisplayWindow's on_destroy calls Gtk.main_quit() unless quit_on_close is False.
+        show_screenshot(captured_image, quit_on_close=quit_on_close)
+        return True
+    print("MAIN_APP: Screenshot capture failed or was cancelled.")
+    return False
+
+
+# --- Daemon mode ---
+
+_daemon_flow_active = False
+
+def handle_daemon_capture_request(launch_time):
+    """Runs one hotkey -> dialog -> capture -> preview cycle inside the resident daemon."""
+    global _daemon_flow_active
+    if _daemon_flow_active:
+        print("DAEMON: A capture dialog is already open, ignoring request.")
+        return
+    _daemon_flow_active = True
+    try:
+        trace_id = new_trace_id() # Follows this interaction from the hotkey to the translation (see tracing.py)
+        chosen_mode = select_capture_mode(launch_time=launch_time, launch_mode="warm", trace_id=trace_id)
+        if chosen_mode == "library":
+            handle_daemon_library_request()
+        elif chosen_mode:
+            run_main_application_flow(capture_mode_is_full_screen=(chosen_mode == "full"), quit_on_close=False,
+                                      trace_id=trace_id)
+    finally:
+        _daemon_flow_active = False
+
+
+_daemon_library_window = None
+
+def handle_daemon_library_request():
+    """Shows the library search window of the daemon, reusing it if it is already open."""
+    global _daemon_library_window
+    if _daemon_library_window is not None:
+        _daemon_library_window.present()
+        return
+    _daemon_library_window = show_library(quit_on_close=False)
+    _daemon_library_window.connect("destroy", on_daemon_library_window_destroyed)
+
+
+def on_daemon_library_window_destroyed(widget):
+    global _daemon_library_window
+    _daemon_library_window = None
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    launch_time = app_daemon.get_process_start_time()
+
+    if args.latency_report:
+        app_daemon.print_latency_report()
+        sys.exit(0)
+
+    if not args.daemon and not args.no_daemon:
+        # Thin client path: hand the request to a warm daemon if one is listening.
+        command = "library" if args.library else "capture"
+        if app_daemon.send_request(command, launch_time=launch_time) == "OK":
+            print(f"MAIN_APP: {command.capitalize()} request handed to the running daemon.")
+            sys.exit(0)
+
     print("MAIN_APP: Application starting...")
+    import gi
+    gi.require_version('Gtk', '3.0')
+    from gi.repository import Gtk
 
-    # 1. Show the capture mode selection dialog first
-    mode_dialog = CaptureModeSelectionDialog()
-    response = mode_dialog.run() # This blocks until the dialog emits a response
+    # Import your project modules
+    from capture_utils import capture_screen
+    from display_window import show_screenshot # This is your ScreenshotDisplayWindow logic
+    from capture_mode_dialog import CaptureModeSelectionDialog # The new dialog
+    from library_window import show_library
+    from tracing import new_trace_id, record_span, span
 
-    chosen_mode = None
-    if response == Gtk.ResponseType.OK:
-        chosen_mode = mode_dialog.get_selected_mode()
-        print(f"MAIN_APP: Mode selected from dialog: {chosen_mode}")
-    else:
-        print("MAIN_APP: Capture mode selection cancelled or dialog closed. Exiting.")
-        mode_dialog.destroy()
-        sys.exit(0) # Exit cleanly if no mode is chosen
+    if args.daemon:
+        # Pay for the Gemini SDK import and model set-up now rather than on the first translation
+        import threading
+        from gemini_utils import get_client
+        threading.Thread(target=get_client().warm_up, daemon=True).start()
+        # Same for Tesseract: load the language data once, so OCR calls only pay for recognition
+        from ocr_engine import get_ocr_engine
+        threading.Thread(target=lambda: get_ocr_engine().warm_up(), daemon=True).start()
+        from ocr_tiling import warm_up_pool
+        threading.Thread(target=warm_up_pool, daemon=True).start()
+        # Find the capture backends now (on the main thread, the Gdk grab needs it), not on the first hotkey press
+        from capture_backends import get_capture_registry
+        get_capture_registry()
+        # Keep the screenshot library index current (at the lowest CPU priority) for as long as the daemon runs
+        from screenshot_library import get_screenshot_library
+        get_screenshot_library().start()
+        app_daemon.run_daemon(handle_daemon_capture_request, handle_daemon_library_request)
+        sys.exit(0)
 
-    mode_dialog.destroy() # Important to destroy the dialog
+    # 1. Show the capture mode selection dialog first
+    trace_id = new_trace_id()
+    chosen_mode = "library" if args.library else select_capture_mode(launch_time=launch_time, launch_mode="cold",
+                                                                      trace_id=trace_id)
+    if not chosen_mode:
+        print("MAIN_APP: Exiting.")
+        sys.exit(0) # Exit cleanly if no mode is chosen
+    if chosen_mode == "library":
+        show_library()
+        Gtk.main() # Quit when the library window is closed
+        print("MAIN_APP: Application has finished.")
+        sys.exit(0)
 
     # 2. Proceed based on selection
-    if chosen_mode:
-        is_full_screen = (chosen_mode == "full")
-        run_main_application_flow(capture_mode_is_full_screen=is_full_screen)
-        
+    is_full_screen = (chosen_mode == "full")
+    if run_main_application_flow(capture_mode_is_full_screen=is_full_screen, trace_id=trace_id):
         print("MAIN_APP: Starting Gtk.main() loop to manage ScreenshotDisplayWindow.")
         Gtk.main() # This starts the main GTK loop for the ScreenshotDisplayWindow
                    # It will be quit by ScreenshotDisplayWindow's on_destroy method.
     else:
-        # This case should ideally be handled by the exit after dialog.run()
-        print("MAIN_APP: No mode chosen (should not happen if logic is correct). Exiting.")
+        print("MAIN_APP: Nothing to display. Exiting.")
 
     print("MAIN_APP: Application has finished.")
@@ -0,0 +1,151 @@
+# ocr_cache.py
+# Content-addressed cache for OCR results.
+#
+# Keys are a hash of the decoded pixels plus the OCR parameters, so the same capture (or a
+# re-capture of an unchanged screen) maps to the same entry no matter which temp file it came from.
+# There is a small in-memory LRU tier and an optional on-disk tier bounded by total size.
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from app_paths import get_cache_dir
+
+MEMORY_CACHE_ENTRIES = 32
+DISK_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Set UBUNTU_AI_OCR_DISK_CACHE=0 to keep OCR text in memory only.
+DISK_CACHE_ENABLED = os.environ.get("UBUNTU_AI_OCR_DISK_CACHE", "1") != "0"
+
+
+def image_digest(img):
+    """Hex digest of a PIL image's decoded pixels (independent of file format and compression)."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode("ascii"))
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def make_cache_key(digest, lang=None, psm=None, extra=None):
+    """Combines an image digest with the OCR parameters that influence the result."""
+    params = f"lang={lang or 'default'};psm={psm if psm is not None else 'default'};{extra or ''}"
+    return hashlib.blake2b(f"{digest}|{params}".encode("utf-8"), digest_size=20).hexdigest()
+
+
+class OCRCache:
+    def __init__(self, max_memory_entries=MEMORY_CACHE_ENTRIES, disk_dir=None, max_disk_bytes=DISK_CACHE_MAX_BYTES):
+        self.max_memory_entries = max_memory_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached text for key, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        text = self._read_disk(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+        self._write_disk(key, text)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(".txt"):
+                    os.remove(entry.path)
+
+    def _remember(self, key, text):
+        # Caller holds self._lock
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    # --- Disk tier ---
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path) # Refresh mtime so eviction is least-recently-used
+            return text
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"OCR cache: could not read '{path}': {e}")
+            return None
+
+    def _write_disk(self, key, text):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            print(f"OCR cache: could not write '{path}': {e}")
+
+    def _evict_disk(self):
+        entries = []
+        total_bytes = 0
+        for entry in os.scandir(self.disk_dir):
+            if not entry.name.endswith(".txt"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes += stat.st_size
+        if total_bytes <= self.max_disk_bytes:
+            return
+        entries.sort() # Oldest first
+        for _, size, path in entries:
+            if total_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except FileNotFoundError:
+                pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_ocr_cache():
+    """Process-wide cache shared by every OCR caller (the daemon keeps it warm across captures)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            disk_dir = None
+            if DISK_CACHE_ENABLED:
+                try:
+                    disk_dir = get_cache_dir("ocr")
+                except OSError as e:
+                    print(f"OCR cache: disk tier disabled, could not create cache dir: {e}")
+            _default_cache = OCRCache(disk_dir=disk_dir)
+        return _default_cache
@@ -0,0 +1,326 @@
+# ocr_engine.py
+# Keeps Tesseract warm between OCR calls.
+#
+# pytesseract starts a new tesseract process for every call, writes the image to a temp file and
+# reloads the language data each time. With tesserocr (python3-tesserocr) the library is loaded once
+# per process and initialized engines are kept in a pool, one set per language string, so a
+# repeated OCR call only pays for recognition itself. The backend is pluggable:
+#
+#   UBUNTU_AI_OCR_ENGINE=auto           tesserocr if installed, otherwise pytesseract (default)
+#   UBUNTU_AI_OCR_ENGINE=tesserocr      Warm in-process engines
+#   UBUNTU_AI_OCR_ENGINE=pytesseract    One tesseract process per call
+#
+#   UBUNTU_AI_OCR_LANGS=eng+por         Languages used when a call does not ask for specific ones
+import os
+import statistics
+import threading
+import time
+from collections import deque, namedtuple
+
+DEFAULT_LANGUAGES = "eng"
+LATENCY_SAMPLES = 200 # Recent calls kept for the latency statistics
+
+
+class OCREngineUnavailable(Exception):
+    """Raised when no Tesseract installation can be used."""
+
+
+# One recognized word with its bounding box in image pixels. line numbers the text lines of one call
+# in Tesseract's reading order; block does the same for layout blocks.
+OCRWord = namedtuple("OCRWord", "text left top width height confidence block line")
+
+
+def words_to_text(words):
+    """Joins OCRWords into text: spaces within a line, newlines between lines, a blank line between blocks."""
+    parts = []
+    previous = None
+    for word in words:
+        if previous is not None:
+            if word.block != previous.block:
+                parts.append("\n\n")
+            elif word.line != previous.line:
+                parts.append("\n")
+            else:
+                parts.append(" ")
+        parts.append(word.text)
+        previous = word
+    return "".join(parts)
+
+
+class TesserocrBackend:
+    """
+    Pools initialized tesserocr.PyTessBaseAPI objects per language string. tesserocr releases the GIL
+    while recognizing, so up to max_workers_per_language calls run in parallel threads.
+    """
+    name = "tesserocr"
+
+    def __init__(self, max_workers_per_language=2):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.max_workers_per_language = max_workers_per_language
+        self._idle = {} # language string -> [PyTessBaseAPI]
+        self._created = {} # language string -> number of engines in existence
+        self._available = threading.Condition()
+
+    def available_languages(self):
+        return sorted(self._tesserocr.get_languages()[1])
+
+    def _acquire(self, languages):
+        with self._available:
+            while True:
+                idle = self._idle.setdefault(languages, [])
+                if idle:
+                    return idle.pop()
+                if self._created.get(languages, 0) < self.max_workers_per_language:
+                    self._created[languages] = self._created.get(languages, 0) + 1
+                    break
+                self._available.wait()
+        try:
+            # Loading the traineddata is the expensive part; do it outside the lock.
+            return self._tesserocr.PyTessBaseAPI(lang=languages)
+        except Exception:
+            with self._available:
+                self._created[languages] -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, languages, api):
+        with self._available:
+            self._idle[languages].append(api)
+            self._available.notify()
+
+    def warm_up(self, languages):
+        self._release(languages, self._acquire(languages))
+
+    def recognize(self, img, languages, psm=None):
+        api = self._acquire(languages)
+        try:
+            api.SetPageSegMode(psm if psm is not None else self._tesserocr.PSM.AUTO)
+            api.SetImage(img)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._release(languages, api)
+
+    def recognize_words(self, img, languages, psm=None):
+        RIL = self._tesserocr.RIL
+        api = self._acquire(languages)
+        words = []
+        try:
+            api.SetPageSegMode(psm if psm is not None else self._tesserocr.PSM.AUTO)
+            api.SetImage(img)
+            api.Recognize()
+            block = line = -1
+            for word_iterator in self._tesserocr.iterate_level(api.GetIterator(), RIL.WORD):
+                if word_iterator.IsAtBeginningOf(RIL.BLOCK):
+                    block += 1
+                if word_iterator.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+                text = word_iterator.GetUTF8Text(RIL.WORD)
+                box = word_iterator.BoundingBox(RIL.WORD)
+                if not text or not text.strip() or box is None:
+                    continue
+                left, top, right, bottom = box
+                words.append(OCRWord(text.strip(), left, top, right - left, bottom - top,
+                                     word_iterator.Confidence(RIL.WORD), max(block, 0), max(line, 0)))
+            return words
+        finally:
+            api.Clear()
+            self._release(languages, api)
+
+    def close(self):
+        with self._available:
+            for apis in self._idle.values():
+                for api in apis:
+                    api.End()
+            self._idle.clear()
+            self._created.clear()
+
+
+class PytesseractBackend:
+    """Runs the tesseract command line tool once per call (no warm state)."""
+    name = "pytesseract"
+
+    def __init__(self):
+        import pytesseract
+        self._pytesseract = pytesseract
+
+    def available_languages(self):
+        try:
+            return sorted(self._pytesseract.get_languages())
+        except self._pytesseract.TesseractNotFoundError as e:
+            raise OCREngineUnavailable("Tesseract is not installed or not in your PATH.") from e
+
+    def warm_up(self, languages):
+        pass # Nothing to keep warm between processes
+
+    def recognize(self, img, languages, psm=None):
+        config = f"--psm {psm}" if psm is not None else ""
+        try:
+            return self._pytesseract.image_to_string(img, lang=languages, config=config)
+        except self._pytesseract.TesseractNotFoundError as e:
+            raise OCREngineUnavailable("Tesseract is not installed or not in your PATH.") from e
+
+    def recognize_words(self, img, languages, psm=None):
+        config = f"--psm {psm}" if psm is not None else ""
+        try:
+            data = self._pytesseract.image_to_data(img, lang=languages, config=config,
+                                                   output_type=self._pytesseract.Output.DICT)
+        except self._pytesseract.TesseractNotFoundError as e:
+            raise OCREngineUnavailable("Tesseract is not installed or not in your PATH.") from e
+        words = []
+        line_numbers = {} # (block, paragraph, line) -> line number in reading order
+        for i, text in enumerate(data["text"]):
+            if data["level"][i] != 5 or not text.strip(): # 5 = word level
+                continue
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            line = line_numbers.setdefault(line_key, len(line_numbers))
+            words.append(OCRWord(text.strip(), data["left"][i], data["top"][i], data["width"][i], data["height"][i],
+                                 float(data["conf"][i]), data["block_num"][i], line))
+        return words
+
+    def close(self):
+        pass
+
+
+class LatencyStats:
+    """Thread-safe record of recent call durations."""
+    def __init__(self, max_samples=LATENCY_SAMPLES):
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds * 1000.0)
+            self.calls += 1
+
+    def summary(self):
+        with self._lock:
+            last_ms = self._samples[-1] if self._samples else None
+            samples = sorted(self._samples)
+            calls = self.calls
+        if not samples:
+            return {"calls": calls}
+        return {
+            "calls": calls,
+            "last_ms": round(last_ms, 1),
+            "mean_ms": round(statistics.mean(samples), 1),
+            "p50_ms": round(statistics.median(samples), 1),
+            "p95_ms": round(samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))], 1),
+        }
+
+
+class OCREngine:
+    def __init__(self, backend, default_languages=DEFAULT_LANGUAGES):
+        self.backend = backend
+        self.default_languages = default_languages
+        self.stats = {} # language string -> LatencyStats
+        self._stats_lock = threading.Lock()
+
+    def recognize(self, img, languages=None, psm=None):
+        """Returns the text Tesseract finds in the PIL image img. Raises OCREngineUnavailable without Tesseract."""
+        languages = languages or self.default_languages
+        start = time.perf_counter()
+        text = self.backend.recognize(img, languages, psm)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            stats = self.stats.setdefault(languages, LatencyStats())
+        stats.record(elapsed)
+        print(f"[OCR] {self.backend.name} ({languages}): {elapsed * 1000:.1f} ms for {img.size[0]}x{img.size[1]}.")
+        return text
+
+    def recognize_words(self, img, languages=None, psm=None):
+        """Like recognize, but returns OCRWord tuples (text and bounding box of every word) in reading order."""
+        languages = languages or self.default_languages
+        start = time.perf_counter()
+        words = self.backend.recognize_words(img, languages, psm)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            stats = self.stats.setdefault(languages, LatencyStats())
+        stats.record(elapsed)
+        print(f"[OCR] {self.backend.name} ({languages}): {len(words)} words in {elapsed * 1000:.1f} ms "
+              f"for {img.size[0]}x{img.size[1]}.")
+        return words
+
+    def available_languages(self):
+        return self.backend.available_languages()
+
+    def warm_up(self, languages=None):
+        """Loads the language data ahead of the first call (a no-op for pytesseract)."""
+        start = time.perf_counter()
+        self.backend.warm_up(languages or self.default_languages)
+        print(f"[OCR] {self.backend.name} ready for '{languages or self.default_languages}' "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+    def latency_report(self):
+        with self._stats_lock:
+            return {languages: stats.summary() for languages, stats in self.stats.items()}
+
+
+def create_backend(spec):
+    """Builds a backend from a UBUNTU_AI_OCR_ENGINE value."""
+    spec = (spec or "auto").strip()
+    if spec == "auto":
+        try:
+            return TesserocrBackend()
+        except ImportError:
+            return PytesseractBackend()
+    if spec == "tesserocr":
+        return TesserocrBackend()
+    if spec == "pytesseract":
+        return PytesseractBackend()
+    raise ValueError(f"Unknown UBUNTU_AI_OCR_ENGINE '{spec}' (expected 'auto', 'tesserocr' or 'pytesseract')")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine():
+    """The process-wide OCREngine, configured from UBUNTU_AI_OCR_ENGINE and UBUNTU_AI_OCR_LANGS."""
+    global _engine
+    if _engine is not None:
+        return _engine
+    with _engine_lock:
+        if _engine is None:
+            backend = create_backend(os.getenv("UBUNTU_AI_OCR_ENGINE"))
+            _engine = OCREngine(backend, default_languages=os.getenv("UBUNTU_AI_OCR_LANGS") or DEFAULT_LANGUAGES)
+            print(f"[OCR] Using engine '{backend.name}' with languages '{_engine.default_languages}'.")
+    return _engine
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from PIL import Image, ImageDraw
+
+    parser = argparse.ArgumentParser(description="Per-call OCR latency of the available engines.")
+    parser.add_argument("image", nargs="?", help="Image to OCR (default: a generated text image)")
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--lang", default=None, help="Tesseract language string, e.g. eng+por")
+    args = parser.parse_args()
+
+    if args.image:
+        sample = Image.open(args.image)
+        sample.load()
+    else:
+        sample = Image.new("L", (900, 120), 255)
+        ImageDraw.Draw(sample).text((20, 40), "The quick brown fox jumps over the lazy dog 0123456789", fill=0)
+
+    report = {}
+    for spec in ("tesserocr", "pytesseract"):
+        try:
+            engine = OCREngine(create_backend(spec), default_languages=args.lang or DEFAULT_LANGUAGES)
+            first_start = time.perf_counter()
+            engine.recognize(sample)
+            first_ms = (time.perf_counter() - first_start) * 1000.0
+            engine.stats.clear() # Report the first (cold) call separately from the warm ones
+            for _ in range(args.calls):
+                engine.recognize(sample)
+        except (ImportError, OCREngineUnavailable) as e:
+            print(f"Skipping {spec}: {e}")
+            continue
+        report[spec] = {"first_call_ms": round(first_ms, 1), **engine.latency_report()[engine.default_languages]}
+        engine.backend.close()
+    print(json.dumps(report, indent=2))
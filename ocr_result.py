@@ -0,0 +1,141 @@
+# ocr_result.py
+# Word-level OCR results with their geometry.
+#
+# OCREngine.recognize_words returns one OCRWord tuple per word, and a full-screen capture has
+# thousands of words. OCRResult keeps the same fields column by column in array.array (machine
+# integers and floats, no Python object per word) and all word texts back to back in one string.
+# A result stays small in the OCR cache and in the preview window, and lookups such as "which words
+# lie in this rectangle" run as NumPy operations on views of the columns, with no further OCR.
+import base64
+import json
+from array import array
+
+import numpy as np
+
+from ocr_engine import OCRWord, words_to_text
+
+# Bump when the serialized form changes, so cached results in the old form are not read back.
+RESULT_FORMAT_VERSION = 1
+
+_INT_COLUMNS = ("left", "top", "width", "height", "block", "line")
+
+
+class OCRResult:
+    """
+    The words found in one image, in reading order. Boxes are in pixels of the original capture
+    (not of the preprocessed image Tesseract saw). An empty OCRResult means no text was found.
+    """
+    def __init__(self):
+        for name in _INT_COLUMNS:
+            setattr(self, name, array("i"))
+        self.confidence = array("f")
+        self._texts = "" # Every word's text, back to back
+        self._text_ends = array("i") # End offset of each word's text in _texts
+        self._text = None # Full text, built on first use
+
+    @classmethod
+    def from_words(cls, words, left=0, top=0, scale_x=1.0, scale_y=1.0):
+        """
+        Builds a result from OCRWords found in a preprocessed image. left/top/scale_x/scale_y are the
+        geometry reported by ocr_preprocess.preprocess_image, used to map the boxes back to the capture.
+        """
+        result = cls()
+        texts = []
+        end = 0
+        for word in words:
+            result.left.append(int(round(left + word.left / scale_x)))
+            result.top.append(int(round(top + word.top / scale_y)))
+            result.width.append(max(1, int(round(word.width / scale_x))))
+            result.height.append(max(1, int(round(word.height / scale_y))))
+            result.block.append(word.block)
+            result.line.append(word.line)
+            result.confidence.append(word.confidence)
+            texts.append(word.text)
+            end += len(word.text)
+            result._text_ends.append(end)
+        result._texts = "".join(texts)
+        return result
+
+    def __len__(self):
+        return len(self._text_ends)
+
+    def word_text(self, index):
+        start = self._text_ends[index - 1] if index > 0 else 0
+        return self._texts[start:self._text_ends[index]]
+
+    def word(self, index):
+        return OCRWord(self.word_text(index), self.left[index], self.top[index], self.width[index],
+                       self.height[index], self.confidence[index], self.block[index], self.line[index])
+
+    def __iter__(self):
+        return (self.word(i) for i in range(len(self)))
+
+    @property
+    def text(self):
+        """All words joined like words_to_text: lines on their own line, blocks separated by a blank line."""
+        if self._text is None:
+            self._text = words_to_text(self)
+        return self._text
+
+    def text_of(self, indices):
+        """The text of the words at indices, joined in reading order."""
+        return words_to_text(self.word(i) for i in sorted(indices))
+
+    def subset(self, indices):
+        """A new OCRResult with the words at indices, in reading order."""
+        return OCRResult.from_words(self.word(i) for i in sorted(indices))
+
+    def moved(self, dx, dy):
+        """A copy with every box moved by (dx, dy) pixels, e.g. from a crop into the full capture."""
+        return OCRResult.from_words(self, left=dx, top=dy)
+
+    def _column(self, name):
+        return np.frombuffer(getattr(self, name), dtype=np.int32)
+
+    def indices_in_rect(self, x0, y0, x1, y1):
+        """Indices of the words whose centers lie inside the rectangle (capture pixels)."""
+        if not len(self):
+            return []
+        left, top = self._column("left"), self._column("top")
+        center_x = left + self._column("width") / 2
+        center_y = top + self._column("height") / 2
+        inside = (center_x >= x0) & (center_x < x1) & (center_y >= y0) & (center_y < y1)
+        return np.flatnonzero(inside).tolist()
+
+    def word_at(self, x, y, max_distance=None):
+        """
+        Index of the word whose box contains (x, y), or else the nearest one, or None if there are no
+        words or the nearest is farther away than max_distance pixels.
+        """
+        if not len(self):
+            return None
+        left, top = self._column("left"), self._column("top")
+        right, bottom = left + self._column("width"), top + self._column("height")
+        dx = np.maximum(np.maximum(left - x, x - right), 0)
+        dy = np.maximum(np.maximum(top - y, y - bottom), 0)
+        distances = dx * dx + dy * dy
+        index = int(np.argmin(distances))
+        if max_distance is not None and distances[index] > max_distance * max_distance:
+            return None
+        return index
+
+    # --- Serialization (OCR cache values are strings) ---
+
+    def to_cache_string(self):
+        columns = {name: base64.b64encode(getattr(self, name).tobytes()).decode("ascii")
+                   for name in _INT_COLUMNS + ("confidence",)}
+        return json.dumps({"v": RESULT_FORMAT_VERSION, "texts": self._texts,
+                           "ends": base64.b64encode(self._text_ends.tobytes()).decode("ascii"), **columns})
+
+    @classmethod
+    def from_cache_string(cls, value):
+        """Inverse of to_cache_string. Raises ValueError for a value in another format."""
+        data = json.loads(value)
+        if not isinstance(data, dict) or data.get("v") != RESULT_FORMAT_VERSION:
+            raise ValueError("Not an OCR result in the current format")
+        result = cls()
+        result._texts = data["texts"]
+        result._text_ends.frombytes(base64.b64decode(data["ends"]))
+        for name in _INT_COLUMNS + ("confidence",):
+            getattr(result, name).frombytes(base64.b64decode(data[name]))
+        return result
@@ -0,0 +1,200 @@
+# ocr_tiling.py
+# OCR of large captures (full-screen 4K, several monitors) in parallel tiles.
+#
+# Tesseract works on one image with one thread, so a dual-4K capture keeps one core busy for seconds.
+# Here the image is cut into regions along blank gaps (recursive XY-cut on an ink mask), so no word
+# is split: wide blank columns separate layout columns or monitors, blank rows separate lines and
+# paragraphs. A region without any blank gap is cut into overlapping strips instead, and each strip
+# keeps only the words whose centers lie in its own core rows. The tiles are recognized in a pool
+# of worker processes (each with its own warm engine) and their words are merged back in reading order.
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import multiprocessing
+import numpy as np
+
+from app_env import env_number
+from ocr_engine import get_ocr_engine
+from ocr_preprocess import ink_mask
+
+OCR_WORKERS = env_number("UBUNTU_AI_OCR_WORKERS", os.cpu_count() or 1, minimum=1)
+TILING_MIN_PIXELS = 4_000_000 # Smaller images are recognized in one call
+MIN_TILE_PIXELS = 1_000_000 # Below this, process pool overhead outweighs the parallelism
+MIN_COLUMN_GAP = 48 # Blank pixel columns that separate layout columns (word gaps are much narrower)
+STRIP_OVERLAP = 96 # Rows shared by neighbouring strips when there is no blank row to cut at
+TILE_PADDING = 8 # Blank border kept around each region
+
+# left/top/right/bottom: the tile in image pixels. core_top/core_bottom: rows whose words this tile
+# owns (None for tiles cut along blank gaps, which own everything). joiner: how the tile's text follows the
+# previous tile's, "\n" (same block, next line) or "\n\n" (new block).
+Tile = namedtuple("Tile", "left top right bottom core_top core_bottom joiner")
+
+_process_pool = None
+
+
+def _blank_runs(occupied):
+    """(start, end) of the runs of False in a 1-D bool array that have ink on both sides."""
+    padded = np.concatenate(([True], occupied, [True])).view(np.int8)
+    changes = np.flatnonzero(np.diff(padded))
+    starts, ends = changes[::2], changes[1::2]
+    return [(int(start), int(end)) for start, end in zip(starts, ends) if start > 0 and end < len(occupied)]
+
+
+def _pick_row_gap(row_gaps, height):
+    """Prefers wide gaps (paragraphs) near the middle, so both halves are worth splitting further."""
+    middle_gaps = [gap for gap in row_gaps if height / 4 <= (gap[0] + gap[1]) / 2 <= 3 * height / 4]
+    candidates = middle_gaps or row_gaps
+    return max(candidates, key=lambda gap: (gap[1] - gap[0], -abs((gap[0] + gap[1]) / 2 - height / 2)))
+
+
+def _split_region(ink, top, left, bottom, right, max_tile_pixels, joiner, tiles):
+    region = ink[top:bottom, left:right]
+    rows, cols = region.any(axis=1), region.any(axis=0)
+    if not rows.any():
+        return
+    # Tighten to the ink inside the region
+    row_indices, col_indices = np.flatnonzero(rows), np.flatnonzero(cols)
+    top, bottom = top + int(row_indices[0]), top + int(row_indices[-1]) + 1
+    left, right = left + int(col_indices[0]), left + int(col_indices[-1]) + 1
+    rows, cols = rows[row_indices[0]:row_indices[-1] + 1], cols[col_indices[0]:col_indices[-1] + 1]
+    height, width = bottom - top, right - left
+
+    if height * width <= max_tile_pixels:
+        tiles.append(Tile(left, top, right, bottom, None, None, joiner))
+        return
+
+    column_gaps = [gap for gap in _blank_runs(cols) if gap[1] - gap[0] >= MIN_COLUMN_GAP]
+    if column_gaps:
+        # Layout columns (or monitors) are read one after the other, left to right.
+        edges = [0] + [edge for gap in column_gaps for edge in gap] + [width]
+        for i in range(0, len(edges), 2):
+            _split_region(ink, top, left + edges[i], bottom, left + edges[i + 1], max_tile_pixels,
+                          joiner if i == 0 else "\n\n", tiles)
+        return
+
+    row_gaps = _blank_runs(rows)
+    if row_gaps:
+        gap_start, gap_end = _pick_row_gap(row_gaps, height)
+        line_gap = float(np.median([end - start for start, end in row_gaps]))
+        lower_joiner = "\n\n" if gap_end - gap_start > 1.5 * line_gap else "\n"
+        cut = top + (gap_start + gap_end) // 2
+        _split_region(ink, top, left, cut, right, max_tile_pixels, joiner, tiles)
+        _split_region(ink, cut, left, bottom, right, max_tile_pixels, lower_joiner, tiles)
+        return
+
+    # No blank row at all (e.g. a photo with text): overlapping strips that split the words between them.
+    strips = math.ceil(height * width / max_tile_pixels)
+    strip_height = math.ceil(height / strips)
+    for i in range(strips):
+        core_top, core_bottom = top + i * strip_height, min(top + (i + 1) * strip_height, bottom)
+        tiles.append(Tile(left, max(core_top - STRIP_OVERLAP, top), right, min(core_bottom + STRIP_OVERLAP, bottom),
+                          core_top, core_bottom, joiner if i == 0 else "\n"))
+
+
+def plan_tiles(gray, max_tile_pixels):
+    """Returns the Tiles covering all text in a 2-D uint8 array, in reading order."""
+    tiles = []
+    _split_region(ink_mask(gray), 0, 0, gray.shape[0], gray.shape[1], max_tile_pixels, "", tiles)
+    return tiles
+
+
+def should_tile(img, workers=None):
+    return (workers or OCR_WORKERS) > 1 and img.size[0] * img.size[1] >= TILING_MIN_PIXELS
+
+
+def _init_worker():
+    # Every worker already has a core to itself; Tesseract's own OpenMP threads would only compete.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def get_process_pool():
+    """The shared OCR worker pool. Workers are spawned (not forked: the app process runs GTK threads)."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker)
+    return _process_pool
+
+
+def _warm_worker():
+    get_ocr_engine().warm_up()
+    return os.getpid()
+
+
+def warm_up_pool():
+    """Starts the worker processes and loads Tesseract in them ahead of the first large capture."""
+    if OCR_WORKERS <= 1:
+        return
+    pool = get_process_pool()
+    try:
+        for future in [pool.submit(_warm_worker) for _ in range(OCR_WORKERS)]:
+            future.result()
+    except Exception as e:
+        print(f"[OCR] Could not warm up the OCR worker processes: {e}")
+
+
+def ocr_tile(tile_image, languages, psm, tile_left, tile_top, core_top, core_bottom):
+    """
+    Recognizes one tile (runs in a worker process) and returns its OCRWords with boxes in image pixels.
+    Overlapping strips only keep the words they own.
+    """
+    words = get_ocr_engine().recognize_words(tile_image, languages, psm)
+    if core_top is not None:
+        words = [word for word in words if core_top <= tile_top + word.top + word.height / 2 < core_bottom]
+    return [word._replace(left=tile_left + word.left, top=tile_top + word.top) for word in words]
+
+
+def _merge_tile_words(tiles, tile_words):
+    """Renumbers the blocks and lines of every tile so they run on across tiles, following the joiners."""
+    merged = []
+    next_block = next_line = 0
+    for tile, words in zip(tiles, tile_words):
+        blocks, lines = {}, {}
+        for word in words:
+            if word.block not in blocks:
+                if not blocks and merged and tile.joiner == "\n":
+                    blocks[word.block] = next_block - 1 # Continues the previous tile's last paragraph
+                else:
+                    blocks[word.block] = next_block
+                    next_block += 1
+            if word.line not in lines:
+                lines[word.line] = next_line
+                next_line += 1
+            merged.append(word._replace(block=blocks[word.block], line=lines[word.line]))
+    return merged
+
+
+def ocr_tiled(img, languages=None, psm=None, executor=None, workers=None):
+    """
+    Recognizes a large PIL image tile by tile on executor (default: the shared process pool) and returns
+    the OCRWords of all tiles in reading order. workers sizes the tiles: about two tiles per worker,
+    each at least MIN_TILE_PIXELS.
+    """
+    workers = workers or OCR_WORKERS
+    start = time.perf_counter()
+    gray = np.asarray(img if img.mode == "L" else img.convert("L"))
+    max_tile_pixels = max(MIN_TILE_PIXELS, gray.size // (2 * workers))
+    tiles = plan_tiles(gray, max_tile_pixels)
+    if not tiles:
+        return []
+
+    width, height = img.size
+    tile_args = []
+    for tile in tiles:
+        box = (max(tile.left - TILE_PADDING, 0), max(tile.top - TILE_PADDING, 0),
+               min(tile.right + TILE_PADDING, width), min(tile.bottom + TILE_PADDING, height))
+        tile_args.append((img.crop(box), languages, psm, box[0], box[1], tile.core_top, tile.core_bottom))
+    if len(tiles) == 1:
+        tile_words = [ocr_tile(*tile_args[0])] # Not worth a round trip to a worker
+    else:
+        pool = executor or get_process_pool()
+        futures = [pool.submit(ocr_tile, *args) for args in tile_args]
+        tile_words = [future.result() for future in futures]
+
+    words = _merge_tile_words(tiles, tile_words)
+    print(f"[OCR] {width}x{height} recognized in {len(tiles)} tiles on {workers} workers "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return words
@@ -1,27 +1,104 @@
 # ocr_utils.py
-import pytesseract
 from PIL import Image
 import os
 
-def extract_text_from_image(image_path):
+from ocr_cache import get_ocr_cache, image_digest, make_cache_key
+from captured_image import CapturedImage
+from ocr_preprocess import preprocess_image, DEFAULT_CONFIG, PREPROCESS_ENABLED
+from ocr_engine import get_ocr_engine, OCREngineUnavailable
+from ocr_tiling import should_tile, ocr_tiled
+from ocr_result import OCRResult, RESULT_FORMAT_VERSION
+from tracing import span
+
+# Unless told otherwise, captures go through ocr_preprocess (grayscale, dark theme inversion, margin crop,
+# upscaling of small text, adaptive binarization) before Tesseract sees them.
+DEFAULT_PREPROCESS = DEFAULT_CONFIG if PREPROCESS_ENABLED else None
+
+def extract_words_from_image(image, lang=None, psm=None, use_cache=True, preprocess=DEFAULT_PREPROCESS, allow_tiling=True):
     """
-    Extracts text from an image using Tesseract OCR.
-    Returns the extracted text as a string, or None if an error occurs or no text is found.
+    Recognizes every word of an image with Tesseract OCR, through the warm engine from ocr_engine.
+    image is a CapturedImage, an already decoded PIL image, or the path of an image file.
+    lang is a Tesseract language string (e.g. 'eng+por'; default: the engine's language set, see
+    UBUNTU_AI_OCR_LANGS), psm a page segmentation mode number (default: Tesseract's own).
+    preprocess is an ocr_preprocess.PreprocessConfig, or None to OCR the raw pixels. Results are cached by image content and all of these parameters.
+    allow_tiling=False keeps large images in this thread instead of spreading them over the OCR worker processes.
+    Returns an ocr_result.OCRResult (empty if no text is found) with the boxes in pixels of image,
+    "Error: Tesseract not found." without Tesseract, or None if another error occurs.
     """
+    description = image.source if isinstance(image, CapturedImage) else image if isinstance(image, str) else "image"
     try:
-        # Basic check for common image extensions (optional, Pillow might handle it)
-        if not os.path.splitext(image_path)[1].lower() in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.gif']:
-            print(f"File '{image_path}' does not appear to be a supported image type for OCR.")
-            return None
-
-        img = Image.open(image_path)
-        # You might need to specify language(s) for Tesseract, e.g., lang='eng+por'
-        text = pytesseract.image_to_string(img)
-        return text.strip() if text else None # Return None if text is empty string after stripping
-    except pytesseract.TesseractNotFoundError:
+        digest = None
+        if isinstance(image, CapturedImage):
+            img = image.image
+            digest = image.digest() if use_cache else None
+        elif isinstance(image, Image.Image):
+            img = image
+        else:
+            # Basic check for common image extensions (optional, Pillow might handle it)
+            if not os.path.splitext(image)[1].lower() in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.gif']:
+                print(f"File '{image}' does not appear to be a supported image type for OCR.")
+                return None
+            img = Image.open(image)
+            img.load()
+
+        engine = get_ocr_engine()
+        lang = lang or engine.default_languages
+        cache = get_ocr_cache() if use_cache else None
+        cache_tag = f"words{RESULT_FORMAT_VERSION}:{preprocess.cache_tag() if preprocess else 'pp:none'}"
+        cache_key = make_cache_key(digest or image_digest(img), lang=lang, psm=psm, extra=cache_tag) if cache else None
+        if cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                try:
+                    result = OCRResult.from_cache_string(cached)
+                    print(f"OCR: cache hit for '{description}'.")
+                    return result
+                except (ValueError, KeyError) as e:
+                    print(f"OCR: ignoring unreadable cache entry for '{description}': {e}")
+
+        geometry = {}
+        if preprocess:
+            with span("ocr_preprocess", width=img.width, height=img.height):
+                img = preprocess_image(img, preprocess, geometry=geometry)
+        tiled = allow_tiling and should_tile(img)
+        with span("ocr_recognize", lang=lang, tiled=tiled) as recognize_span:
+            if tiled:
+                # Large captures are split along blank gaps and recognized on all cores (see ocr_tiling)
+                words = ocr_tiled(img, lang, psm)
+            else:
+                words = engine.recognize_words(img, lang, psm)
+            recognize_span.set(words=len(words))
+        result = OCRResult.from_words(words, **geometry)
+        if cache:
+            cache.put(cache_key, result.to_cache_string()) # Empty results are cached too, so "no text found" is not recomputed
+        return result
+    except OCREngineUnavailable:
         print("OCR Error: Tesseract is not installed or not in your PATH.")
         # Consider raising this or returning a specific error code/message
         return "Error: Tesseract not found."
     except Exception as e:
-        print(f"OCR Error processing '{image_path}': {e}")
-        return None
\ No newline at end of file
+        print(f"OCR Error processing '{description}': {e}")
+        return None
+
+
+def extract_text_from_image(image, lang=None, psm=None, use_cache=True, preprocess=DEFAULT_PREPROCESS, allow_tiling=True):
+    """
+    Extracts the text of an image (arguments as for extract_words_from_image).
+    Returns the extracted text as a string, or None if an error occurs or no text is found.
+    """
+    result = extract_words_from_image(image, lang=lang, psm=psm, use_cache=use_cache, preprocess=preprocess,
+                                      allow_tiling=allow_tiling)
+    if isinstance(result, OCRResult):
+        return result.text or None # Return None if no text was found
+    return result
+
+
+def extract_words_from_region(image, box, **kwargs):
+    """
+    Recognizes only the (left, top, right, bottom) box of a CapturedImage or PIL image (other arguments
+    as for extract_words_from_image). The boxes of the returned OCRResult are in pixels of the whole image.
+    """
+    result = extract_words_from_image(image.crop(box), **kwargs)
+    if isinstance(result, OCRResult):
+        return result.moved(box[0], box[1])
+    return result
@@ -0,0 +1,292 @@
+# preview_canvas.py
+# The screenshot preview with the recognized words on top of it.
+#
+# The capture is drawn scaled to fit the screen; once OCR has finished, every word of the OCRResult
+# is outlined faintly and can be selected by dragging over it, like text in an editor (the selection
+# follows reading order, from the word under the press to the word under the pointer). Word boxes
+# are kept in capture pixels and only mapped to the view when drawing or hit-testing, so selecting
+# and copying is a lookup in the OCRResult, not another OCR call.
+#
+# A drag that does not start on a word (or any drag with Shift held) draws a rectangle instead: the
+# region of interest. It is mapped back from preview to capture pixels, and the window then OCRs and
+# translates only that part of the capture.
+#
+# Ctrl+scroll zooms in around the pointer; scrolling or a middle-button drag then pans. Zoomed views
+# are drawn from a preview_tiles.TileCache, which renders only the visible tiles from the original.
+import math
+
+import cairo
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk
+
+WORD_HINT_RGBA = (0.21, 0.52, 0.89, 0.12) # Faint outline of every selectable word
+SELECTION_RGBA = (0.21, 0.52, 0.89, 0.40)
+PRESS_MAX_DISTANCE = 12 # Preview pixels around a word where a press still starts a selection
+REGION_SHADE_RGBA = (0.0, 0.0, 0.0, 0.35) # Darkens the capture outside the region of interest
+REGION_BORDER_RGBA = (1.0, 1.0, 1.0, 0.9)
+MIN_REGION_SIZE = 8 # Preview pixels; a smaller rectangle counts as a click, which clears the region
+ZOOM_STEP = 1.25 # Zoom factor per scroll notch or key press
+MAX_ZOOM = 8.0 # Preview pixels per capture pixel
+SCROLL_PAN_PIXELS = 64 # Preview pixels panned per scroll notch
+
+
+class PreviewCanvas(Gtk.DrawingArea):
+    def __init__(self, pixbuf, image_width, image_height, tile_cache=None):
+        """
+        pixbuf is the capture of image_width x image_height pixels shrunk to fit the screen; it sets the
+        size of the canvas. With a preview_tiles.TileCache of the capture, the view can be zoomed in.
+        """
+        super().__init__()
+        self.pixbuf = pixbuf
+        self.image_width, self.image_height = image_width, image_height
+        self.tile_cache = tile_cache
+        # View: the capture pixel (origin_x, origin_y) is at the top-left corner, magnified by zoom
+        self.fit_zoom = pixbuf.get_width() / image_width
+        self.zoom = self.fit_zoom
+        self.origin_x = self.origin_y = 0.0
+        self.pan_from = None # Pointer position of a middle-button drag
+        self.words = None # OCRResult once OCR has finished
+        self.selection = None # (first, last) word indices, inclusive
+        self.anchor = None # Word index where the current drag started
+        self.on_selection_changed = None # Called with no arguments after every change
+        self.region = None # (left, top, right, bottom) in capture pixels
+        self.band = None # [x0, y0, x1, y1] in preview pixels while a rectangle is being dragged
+        self.on_region_changed = None # Called with the new region (or None) when a drag ends
+
+        self.set_size_request(pixbuf.get_width(), pixbuf.get_height())
+        self.add_events(Gdk.EventMask.BUTTON_PRESS_MASK | Gdk.EventMask.BUTTON_RELEASE_MASK |
+                        Gdk.EventMask.BUTTON1_MOTION_MASK | Gdk.EventMask.BUTTON2_MOTION_MASK |
+                        Gdk.EventMask.SCROLL_MASK)
+        self.connect("draw", self.on_draw)
+        self.connect("button-press-event", self.on_button_press)
+        self.connect("motion-notify-event", self.on_motion)
+        self.connect("button-release-event", self.on_button_release)
+        self.connect("scroll-event", self.on_scroll)
+
+    def set_words(self, words):
+        """Shows the words of an OCRResult (boxes in capture pixels) as a selectable overlay."""
+        self.words = words if words is not None and len(words) else None
+        self.selection = None
+        window = self.get_window()
+        if window is not None and self.words is not None:
+            window.set_cursor(Gdk.Cursor.new_from_name(self.get_display(), "text"))
+        self.queue_draw()
+
+    def has_selection(self):
+        return self.selection is not None
+
+    def selected_indices(self):
+        if self.selection is None:
+            return []
+        return range(self.selection[0], self.selection[1] + 1)
+
+    def get_selected_text(self):
+        """Text of the selected words, joined with the same line and block breaks as the full text."""
+        return self.words.text_of(self.selected_indices()) if self.selection is not None else ""
+
+    def select_all(self):
+        if self.words is not None:
+            self._set_selection((0, len(self.words) - 1))
+
+    def clear_selection(self):
+        self._set_selection(None)
+
+    def _set_selection(self, selection):
+        if selection == self.selection:
+            return
+        self.selection = selection
+        self.queue_draw()
+        if self.on_selection_changed:
+            self.on_selection_changed()
+
+    # --- View geometry ---
+
+    def widget_to_image(self, x, y):
+        return self.origin_x + x / self.zoom, self.origin_y + y / self.zoom
+
+    def image_to_widget(self, x, y):
+        return (x - self.origin_x) * self.zoom, (y - self.origin_y) * self.zoom
+
+    def preview_to_image_rect(self, x0, y0, x1, y1):
+        """Maps a rectangle on the preview to (left, top, right, bottom) in capture pixels."""
+        left, top = self.widget_to_image(min(x0, x1), min(y0, y1))
+        right, bottom = self.widget_to_image(max(x0, x1), max(y0, y1))
+        return (max(0, math.floor(left)), max(0, math.floor(top)),
+                min(self.image_width, math.ceil(right)), min(self.image_height, math.ceil(bottom)))
+
+    def _clamp_origin(self):
+        view_width, view_height = self.get_allocated_width(), self.get_allocated_height()
+        self.origin_x = min(max(self.origin_x, 0.0), max(0.0, self.image_width - view_width / self.zoom))
+        self.origin_y = min(max(self.origin_y, 0.0), max(0.0, self.image_height - view_height / self.zoom))
+        # Whole zoomed pixels, so tiles land on the pixel grid without seams
+        self.origin_x = round(self.origin_x * self.zoom) / self.zoom
+        self.origin_y = round(self.origin_y * self.zoom) / self.zoom
+
+    def zoom_at(self, factor, x=None, y=None):
+        """Zooms by factor around the preview point (x, y) (default: the center), within fit and MAX_ZOOM."""
+        if self.tile_cache is None:
+            return
+        if x is None:
+            x, y = self.get_allocated_width() / 2, self.get_allocated_height() / 2
+        image_x, image_y = self.widget_to_image(x, y)
+        self.zoom = min(max(self.zoom * factor, self.fit_zoom), MAX_ZOOM)
+        if self.zoom * ZOOM_STEP ** -0.5 < self.fit_zoom: # Snap back to the fitted view
+            self.reset_zoom()
+            return
+        # Keep the capture pixel under (x, y) in place
+        self.origin_x, self.origin_y = image_x - x / self.zoom, image_y - y / self.zoom
+        self._clamp_origin()
+        self.queue_draw()
+
+    def reset_zoom(self):
+        self.zoom = self.fit_zoom
+        self.origin_x = self.origin_y = 0.0
+        self.queue_draw()
+
+    def pan(self, dx, dy):
+        """Moves the view by (dx, dy) preview pixels."""
+        self.origin_x += dx / self.zoom
+        self.origin_y += dy / self.zoom
+        self._clamp_origin()
+        self.queue_draw()
+
+    def is_zoomed(self):
+        return self.zoom > self.fit_zoom
+
+    def set_region(self, region):
+        if region == self.region:
+            return
+        self.region = region
+        self.queue_draw()
+        if self.on_region_changed:
+            self.on_region_changed(region)
+
+    def _word_at(self, x, y, max_distance=None):
+        # Widget (preview) coordinates -> capture pixels
+        if max_distance is not None:
+            max_distance /= self.zoom
+        image_x, image_y = self.widget_to_image(x, y)
+        return self.words.word_at(image_x, image_y, max_distance)
+
+    # --- Events ---
+
+    def on_button_press(self, widget, event):
+        if event.button == 2 and self.is_zoomed():
+            self.pan_from = (event.x, event.y)
+            return True
+        if event.button != 1:
+            return False
+        if self.words is not None and not event.state & Gdk.ModifierType.SHIFT_MASK:
+            self.anchor = self._word_at(event.x, event.y, PRESS_MAX_DISTANCE)
+        if self.anchor is not None:
+            self._set_selection((self.anchor, self.anchor))
+        else:
+            self._set_selection(None)
+            self.band = [event.x, event.y, event.x, event.y]
+        return True
+
+    def on_motion(self, widget, event):
+        if self.pan_from is not None:
+            self.pan(self.pan_from[0] - event.x, self.pan_from[1] - event.y)
+            self.pan_from = (event.x, event.y)
+            return True
+        if self.anchor is not None:
+            focus = self._word_at(event.x, event.y)
+            self._set_selection((min(self.anchor, focus), max(self.anchor, focus)))
+            return True
+        if self.band is not None:
+            self.band[2] = min(max(event.x, 0), self.get_allocated_width())
+            self.band[3] = min(max(event.y, 0), self.get_allocated_height())
+            self.queue_draw()
+            return True
+        return False
+
+    def on_button_release(self, widget, event):
+        if event.button == 2:
+            self.pan_from = None
+            return False
+        if event.button != 1:
+            return False
+        self.anchor = None
+        if self.band is not None:
+            x0, y0, x1, y1 = self.band
+            self.band = None
+            if abs(x1 - x0) < MIN_REGION_SIZE or abs(y1 - y0) < MIN_REGION_SIZE:
+                self.set_region(None)
+            else:
+                self.set_region(self.preview_to_image_rect(x0, y0, x1, y1))
+            self.queue_draw()
+        return False
+
+    def on_scroll(self, widget, event):
+        if event.state & Gdk.ModifierType.CONTROL_MASK:
+            if event.direction == Gdk.ScrollDirection.UP:
+                self.zoom_at(ZOOM_STEP, event.x, event.y)
+            elif event.direction == Gdk.ScrollDirection.DOWN:
+                self.zoom_at(1 / ZOOM_STEP, event.x, event.y)
+            return True
+        if not self.is_zoomed():
+            return False
+        horizontal = event.state & Gdk.ModifierType.SHIFT_MASK
+        step = {Gdk.ScrollDirection.UP: -SCROLL_PAN_PIXELS, Gdk.ScrollDirection.DOWN: SCROLL_PAN_PIXELS,
+                Gdk.ScrollDirection.LEFT: -SCROLL_PAN_PIXELS, Gdk.ScrollDirection.RIGHT: SCROLL_PAN_PIXELS}.get(event.direction, 0)
+        if horizontal or event.direction in (Gdk.ScrollDirection.LEFT, Gdk.ScrollDirection.RIGHT):
+            self.pan(step, 0)
+        else:
+            self.pan(0, step)
+        return True
+
+    # --- Drawing ---
+
+    def _draw_capture(self, cr):
+        if not self.is_zoomed():
+            Gdk.cairo_set_source_pixbuf(cr, self.pixbuf, 0, 0)
+            cr.paint()
+            return
+        view_left, view_top = round(self.origin_x * self.zoom), round(self.origin_y * self.zoom)
+        for x, y, tile in self.tile_cache.tiles_in_view(self.zoom, view_left, view_top,
+                                                        self.get_allocated_width(), self.get_allocated_height()):
+            Gdk.cairo_set_source_pixbuf(cr, tile, x, y)
+            cr.paint()
+
+    def _draw_region(self, cr):
+        if self.band is not None:
+            x0, y0, x1, y1 = self.band
+        elif self.region is not None:
+            left, top, right, bottom = self.region
+            (x0, y0), (x1, y1) = self.image_to_widget(left, top), self.image_to_widget(right, bottom)
+        else:
+            return
+        x, y, width, height = min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)
+        cr.save()
+        cr.set_fill_rule(cairo.FILL_RULE_EVEN_ODD) # Shade everything but the rectangle
+        cr.rectangle(0, 0, self.get_allocated_width(), self.get_allocated_height())
+        cr.rectangle(x, y, width, height)
+        cr.set_source_rgba(*REGION_SHADE_RGBA)
+        cr.fill()
+        cr.rectangle(x + 0.5, y + 0.5, width, height)
+        cr.set_line_width(1)
+        cr.set_dash([4, 4])
+        cr.set_source_rgba(*REGION_BORDER_RGBA)
+        cr.stroke()
+        cr.restore()
+
+    def on_draw(self, widget, cr):
+        self._draw_capture(cr)
+        self._draw_region(cr)
+        if self.words is None:
+            return False
+        cr.scale(self.zoom, self.zoom)
+        cr.translate(-self.origin_x, -self.origin_y)
+        # One path per style, filled once: thousands of words stay cheap to redraw
+        for i in range(len(self.words)):
+            cr.rectangle(self.words.left[i], self.words.top[i], self.words.width[i], self.words.height[i])
+        cr.set_source_rgba(*WORD_HINT_RGBA)
+        cr.fill()
+        if self.selection is not None:
+            for i in self.selected_indices():
+                cr.rectangle(self.words.left[i], self.words.top[i], self.words.width[i], self.words.height[i])
+            cr.set_source_rgba(*SELECTION_RGBA)
+            cr.fill()
+        return False
@@ -0,0 +1,79 @@
+# preview_tiles.py
+# Zoomed views of a capture, rendered tile by tile on demand.
+#
+# The preview window shows the capture shrunk to the screen. Zooming in never builds a full-size
+# (or larger) copy of it: the view is cut into fixed-size tiles in zoomed pixels, and each tile is
+# resampled from the original pixels only when it first becomes visible. Rendered tiles are kept in
+# an LRU cache bounded by an explicit memory budget, so panning back is free and a zoomed-in 8K
+# capture costs at most the budget on top of the decoded capture itself.
+#
+#   UBUNTU_AI_PREVIEW_CACHE_MB=64    Memory budget for rendered tiles (default 64 MB)
+import math
+from collections import OrderedDict
+
+from PIL import Image
+
+from app_env import env_number
+
+TILE_SIZE = 256 # Zoomed pixels per tile side
+PREVIEW_CACHE_BYTES = env_number("UBUNTU_AI_PREVIEW_CACHE_MB", 64, minimum=1) * 1024 * 1024
+NEAREST_FROM_ZOOM = 2.0 # From this magnification on, pixels are shown as sharp squares
+
+
+class TileCache:
+    def __init__(self, image, tile_size=TILE_SIZE, max_bytes=PREVIEW_CACHE_BYTES, convert=None):
+        """
+        image is the full-size PIL image. convert turns each rendered PIL tile into what the caller
+        draws (e.g. captured_image.pil_to_pixbuf); by default the PIL tile itself is kept.
+        """
+        self.image = image
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+        self.convert = convert or (lambda tile: tile)
+        self.bytes = 0
+        self.renders = 0 # Tiles rendered so far (cache misses)
+        self._tiles = OrderedDict() # (zoom, column, row) -> (converted tile, bytes)
+        self._bytes_per_pixel = len(image.getbands())
+
+    def zoomed_size(self, zoom):
+        return math.ceil(self.image.width * zoom), math.ceil(self.image.height * zoom)
+
+    def tile(self, zoom, column, row):
+        """The tile at (column, row) of the capture magnified by zoom, rendered if it is not cached."""
+        key = (zoom, column, row)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            self._tiles.move_to_end(key)
+            return cached[0]
+        zoomed_width, zoomed_height = self.zoomed_size(zoom)
+        left, top = column * self.tile_size, row * self.tile_size
+        right, bottom = min(left + self.tile_size, zoomed_width), min(top + self.tile_size, zoomed_height)
+        source_box = (left / zoom, top / zoom, min(right / zoom, self.image.width), min(bottom / zoom, self.image.height))
+        resample = Image.NEAREST if zoom >= NEAREST_FROM_ZOOM else Image.BILINEAR
+        rendered = self.convert(self.image.resize((right - left, bottom - top), resample, box=source_box))
+        size = (right - left) * (bottom - top) * self._bytes_per_pixel
+        self._tiles[key] = (rendered, size)
+        self.bytes += size
+        self.renders += 1
+        while self.bytes > self.max_bytes and len(self._tiles) > 1:
+            _, (_, evicted_size) = self._tiles.popitem(last=False)
+            self.bytes -= evicted_size
+        return rendered
+
+    def tiles_in_view(self, zoom, view_left, view_top, view_width, view_height):
+        """
+        Yields (x, y, tile) for every tile overlapping the view, a rectangle in zoomed pixels; x and y
+        are where the tile goes relative to the view's top-left corner.
+        """
+        zoomed_width, zoomed_height = self.zoomed_size(zoom)
+        first_column, first_row = max(0, view_left // self.tile_size), max(0, view_top // self.tile_size)
+        last_column = min(view_left + view_width, zoomed_width - 1) // self.tile_size
+        last_row = min(view_top + view_height, zoomed_height - 1) // self.tile_size
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                yield (column * self.tile_size - view_left, row * self.tile_size - view_top,
+                       self.tile(zoom, column, row))
+
+    def clear(self):
+        self._tiles.clear()
+        self.bytes = 0
@@ -0,0 +1,218 @@
+# result_window.py
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk
+import time
+
+from clipboard import get_clipboard
+
+
+class StreamingResultWindow(Gtk.Window):
+    """
+    Non-modal window that shows a Gemini result while it is being generated.
+    Text is appended chunk by chunk; the status line shows time to first text and total time.
+    Closing the window or pressing Esc calls on_cancel (if the request is still running).
+    """
+    def __init__(self, parent_window, title, on_cancel=None):
+        super().__init__(title=title, transient_for=parent_window)
+        self.on_cancel = on_cancel
+        self.is_finished = False
+        self.is_closed = False
+        self.start_time = time.monotonic()
+        self.first_text_time = None
+
+        self.set_default_size(480, 320)
+        self.set_destroy_with_parent(True)
+        self.set_keep_above(True)
+        self.set_position(Gtk.WindowPosition.CENTER_ON_PARENT)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_border_width(10)
+        self.add(box)
+
+        title_label = Gtk.Label(label=f"<b>{title}</b>")
+        title_label.set_use_markup(True)
+        title_label.props.xalign = 0
+        box.pack_start(title_label, False, False, 0)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        self.text_view = Gtk.TextView()
+        self.text_view.set_editable(False)
+        self.text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+        self.text_view.set_left_margin(6); self.text_view.set_right_margin(6)
+        scrolled.add(self.text_view)
+        box.pack_start(scrolled, True, True, 0)
+
+        bottom_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        box.pack_start(bottom_box, False, False, 0)
+        self.spinner = Gtk.Spinner()
+        self.spinner.start()
+        bottom_box.pack_start(self.spinner, False, False, 0)
+        self.status_label = Gtk.Label(label="Waiting for the first text...")
+        self.status_label.props.xalign = 0
+        bottom_box.pack_start(self.status_label, True, True, 0)
+        self.btn_copy = Gtk.Button(label="Copy")
+        self.btn_copy.set_sensitive(False)
+        self.btn_copy.connect("clicked", self.on_copy_clicked)
+        bottom_box.pack_start(self.btn_copy, False, False, 0)
+        self.btn_close = Gtk.Button(label="Cancel")
+        self.btn_close.connect("clicked", lambda w: self.close())
+        bottom_box.pack_start(self.btn_close, False, False, 0)
+
+        self.connect("key-press-event", self.on_key_press)
+        self.connect("destroy", self.on_destroy)
+        self.show_all()
+
+    def append_text(self, text):
+        if self.first_text_time is None:
+            self.first_text_time = time.monotonic()
+            self.status_label.set_text(f"Receiving... (first text after {self.first_text_time - self.start_time:.2f} s)")
+            self.btn_copy.set_sensitive(True)
+        buffer = self.text_view.get_buffer()
+        buffer.insert(buffer.get_end_iter(), text)
+
+    def set_text(self, text):
+        self.text_view.get_buffer().set_text("")
+        self.first_text_time = None
+        self.append_text(text)
+
+    def get_text(self):
+        buffer = self.text_view.get_buffer()
+        return buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), False)
+
+    def finish(self, error_message=None):
+        """Marks the request as complete; error_message is shown instead of the timing summary."""
+        self.is_finished = True
+        self.spinner.stop()
+        self.spinner.hide()
+        self.btn_close.set_label("Close")
+        if error_message:
+            self.status_label.set_text(error_message)
+            self.status_label.set_selectable(True)
+            return
+        total = time.monotonic() - self.start_time
+        first = (self.first_text_time or time.monotonic()) - self.start_time
+        self.status_label.set_text(f"Done in {total:.2f} s (first text after {first:.2f} s)")
+
+    def on_copy_clicked(self, widget):
+        get_clipboard().copy(text=self.get_text().strip())
+
+    def on_key_press(self, widget, event):
+        if event.keyval == Gdk.KEY_Escape:
+            self.close()
+        return False
+
+    def on_destroy(self, widget):
+        self.is_closed = True
+        if not self.is_finished and self.on_cancel:
+            self.on_cancel()
+
+
+class MultiTranslationResultWindow(Gtk.Window):
+    """
+    Non-modal window with one tab per target language. Each tab shows a spinner until its
+    translation arrives, so results appear as they complete, in any order.
+    Closing the window or pressing Esc calls on_cancel if some translations are still pending.
+    """
+    def __init__(self, parent_window, languages, on_cancel=None):
+        super().__init__(title="Translations", transient_for=parent_window)
+        self.on_cancel = on_cancel
+        self.is_closed = False
+        self.start_time = time.monotonic()
+        self.pages = {} # language code -> (text_view, tab_spinner)
+        self.pending_codes = set()
+        # Requests behind the tabs that have not finished; unlike pending_codes, also counted down after the window closed
+        self._unfinished_requests = len(languages)
+
+        self.set_default_size(520, 360)
+        self.set_destroy_with_parent(True)
+        self.set_keep_above(True)
+        self.set_position(Gtk.WindowPosition.CENTER_ON_PARENT)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_border_width(10)
+        self.add(box)
+
+        self.notebook = Gtk.Notebook()
+        self.notebook.set_scrollable(True)
+        box.pack_start(self.notebook, True, True, 0)
+        for display_name, lang_code in languages:
+            scrolled = Gtk.ScrolledWindow()
+            scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+            text_view = Gtk.TextView()
+            text_view.set_editable(False)
+            text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+            text_view.set_left_margin(6); text_view.set_right_margin(6)
+            scrolled.add(text_view)
+
+            tab_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
+            tab_spinner = Gtk.Spinner()
+            tab_spinner.start()
+            tab_box.pack_start(tab_spinner, False, False, 0)
+            tab_box.pack_start(Gtk.Label(label=display_name), False, False, 0)
+            tab_box.show_all()
+
+            self.notebook.append_page(scrolled, tab_box)
+            self.pages[lang_code] = (text_view, tab_spinner)
+            self.pending_codes.add(lang_code)
+
+        bottom_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        box.pack_start(bottom_box, False, False, 0)
+        self.status_label = Gtk.Label()
+        self.status_label.props.xalign = 0
+        bottom_box.pack_start(self.status_label, True, True, 0)
+        self.btn_copy = Gtk.Button(label="Copy")
+        self.btn_copy.connect("clicked", self.on_copy_clicked)
+        bottom_box.pack_start(self.btn_copy, False, False, 0)
+        self.btn_close = Gtk.Button(label="Cancel")
+        self.btn_close.connect("clicked", lambda w: self.close())
+        bottom_box.pack_start(self.btn_close, False, False, 0)
+        self.update_status()
+
+        self.connect("key-press-event", self.on_key_press)
+        self.connect("destroy", self.on_destroy)
+        self.show_all()
+
+    def set_result(self, lang_code, text, error_message=None):
+        """Fills the tab of lang_code with its translation (or error_message) and stops its spinner."""
+        if lang_code not in self.pages:
+            return
+        text_view, tab_spinner = self.pages[lang_code]
+        text_view.get_buffer().set_text(error_message or text)
+        tab_spinner.stop()
+        tab_spinner.hide()
+        self.pending_codes.discard(lang_code)
+        self.update_status()
+
+    def request_finished(self):
+        """Called once per language when its request completes (or is cancelled), whether or not the window is open."""
+        self._unfinished_requests -= 1
+
+    def is_complete(self):
+        return self._unfinished_requests <= 0
+
+    def update_status(self):
+        done = len(self.pages) - len(self.pending_codes)
+        elapsed = time.monotonic() - self.start_time
+        if self.pending_codes:
+            self.status_label.set_text(f"{done} of {len(self.pages)} translations done...")
+        else:
+            self.status_label.set_text(f"All {len(self.pages)} translations done in {elapsed:.2f} s")
+            self.btn_close.set_label("Close")
+
+    def on_copy_clicked(self, widget):
+        page = self.notebook.get_nth_page(self.notebook.get_current_page())
+        buffer = page.get_child().get_buffer()
+        text = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), False)
+        get_clipboard().copy(text=text.strip())
+
+    def on_key_press(self, widget, event):
+        if event.keyval == Gdk.KEY_Escape:
+            self.close()
+        return False
+
+    def on_destroy(self, widget):
+        self.is_closed = True
+        if self.pending_codes and self.on_cancel:
+            self.on_cancel()
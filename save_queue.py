@@ -0,0 +1,155 @@
+# save_queue.py
+# Saves captures in the background.
+#
+# Encoding a multi-monitor capture takes seconds, and ~/Pictures may be on a slow network mount,
+# so "Save" only queues the capture: one worker thread encodes and writes the saves one after the
+# other, in click order. Each save goes to a temporary name first and is renamed when complete,
+# so a half-written file never appears under the final name. A capture whose pixels were already
+# saved in the same format is not written again: an index of content hash -> saved file (kept in
+# the cache directory) points back at the existing file instead.
+#
+#   UBUNTU_AI_SAVE_FORMAT=png           png (optimized, default), webp (lossless) or jpeg
+#   UBUNTU_AI_SAVE_JPEG_QUALITY=90      JPEG quality, 1-95
+import datetime
+import json
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import features
+
+from app_env import env_number
+from app_paths import get_cache_dir
+from tracing import traced
+
+JPEG_QUALITY = env_number("UBUNTU_AI_SAVE_JPEG_QUALITY", 90, minimum=1, maximum=95)
+
+# pil_format: PIL format name; options: passed to the encoder
+SaveFormat = namedtuple("SaveFormat", "label pil_format extension options")
+
+SAVE_FORMATS = {
+    "png": SaveFormat("PNG (optimized)", "PNG", "png", {"optimize": True}),
+    "webp": SaveFormat("WebP (lossless)", "WEBP", "webp", {"lossless": True, "quality": 80, "method": 4}),
+    "jpeg": SaveFormat(f"JPEG (quality {JPEG_QUALITY})", "JPEG", "jpg", {"quality": JPEG_QUALITY, "optimize": True}),
+}
+DEFAULT_SAVE_FORMAT = (os.getenv("UBUNTU_AI_SAVE_FORMAT") or "png").lower()
+if DEFAULT_SAVE_FORMAT not in SAVE_FORMATS:
+    print(f"Save: unknown UBUNTU_AI_SAVE_FORMAT '{DEFAULT_SAVE_FORMAT}', using png.")
+    DEFAULT_SAVE_FORMAT = "png"
+
+# path: the saved file. duplicate: True if the capture had been saved before and nothing was written.
+SaveResult = namedtuple("SaveResult", "path duplicate")
+
+
+def available_save_formats():
+    """Keys of SAVE_FORMATS this Pillow build can encode."""
+    return [name for name in SAVE_FORMATS if name != "webp" or features.check("webp")]
+
+
+class SavedIndex:
+    """Content hash and format -> path of the saved file, persisted as JSON."""
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = None # Loaded on first use, in the save worker
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Caller holds self._lock
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Save index: could not read '{self.path}': {e}")
+
+    def lookup(self, digest, format_name):
+        """Path of a file that still holds this capture in this format, or None."""
+        with self._lock:
+            self._load()
+            path = self._entries.get(f"{digest}:{format_name}")
+        return path if path and os.path.exists(path) else None
+
+    def record(self, digest, format_name, saved_path):
+        with self._lock:
+            self._load()
+            self._entries[f"{digest}:{format_name}"] = saved_path
+            if not self.path:
+                return
+            try:
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Save index: could not write '{self.path}': {e}")
+
+
+def unique_path(directory, stem, extension):
+    path = os.path.join(directory, f"{stem}.{extension}")
+    counter = 2
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{stem}_{counter}.{extension}")
+        counter += 1
+    return path
+
+
+class SaveQueue:
+    def __init__(self, index=None):
+        self.index = index or SavedIndex()
+        # One worker: saves are written in order, and never compete with each other for a slow disk.
+        # Its thread is joined at interpreter exit, so queued saves complete even after Gtk.main() returns.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+
+    def submit(self, captured_image, directory, format_name=DEFAULT_SAVE_FORMAT):
+        """
+        Queues a save of captured_image to directory and returns a Future of a SaveResult.
+        The file is named after the time of the click, not the time it is written.
+        """
+        if format_name not in SAVE_FORMATS:
+            raise ValueError(f"Unknown save format '{format_name}' (expected one of {', '.join(SAVE_FORMATS)})")
+        stem = f"Screenshot_{datetime.datetime.now().strftime('%Y-%m-%d_%H%M%S')}"
+        save = traced("save", captured_image.capture_id, self._save, format=format_name)
+        return self._executor.submit(save, captured_image, directory, stem, format_name)
+
+    def _save(self, captured_image, directory, stem, format_name):
+        save_format = SAVE_FORMATS[format_name]
+        digest = captured_image.digest()
+        existing_path = self.index.lookup(digest, format_name)
+        if existing_path:
+            print(f"Save: capture already saved as '{existing_path}', not writing it again.")
+            return SaveResult(existing_path, True)
+        os.makedirs(directory, exist_ok=True)
+        path = unique_path(directory, stem, save_format.extension)
+        partial_path = f"{path}.part"
+        try:
+            captured_image.save(partial_path, save_format.pil_format, **save_format.options)
+            os.replace(partial_path, path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        self.index.record(digest, format_name, path)
+        print(f"Save: wrote '{path}' ({os.path.getsize(path) / 1024:.0f} KiB).")
+        return SaveResult(path, False)
+
+
+_save_queue = None
+_save_queue_lock = threading.Lock()
+
+
+def get_save_queue():
+    """The process-wide SaveQueue (the daemon shares it across preview windows)."""
+    global _save_queue
+    with _save_queue_lock:
+        if _save_queue is None:
+            index_path = None
+            try:
+                index_path = os.path.join(get_cache_dir("saves"), "index.json")
+            except OSError as e:
+                print(f"Save index: duplicate detection limited to this session, could not create cache dir: {e}")
+            _save_queue = SaveQueue(SavedIndex(index_path))
+    return _save_queue
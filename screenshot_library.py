@@ -0,0 +1,318 @@
+# screenshot_library.py
+# A searchable index of the saved screenshots.
+#
+# Every image in the screenshot folder gets a row in a SQLite database (in the cache directory)
+# with its size and dimensions, a small JPEG thumbnail, and its OCR text in an FTS5 full-text
+# table, so a search over tens of thousands of screenshots is one indexed query that takes
+# milliseconds. The index is kept up to date incrementally:
+#
+#   - on start, the folder is scanned and only new or changed files (by mtime and size) are queued;
+#   - while running, pyinotify reports files written, moved in or deleted, which are queued too.
+#
+# One indexer thread works through the queue at the lowest CPU priority (nice 19, inherited by any
+# tesseract process it starts), so indexing never competes with the preview or with a capture.
+# OCR goes through the shared OCR cache: a capture already recognized in the preview is not
+# recognized again when it is saved.
+#
+#   UBUNTU_AI_LIBRARY_DIR=~/Pictures/Screenshots    Folder that is indexed (default)
+import io
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from PIL import Image
+
+from app_paths import get_cache_dir
+
+LIBRARY_DIR = os.path.expanduser(os.getenv("UBUNTU_AI_LIBRARY_DIR") or "~/Pictures/Screenshots")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+THUMBNAIL_SIZE = 256 # Longest side, in pixels
+THUMBNAIL_QUALITY = 80
+INDEXER_NICE = 19
+# Ranking scores every match, so for a word found in more screenshots than this (e.g. "the"),
+# results are listed newest first instead of best first.
+RANKED_MATCH_LIMIT = 1000
+SCHEMA_VERSION = 1 # Bump when SCHEMA changes; an index in an older schema is rebuilt
+# Marks around the matched words in SearchHit.snippet (control characters never occur in OCR text)
+SNIPPET_START, SNIPPET_END = "\x02", "\x03"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS screenshots (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS screenshots_by_mtime ON screenshots (mtime);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    id INTEGER PRIMARY KEY, -- screenshots.id
+    jpeg BLOB NOT NULL
+);
+-- rowid = screenshots.id. Prefix indexes make search-as-you-type queries ("err*") as fast as whole words.
+CREATE VIRTUAL TABLE IF NOT EXISTS screenshot_text USING fts5 (
+    text, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+"""
+
+# snippet: OCR text around the matches, with SNIPPET_START/SNIPPET_END around the matched words
+SearchHit = namedtuple("SearchHit", "id path mtime width height snippet")
+
+
+def is_library_image(path):
+    name = os.path.basename(path)
+    return name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith(".")
+
+
+def build_match_query(text):
+    """
+    Turns what the user typed into an FTS5 query: every word must occur, the last one may be
+    incomplete (search as you type). Returns None if there is nothing to search for.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def make_thumbnail(image):
+    """JPEG bytes of image shrunk to THUMBNAIL_SIZE on its longest side."""
+    thumbnail = image.convert("RGB") if image.mode != "RGB" else image.copy()
+    thumbnail.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.BILINEAR, reducing_gap=2.0)
+    data = io.BytesIO()
+    thumbnail.save(data, format="JPEG", quality=THUMBNAIL_QUALITY)
+    return data.getvalue()
+
+
+class ScreenshotLibrary:
+    def __init__(self, db_path, directory=LIBRARY_DIR):
+        self.db_path = db_path
+        self.directory = directory
+        self._local = threading.local() # One SQLite connection per thread
+        self._queue = queue.Queue() # ("index" | "remove", path)
+        self._queued = set() # Paths waiting in _queue, so bursts of events index a file once
+        self._queued_lock = threading.Lock()
+        self._worker = None
+        self._notifier = None
+        self.on_indexed = None # Called with the path from the indexer thread after each change
+
+    # --- Database ---
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL") # Searches read while the indexer writes
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                with connection:
+                    for table in ("screenshots", "thumbnails", "screenshot_text"):
+                        connection.execute(f"DROP TABLE IF EXISTS {table}")
+                    connection.executescript(SCHEMA)
+                    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._local.connection = connection
+        return connection
+
+    def store(self, path, mtime, size, text, width=None, height=None, thumbnail=None):
+        """Adds or replaces the entry of one file."""
+        connection = self._connection()
+        with connection:
+            row = connection.execute("SELECT id FROM screenshots WHERE path = ?", (path,)).fetchone()
+            if row:
+                screenshot_id = row[0]
+                connection.execute("UPDATE screenshots SET mtime = ?, size = ?, width = ?, height = ?, indexed_at = ? "
+                                   "WHERE id = ?", (mtime, size, width, height, time.time(), screenshot_id))
+                connection.execute("DELETE FROM screenshot_text WHERE rowid = ?", (screenshot_id,))
+            else:
+                screenshot_id = connection.execute(
+                    "INSERT INTO screenshots (path, mtime, size, width, height, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, mtime, size, width, height, time.time())).lastrowid
+            connection.execute("INSERT INTO screenshot_text (rowid, text) VALUES (?, ?)", (screenshot_id, text))
+            if thumbnail is not None:
+                connection.execute("INSERT OR REPLACE INTO thumbnails (id, jpeg) VALUES (?, ?)", (screenshot_id, thumbnail))
+        return screenshot_id
+
+    def remove(self, path):
+        connection = self._connection()
+        with connection:
+            row = connection.execute("SELECT id FROM screenshots WHERE path = ?", (path,)).fetchone()
+            if row:
+                for table, column in (("screenshot_text", "rowid"), ("thumbnails", "id"), ("screenshots", "id")):
+                    connection.execute(f"DELETE FROM {table} WHERE {column} = ?", (row[0],))
+        return row is not None
+
+    def needs_indexing(self, path, mtime, size):
+        row = self._connection().execute("SELECT mtime, size FROM screenshots WHERE path = ?", (path,)).fetchone()
+        return row is None or row[0] != mtime or row[1] != size
+
+    # --- Queries ---
+
+    def search(self, text, limit=50):
+        """
+        SearchHits for the screenshots whose OCR text matches text, best matches first (newest first
+        if there are more than RANKED_MATCH_LIMIT).
+        """
+        match_query = build_match_query(text)
+        if match_query is None:
+            return self.recent(limit)
+        connection = self._connection()
+        matches = connection.execute("SELECT count(*) FROM screenshot_text WHERE screenshot_text MATCH ?",
+                                     (match_query,)).fetchone()[0]
+        order = "rank" if matches <= RANKED_MATCH_LIMIT else "screenshot_text.rowid DESC"
+        rows = connection.execute(
+            "SELECT s.id, s.path, s.mtime, s.width, s.height, "
+            f"snippet(screenshot_text, 0, '{SNIPPET_START}', '{SNIPPET_END}', '…', 12) "
+            "FROM screenshot_text JOIN screenshots s ON s.id = screenshot_text.rowid "
+            f"WHERE screenshot_text MATCH ? ORDER BY {order} LIMIT ?", (match_query, limit)).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def recent(self, limit=50):
+        """The most recently modified screenshots, with the start of their text as snippet."""
+        rows = self._connection().execute(
+            "SELECT s.id, s.path, s.mtime, s.width, s.height, substr(t.text, 1, 120) "
+            "FROM screenshots s LEFT JOIN screenshot_text t ON t.rowid = s.id "
+            "ORDER BY s.mtime DESC LIMIT ?", (limit,)).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def thumbnail(self, screenshot_id):
+        """JPEG bytes of a screenshot's thumbnail, or None."""
+        row = self._connection().execute("SELECT jpeg FROM thumbnails WHERE id = ?", (screenshot_id,)).fetchone()
+        return row[0] if row else None
+
+    def count(self):
+        return self._connection().execute("SELECT count(*) FROM screenshots").fetchone()[0]
+
+    def pending(self):
+        """Number of files waiting to be indexed or removed."""
+        return self._queue.qsize()
+
+    # --- Indexing ---
+
+    def enqueue(self, action, path):
+        with self._queued_lock:
+            if (action, path) in self._queued:
+                return
+            self._queued.add((action, path))
+        self._queue.put((action, path))
+
+    def scan(self):
+        """Queues every new or changed image in the folder, and the removal of entries whose file is gone."""
+        known = dict(((path, (mtime, size)) for path, mtime, size in
+                      self._connection().execute("SELECT path, mtime, size FROM screenshots")))
+        queued = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if not is_library_image(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if known.pop(path, None) != (stat.st_mtime, stat.st_size):
+                    self.enqueue("index", path)
+                    queued += 1
+        for path in known: # Indexed, but no longer on disk
+            self.enqueue("remove", path)
+        print(f"Library: {queued} of the images in '{self.directory}' need indexing, {len(known)} are gone.")
+        return queued
+
+    def index_file(self, path):
+        """Reads, thumbnails and OCRs one image and stores it (skipped if it is unchanged since last time)."""
+        from captured_image import CapturedImage
+        from ocr_result import OCRResult
+        from ocr_utils import extract_words_from_image
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return self.remove(path)
+        if not self.needs_indexing(path, stat.st_mtime, stat.st_size):
+            return False
+        start = time.perf_counter()
+        captured_image = CapturedImage.from_file(path)
+        thumbnail = make_thumbnail(captured_image.image)
+        # In this thread only: the OCR worker processes are kept for interactive captures
+        result = extract_words_from_image(captured_image, allow_tiling=False)
+        if not isinstance(result, OCRResult):
+            print(f"Library: OCR failed for '{path}', it will be retried on the next scan.")
+            return False
+        self.store(path, stat.st_mtime, stat.st_size, result.text, captured_image.width, captured_image.height, thumbnail)
+        print(f"Library: indexed '{path}' ({len(result)} words) in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        return True
+
+    def _run(self):
+        try:
+            # Linux applies nice per thread; tesseract processes started from here inherit it.
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), INDEXER_NICE)
+        except (AttributeError, OSError) as e:
+            print(f"Library: could not lower the indexer priority: {e}")
+        self.scan()
+        while True:
+            action, path = self._queue.get()
+            with self._queued_lock:
+                self._queued.discard((action, path))
+            try:
+                changed = self.index_file(path) if action == "index" else self.remove(path)
+            except Exception as e: # One unreadable file must not stop the indexer
+                print(f"Library: could not {action} '{path}': {e}")
+                continue
+            if changed and self.on_indexed:
+                self.on_indexed(path)
+
+    def start(self, watch=True):
+        """Starts the indexer thread (initial scan, then the queue) and, with watch, the inotify watcher."""
+        if self._worker is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._worker = threading.Thread(target=self._run, name="library-indexer", daemon=True)
+        self._worker.start()
+        if watch:
+            self._start_watcher()
+
+    def _start_watcher(self):
+        try:
+            import pyinotify
+        except ImportError:
+            print("Library: pyinotify is not installed; new screenshots are picked up by the next scan.")
+            return
+        library = self
+
+        class EventHandler(pyinotify.ProcessEvent):
+            def process_IN_CLOSE_WRITE(self, event):
+                if not event.dir and is_library_image(event.pathname):
+                    library.enqueue("index", event.pathname)
+
+            process_IN_MOVED_TO = process_IN_CLOSE_WRITE # e.g. the save queue renaming a finished .part file
+
+            def process_IN_DELETE(self, event):
+                if not event.dir and is_library_image(event.pathname):
+                    library.enqueue("remove", event.pathname)
+
+            process_IN_MOVED_FROM = process_IN_DELETE
+
+        watch_manager = pyinotify.WatchManager()
+        mask = pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO | pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM
+        self._notifier = pyinotify.ThreadedNotifier(watch_manager, EventHandler())
+        self._notifier.daemon = True
+        self._notifier.start()
+        watch_manager.add_watch(self.directory, mask, rec=True, auto_add=True)
+        print(f"Library: watching '{self.directory}'.")
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_screenshot_library():
+    """The process-wide ScreenshotLibrary over LIBRARY_DIR (not started; see ScreenshotLibrary.start)."""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = ScreenshotLibrary(os.path.join(get_cache_dir("library"), "library.sqlite3"))
+    return _library
@@ -0,0 +1,45 @@
+# tests/test_app_env.py
+# Numeric settings from environment variables (app_env.env_number): bad values fall back to the
+# default instead of failing the import of the module that reads them.
+#
+#   python3 -m pytest tests
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_env import env_number
+
+
+def test_unset_or_empty_gives_default(monkeypatch):
+    monkeypatch.delenv("UBUNTU_AI_TEST_NUMBER", raising=False)
+    assert env_number("UBUNTU_AI_TEST_NUMBER", 7) == 7
+    monkeypatch.setenv("UBUNTU_AI_TEST_NUMBER", "")
+    assert env_number("UBUNTU_AI_TEST_NUMBER", 7) == 7
+
+
+def test_invalid_value_gives_default(monkeypatch, capsys):
+    for value, kind in (("four", int), ("2.5", int), ("nan", float), ("inf", float)):
+        monkeypatch.setenv("UBUNTU_AI_TEST_NUMBER", value)
+        assert env_number("UBUNTU_AI_TEST_NUMBER", 7, kind) == 7
+    assert capsys.readouterr().out.count("Warning: UBUNTU_AI_TEST_NUMBER=") == 4
+
+
+def test_out_of_range_value_is_clamped(monkeypatch):
+    monkeypatch.setenv("UBUNTU_AI_TEST_NUMBER", "100")
+    assert env_number("UBUNTU_AI_TEST_NUMBER", 90, minimum=1, maximum=95) == 95
+    monkeypatch.setenv("UBUNTU_AI_TEST_NUMBER", "0.5")
+    assert env_number("UBUNTU_AI_TEST_NUMBER", 2.0, float, minimum=1.0) == 1.0
+    monkeypatch.setenv("UBUNTU_AI_TEST_NUMBER", "12")
+    assert env_number("UBUNTU_AI_TEST_NUMBER", 90, minimum=1, maximum=95) == 12
+
+
+def test_module_with_bad_setting_still_imports(monkeypatch):
+    import save_queue
+    monkeypatch.setenv("UBUNTU_AI_SAVE_JPEG_QUALITY", "high")
+    assert importlib.reload(save_queue).JPEG_QUALITY == 90
+    monkeypatch.setenv("UBUNTU_AI_SAVE_JPEG_QUALITY", "100")
+    assert importlib.reload(save_queue).JPEG_QUALITY == 95
+    monkeypatch.delenv("UBUNTU_AI_SAVE_JPEG_QUALITY")
+    importlib.reload(save_queue)
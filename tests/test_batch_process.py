@@ -0,0 +1,64 @@
+# tests/test_batch_process.py
+# Gemini results and the checkpoint of the batch pipeline (batch_process.BatchPipeline), through a
+# fake client (no OCR, no network).
+#
+#   python3 -m pytest tests
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gemini_utils
+from batch_process import BatchPipeline, load_checkpoint, parse_operations
+
+ERROR_LOOKING_REPLY = "Error 0x80070005: Acesso negado."
+
+
+class FakeClient:
+    model_name = "fake-model"
+
+    def is_configured(self):
+        return True
+
+    def generate(self, prompt):
+        if "FAIL" in prompt:
+            raise ValueError("400 Bad Request")
+        return ERROR_LOOKING_REPLY
+
+
+def run_operations(tmp_path, monkeypatch, text):
+    monkeypatch.setattr(gemini_utils, "get_gemini_cache", lambda: None)
+    gemini_utils.set_client(FakeClient())
+    try:
+        operations = parse_operations(argparse.Namespace(translate=["pt-BR"], summarize=None, format=False))
+        pipeline = BatchPipeline(str(tmp_path / "out.jsonl"), operations, gemini_concurrency=1,
+                                 requests_per_minute=6000)
+        record = {"path": str(tmp_path / "shot.png"), "mtime": 1.0, "size": 10, "text": text,
+                  "results": {}, "errors": {}, "ocr_ms": 0.0, "gemini_ms": 0.0}
+        pipeline._run_operations(record)
+        pipeline._gemini_executor.shutdown()
+    finally:
+        gemini_utils.set_client(None)
+    with open(pipeline.output_path, "w", encoding="utf-8") as output:
+        output.write(json.dumps(pipeline._results.get_nowait()) + "\n")
+    return pipeline.output_path
+
+
+def test_reply_that_reads_like_an_error_is_a_result(tmp_path, monkeypatch):
+    output_path = run_operations(tmp_path, monkeypatch, "Error 0x80070005: Access is denied.")
+    with open(output_path, encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    assert record["results"] == {"translate:pt-BR": ERROR_LOOKING_REPLY}
+    assert record["errors"] == {}
+    assert load_checkpoint(output_path) == {str(tmp_path / "shot.png"): (1.0, 10)} # Not processed again on resume
+
+
+def test_failed_request_is_retried_on_resume(tmp_path, monkeypatch):
+    output_path = run_operations(tmp_path, monkeypatch, "FAIL")
+    with open(output_path, encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    assert record["results"] == {}
+    assert "400 Bad Request" in record["errors"]["translate:pt-BR"]
+    assert load_checkpoint(output_path) == {}
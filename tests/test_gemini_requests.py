@@ -0,0 +1,94 @@
+# tests/test_gemini_requests.py
+# The circuit breaker of the Gemini request layer, driven through a fake client (no network).
+#
+#   python3 -m pytest tests
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gemini_cache
+import gemini_requests
+import gemini_utils
+from gemini_requests import CircuitBreaker, CircuitOpenError, GeminiRequests, RateLimiter
+
+RESET_SECONDS = 0.2
+
+
+class FakeStream:
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    def __iter__(self):
+        return iter(self.pieces)
+
+    def cancel(self):
+        pass
+
+
+class FakeClient:
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.generate_calls = 0
+
+    def is_configured(self):
+        return True
+
+    def generate(self, prompt):
+        self.generate_calls += 1
+        return "answer"
+
+    def stream(self, prompt):
+        return FakeStream(["an", "swer"])
+
+
+class ServiceUnavailable(Exception):
+    """Retryable, like google.api_core's exception of the same name."""
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    layer = GeminiRequests(RateLimiter(6000, 100), CircuitBreaker(failure_threshold=1, reset_seconds=RESET_SECONDS),
+                           max_attempts=1)
+    monkeypatch.setattr(gemini_requests, "_requests", layer)
+    monkeypatch.setattr(gemini_cache, "CACHE_ENABLED", False)
+    client = FakeClient()
+    gemini_utils.set_client(client)
+    yield layer
+    gemini_utils.set_client(None)
+
+
+def open_breaker(requests):
+    def fail():
+        raise ServiceUnavailable("503")
+    with pytest.raises(ServiceUnavailable):
+        requests.call(fail)
+    with pytest.raises(CircuitOpenError):
+        requests.call(fail)
+    time.sleep(RESET_SECONDS * 1.5) # The next request is the half-open probe
+
+
+def test_breaker_recovers_after_a_successful_probe(requests):
+    open_breaker(requests)
+    assert requests.call(lambda: "ok") == "ok"
+    assert requests.call(lambda: "ok") == "ok"
+
+
+def test_cancelled_probe_is_handed_back(requests):
+    open_breaker(requests)
+    stream = gemini_utils.GeminiStream("translate", "text", "pt-BR", "prompt")
+    stream.cancel() # Cancelled after taking the probe, before any outcome
+    assert list(stream) == []
+    assert requests.call(lambda: "ok") == "ok"
+
+
+def test_abandoned_probe_stream_is_handed_back(requests):
+    open_breaker(requests)
+    stream = iter(gemini_utils.GeminiStream("translate", "text", "pt-BR", "prompt"))
+    assert next(stream) == "an"
+    stream.close() # The reader stopped (e.g. its window closed) mid-stream
+    assert requests.call(lambda: "ok") == "ok"
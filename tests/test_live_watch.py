@@ -0,0 +1,82 @@
+# tests/test_live_watch.py
+# Translation bookkeeping of the live region watch (live_watch.RegionWatcher), with fake OCR and
+# translate callables.
+#
+#   python3 -m pytest tests
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from live_watch import RegionWatcher, split_units
+from ocr_result import OCRResult
+
+
+def ocr_result(text):
+    result = OCRResult()
+    result._text = text # Only .text is read by the watcher
+    return result
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class FakeTranslator:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def __call__(self, text, target_language):
+        self.calls.append(text)
+        if text in self.fail:
+            raise RuntimeError("503 Service Unavailable")
+        return text.upper()
+
+
+def watch(translator):
+    # The frame handed to ocr is the OCRResult itself
+    return RegionWatcher((0, 0, 10, 10), "pt-BR", ocr=lambda frame, **kwargs: frame, translate=translator)
+
+
+def test_split_units_keeps_short_blocks_and_splits_long_ones():
+    assert split_units("Hello  world\nsecond line\n\nA\nB\nC\nD\n") == ["Hello world\nsecond line", "A", "B", "C", "D"]
+
+
+def test_only_new_units_are_translated():
+    translator = FakeTranslator()
+    watcher = watch(translator)
+    for text in ("one\n\ntwo", "two\n\nthree", "one\n\nthree"):
+        watcher._recognize(ocr_result(text))
+        wait_until(lambda: all(translation is not None for _, translation in watcher.units()))
+    assert sorted(translator.calls) == ["one", "three", "two"]
+    assert watcher.units() == [("one", "ONE"), ("three", "THREE")]
+    watcher.close()
+
+
+def test_translation_that_reads_like_an_error_is_kept():
+    translator = FakeTranslator()
+    watcher = watch(translator)
+    watcher._recognize(ocr_result("Error: disk full"))
+    wait_until(lambda: watcher.units()[0][1] is not None)
+    watcher._recognize(ocr_result("Error: disk full\n\nretrying"))
+    wait_until(lambda: all(translation is not None for _, translation in watcher.units()))
+    assert translator.calls == ["Error: disk full", "retrying"]
+    assert watcher.stats.errors == 0
+    watcher.close()
+
+
+def test_failed_unit_is_not_resent_on_every_change():
+    translator = FakeTranslator(fail={"broken"})
+    watcher = watch(translator)
+    watcher._recognize(ocr_result("broken"))
+    wait_until(lambda: watcher.stats.errors == 1)
+    watcher._recognize(ocr_result("broken\n\nnew"))
+    wait_until(lambda: watcher.units()[1][1] is not None)
+    assert translator.calls == ["broken", "new"]
+    assert watcher.units() == [("broken", None), ("new", "NEW")]
+    watcher.close()
@@ -0,0 +1,51 @@
+# tests/test_translation_chunks.py
+# Chunked translation of long texts (gemini_utils.TranslationStream), through a fake client.
+#
+#   python3 -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gemini_utils
+from text_chunking import split_text_into_chunks
+
+
+class FakeClient:
+    model_name = "fake-model"
+
+    def is_configured(self):
+        return True
+
+    def count_tokens(self, text):
+        return len(text) // 4
+
+    def generate(self, prompt):
+        return prompt.split("\n\n", 1)[1].strip('"').upper() # The quoted text of the translation prompt
+
+
+def test_chunks_join_back_to_the_original_text():
+    text = "First paragraph. Two sentences.\n\nSecond one!\n\n\nThird, after extra blank lines."
+    chunks = split_text_into_chunks(text, 20)
+    assert len(chunks) > 1
+    assert "".join(chunk + separator for chunk, separator in chunks) == text
+
+
+def test_long_translation_looks_up_the_cache_once(monkeypatch):
+    lookups = []
+    original_lookup = gemini_utils.lookup_cached_response
+
+    def counting_lookup(operation, source_text, option=None):
+        lookups.append(source_text)
+        return original_lookup(operation, source_text, option)
+
+    monkeypatch.setattr(gemini_utils, "lookup_cached_response", counting_lookup)
+    monkeypatch.setattr(gemini_utils, "get_gemini_cache", lambda: None)
+    gemini_utils.set_client(FakeClient())
+    try:
+        text = "\n\n".join(f"Paragraph {i} with a few words of text." for i in range(400)) # About 4000 tokens
+        translated = gemini_utils.translate_text_with_gemini(text, "pt-BR")
+    finally:
+        gemini_utils.set_client(None)
+    assert translated.startswith("PARAGRAPH 0") and translated.endswith("PARAGRAPH 399 WITH A FEW WORDS OF TEXT.")
+    assert lookups.count(text) == 1 # The whole text; each chunk has its own lookup
@@ -0,0 +1,52 @@
+# text_chunking.py
+# Splits long OCR text into pieces small enough for one Gemini request each.
+# Cuts are made at paragraph breaks first, then at sentence ends, and only as a last resort
+# between words. Every chunk remembers the separator that followed it, so joining
+# chunk + separator for all chunks gives back the original text exactly.
+import re
+
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+SENTENCE_END = re.compile(r"(?<=[.!?;:。！？])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def _split_keeping_separators(text, pattern, final_separator):
+    """Splits text at pattern. Returns [(piece, separator_after)]; the last piece gets final_separator."""
+    parts = []
+    pos = 0
+    for match in pattern.finditer(text):
+        parts.append((text[pos:match.start()], match.group()))
+        pos = match.end()
+    parts.append((text[pos:], final_separator))
+    return parts
+
+
+def split_text_into_chunks(text, max_chars):
+    """
+    Returns a list of (chunk_text, separator_after) with every chunk at most max_chars long
+    (unless a single word is longer). Small paragraphs and sentences are packed together.
+    """
+    max_chars = max(1, int(max_chars))
+    units = []
+    for paragraph, paragraph_sep in _split_keeping_separators(text, PARAGRAPH_BREAK, ""):
+        if len(paragraph) <= max_chars:
+            units.append((paragraph, paragraph_sep))
+            continue
+        for sentence, sentence_sep in _split_keeping_separators(paragraph, SENTENCE_END, paragraph_sep):
+            if len(sentence) <= max_chars:
+                units.append((sentence, sentence_sep))
+            else:
+                units.extend(_split_keeping_separators(sentence, WHITESPACE, sentence_sep))
+
+    chunks = []
+    current, current_sep = "", ""
+    for unit, unit_sep in units:
+        if (current or current_sep) and len(current) + len(current_sep) + len(unit) > max_chars:
+            chunks.append((current, current_sep))
+            current, current_sep = unit, unit_sep
+        else:
+            current, current_sep = current + current_sep + unit, unit_sep
+    if current or current_sep or not chunks:
+        chunks.append((current, current_sep))
+    return chunks
+
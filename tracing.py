@@ -0,0 +1,239 @@
+# tracing.py
+# Timing spans for one interaction, from the hotkey to the translated text.
+#
+# Every interaction gets a trace id: capture_screen's capture_id, minted by the launcher when the
+# hotkey request arrives and then carried by the CapturedImage. Code measures a step with
+#
+#   with span("ocr", trace_id, region=...):
+#       ...
+#
+# and nested steps on the same thread pick up the trace id of the enclosing span, so helpers deep
+# down (OCR preprocessing, the Gemini request) do not need it passed in. Finished spans are appended
+# as JSON lines to ~/.cache/ubuntu-ai-app/traces.jsonl; `python3 tracing.py` prints the latest trace
+# as a timeline and `--chrome` converts it to the Chrome trace-event format (chrome://tracing,
+# https://ui.perfetto.dev).
+#
+# Tracing is off unless enabled; then span() returns one shared no-op object and costs a global
+# lookup and a call.
+#
+#   UBUNTU_AI_TRACE=1    Record spans (start the daemon with it to trace hotkey launches)
+import json
+import os
+import threading
+import time
+import uuid
+
+from app_paths import get_cache_dir
+
+TRACE_ENABLED = os.environ.get("UBUNTU_AI_TRACE", "0") != "0"
+TRACE_FILE_NAME = "traces.jsonl"
+TRACE_FILE_MAX_BYTES = 16 * 1024 * 1024 # Then the file is rotated to traces.jsonl.1
+
+_current = threading.local() # .trace_id of the innermost open span on this thread
+
+
+def new_trace_id():
+    return str(uuid.uuid4())
+
+
+def current_trace_id():
+    return getattr(_current, "trace_id", None)
+
+
+class _NullSpan:
+    """What span() returns when tracing is off: does nothing, as cheaply as possible."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "attributes", "start", "_start_counter", "_outer_trace_id")
+
+    def __init__(self, name, trace_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.attributes = attributes
+
+    def __enter__(self):
+        self._outer_trace_id = current_trace_id()
+        _current.trace_id = self.trace_id
+        self.start = time.time() # Wall clock, comparable across processes (the launch time comes from /proc)
+        self._start_counter = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self._start_counter
+        _current.trace_id = self._outer_trace_id
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        get_trace_writer().write(self.trace_id, self.name, self.start, duration, self.attributes)
+        return False
+
+    def set(self, **attributes):
+        """Adds attributes known only once the step is under way (e.g. the number of words found)."""
+        self.attributes.update(attributes)
+
+
+def span(name, trace_id=None, **attributes):
+    """
+    Context manager timing one step of the interaction trace_id (default: the trace of the enclosing
+    span on this thread). Does nothing when tracing is off or there is no trace to attach to.
+    """
+    if not TRACE_ENABLED:
+        return NULL_SPAN
+    trace_id = trace_id or current_trace_id()
+    if trace_id is None:
+        return NULL_SPAN
+    return Span(name, trace_id, attributes)
+
+
+def record_span(name, trace_id, start, end, **attributes):
+    """Records a step measured without span(), e.g. from the process start time to the dialog appearing."""
+    if TRACE_ENABLED and trace_id is not None and start is not None:
+        get_trace_writer().write(trace_id, name, start, max(0.0, end - start), attributes)
+
+
+def traced(name, trace_id, func, **attributes):
+    """func wrapped in a span, for work handed to an executor: executor.submit(traced("ocr", id, f), ...)."""
+    if not TRACE_ENABLED or trace_id is None:
+        return func
+
+    def run(*args, **kwargs):
+        with Span(name, trace_id, dict(attributes)):
+            return func(*args, **kwargs)
+    return run
+
+
+class TraceWriter:
+    """Appends finished spans to a JSONL file; safe to use from any thread."""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, trace_id, name, start, duration, attributes):
+        thread = threading.current_thread()
+        record = {"trace_id": trace_id, "name": name, "start": round(start, 6), "duration_ms": round(duration * 1000, 3),
+                  "pid": os.getpid(), "tid": threading.get_native_id(), "thread": thread.name}
+        if attributes:
+            record["attributes"] = attributes
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    if os.path.exists(self.path) and os.path.getsize(self.path) > TRACE_FILE_MAX_BYTES:
+                        os.replace(self.path, self.path + ".1")
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(line)
+                self._file.flush() # Spans must survive the process being killed mid-interaction
+            except OSError as e:
+                print(f"Tracing: could not write '{self.path}': {e}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_trace_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TraceWriter(os.path.join(get_cache_dir(), TRACE_FILE_NAME))
+    return _writer
+
+
+# --- Reading and exporting ---
+
+def read_spans(path, trace_id=None):
+    """The spans in a traces.jsonl file (of one trace, if trace_id is given), in start order."""
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue # A line cut short by a killed process
+            if trace_id is None or record.get("trace_id") == trace_id:
+                spans.append(record)
+    spans.sort(key=lambda record: record["start"])
+    return spans
+
+
+def latest_trace_id(spans):
+    return max(spans, key=lambda record: record["start"] + record["duration_ms"] / 1000)["trace_id"] if spans else None
+
+
+def to_chrome_trace(spans):
+    """The spans as a Chrome trace-event document (complete events, plus thread names)."""
+    events = []
+    thread_names = {}
+    for record in spans:
+        events.append({"name": record["name"], "cat": record["trace_id"][:8], "ph": "X",
+                       "ts": round(record["start"] * 1e6), "dur": round(record["duration_ms"] * 1000),
+                       "pid": record["pid"], "tid": record["tid"],
+                       "args": dict(record.get("attributes", {}), trace_id=record["trace_id"])})
+        thread_names[(record["pid"], record["tid"])] = record.get("thread", "")
+    for (pid, tid), thread_name in thread_names.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def print_timeline(spans):
+    if not spans:
+        print("No spans recorded.")
+        return
+    origin = spans[0]["start"]
+    end = max(record["start"] + record["duration_ms"] / 1000 for record in spans)
+    print(f"Trace {spans[0]['trace_id']}: {len(spans)} spans over {(end - origin) * 1000:.1f} ms")
+    print(f"{'start ms':>10} {'duration ms':>12}  {'span':<22} {'thread':<18} attributes")
+    for record in spans:
+        attributes = ", ".join(f"{key}={value}" for key, value in record.get("attributes", {}).items())
+        print(f"{(record['start'] - origin) * 1000:>10.1f} {record['duration_ms']:>12.1f}  {record['name']:<22} "
+              f"{record.get('thread', '')[:18]:<18} {attributes}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Show or export the recorded interaction traces.")
+    parser.add_argument("--file", default=os.path.join(get_cache_dir(), TRACE_FILE_NAME), help="Trace file to read")
+    parser.add_argument("--trace", help="Trace id (or its first characters); default: the latest trace")
+    parser.add_argument("--all", action="store_true", help="Export every trace in the file")
+    parser.add_argument("--chrome", metavar="PATH", help="Write the Chrome trace-event JSON to PATH")
+    parser.add_argument("--jsonl", metavar="PATH", help="Write the selected spans as JSON lines to PATH")
+    args = parser.parse_args()
+
+    try:
+        all_spans = read_spans(args.file)
+    except FileNotFoundError:
+        raise SystemExit(f"No traces in '{args.file}'. Run the app with UBUNTU_AI_TRACE=1 first.")
+    if args.all:
+        selected = all_spans
+    else:
+        trace_id = latest_trace_id(all_spans)
+        if args.trace:
+            matches = {record["trace_id"] for record in all_spans if record["trace_id"].startswith(args.trace)}
+            if len(matches) != 1:
+                raise SystemExit(f"{len(matches)} traces match '{args.trace}'.")
+            trace_id = matches.pop()
+        selected = [record for record in all_spans if record["trace_id"] == trace_id]
+        print_timeline(selected)
+    if args.chrome:
+        with open(args.chrome, "w") as f:
+            json.dump(to_chrome_trace(selected), f)
+        print(f"Chrome trace written to {args.chrome}")
+    if args.jsonl:
+        with open(args.jsonl, "w") as f:
+            for record in selected:
+                f.write(json.dumps(record) + "\n")
+        print(f"{len(selected)} spans written to {args.jsonl}")
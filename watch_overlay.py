@@ -0,0 +1,230 @@
+# watch_overlay.py
+# The live region watch on screen: a small always-on-top window next to the watched region that
+# shows the translation (or the OCR text) of whatever the region currently shows. See live_watch.py
+# for how frames are chosen and translated.
+#
+# Started from the preview's "Watch Region" button (a region selected on a full-screen capture), or:
+#
+#   python3 watch_overlay.py --region X,Y,WIDTH,HEIGHT [--lang pt-BR]
+#
+# The overlay never takes the keyboard focus, so the application being watched keeps it. Drag it to
+# move it; it must not cover the region, or it would read itself.
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GLib, Pango
+from concurrent.futures import ThreadPoolExecutor
+
+from capture_backends import get_capture_registry
+from capture_utils import capture_region
+from clipboard import get_clipboard
+from display_window import run_on_main_thread, run_when_done
+from live_watch import RegionWatcher, CpuBudget
+
+OVERLAY_WIDTH_MIN = 320
+OVERLAY_GAP = 8 # Logical pixels between the region and the overlay
+OVERLAY_MAX_UNITS = 8 # Most recent units shown; older ones scroll out
+OVERLAY_CSS = b"""
+.watch-overlay { background-color: rgba(20, 20, 20, 0.88); }
+.watch-overlay label { color: #f2f2f2; }
+.watch-overlay .watch-status { color: #9a9a9a; font-size: smaller; }
+"""
+
+
+class WatchOverlay(Gtk.Window):
+    def __init__(self, box, target_language=None, lang=None, quit_on_close=True):
+        super().__init__(title="Watching Region")
+        self.quit_on_close = quit_on_close
+        self.paused = False
+        self.is_closed = False # Late OCR/translation results are dropped from then on
+        self.user_moved = False # Once dragged, the overlay stays where the user put it
+        self.backend = get_capture_registry().region_backend()
+        self.budget = CpuBudget()
+        self.watcher = RegionWatcher(box, target_language, lang,
+                                     on_update=lambda watcher: run_on_main_thread(self.refresh))
+        # Screenshot tools run on a worker so the overlay stays responsive; the Gdk grab has to stay on this thread
+        self._capture_executor = None if self.backend is None or self.backend.main_thread_only else \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="watch-capture")
+        self._capture_future = None
+        self._timeout_id = None
+
+        self.set_decorated(False)
+        self.set_keep_above(True)
+        self.set_skip_taskbar_hint(True)
+        self.set_skip_pager_hint(True)
+        self.set_accept_focus(False)
+        self.set_type_hint(Gdk.WindowTypeHint.UTILITY)
+        style_provider = Gtk.CssProvider()
+        style_provider.load_from_data(OVERLAY_CSS)
+        Gtk.StyleContext.add_provider_for_screen(self.get_screen(), style_provider,
+                                                 Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        self.get_style_context().add_class("watch-overlay")
+
+        scale = self.get_screen_scale()
+        left, top, right, bottom = box
+        self.set_size_request(max(OVERLAY_WIDTH_MIN, (right - left) // scale), -1)
+
+        outer_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4, margin=8)
+        event_box = Gtk.EventBox() # Presses on the text start a window drag
+        event_box.connect("button-press-event", self.on_button_press)
+        event_box.add(outer_box)
+        self.add(event_box)
+
+        self.text_label = Gtk.Label(label="Watching...", xalign=0)
+        self.text_label.set_line_wrap(True)
+        self.text_label.set_line_wrap_mode(Pango.WrapMode.WORD_CHAR)
+        outer_box.pack_start(self.text_label, True, True, 0)
+
+        bottom_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
+        self.status_label = Gtk.Label(xalign=0)
+        self.status_label.get_style_context().add_class("watch-status")
+        bottom_box.pack_start(self.status_label, True, True, 0)
+        for icon_name, tooltip, callback in (("edit-copy", "Copy Text", self.on_copy_clicked),
+                                             ("media-playback-pause", "Pause", self.on_pause_clicked),
+                                             ("window-close", "Stop Watching", lambda w: self.close())):
+            button = Gtk.Button.new_from_icon_name(icon_name + "-symbolic", Gtk.IconSize.MENU)
+            button.set_relief(Gtk.ReliefStyle.NONE)
+            button.set_tooltip_text(tooltip)
+            button.connect("clicked", callback)
+            bottom_box.pack_start(button, False, False, 0)
+        outer_box.pack_start(bottom_box, False, False, 0)
+
+        self.connect("size-allocate", lambda widget, allocation: self.place())
+        self.connect("destroy", self.on_destroy)
+
+    def get_screen_scale(self):
+        root_window = Gdk.get_default_root_window()
+        return root_window.get_scale_factor() if root_window is not None else 1
+
+    def start(self):
+        if self.backend is None:
+            session_type = get_capture_registry().session_type
+            self.text_label.set_text(f"No screenshot tool can capture a region in this {session_type} session "
+                                     "(install scrot on X11 or grim on wlroots Wayland).")
+            return
+        print(f"[WATCH] Watching {self.watcher.box} with {self.backend.name}, "
+              f"translating into {self.watcher.target_language or '(OCR only)'}.")
+        self.on_tick()
+
+    def place(self):
+        """Puts the overlay just below the region, or above it when there is no room below."""
+        if self.user_moved:
+            return
+        scale = self.get_screen_scale()
+        left, top, right, bottom = (value // scale for value in self.watcher.box)
+        width, height = self.get_size()
+        display = Gdk.Display.get_default()
+        monitor = display.get_monitor_at_point((left + right) // 2, (top + bottom) // 2)
+        workarea = monitor.get_workarea()
+        y = bottom + OVERLAY_GAP
+        if y + height > workarea.y + workarea.height:
+            y = max(workarea.y, top - OVERLAY_GAP - height)
+        x = min(max(workarea.x, left), workarea.x + workarea.width - width)
+        if (x, y) != tuple(self.get_position()):
+            self.move(x, y)
+
+    # --- Frames ---
+    def on_tick(self):
+        self._timeout_id = None
+        if not self.paused:
+            if self._capture_executor is None:
+                frame = capture_region(self.watcher.box, backend=self.backend)
+                if frame is not None:
+                    self.watcher.process_frame(frame)
+            elif self._capture_future is None or self._capture_future.done(): # Otherwise this tick is skipped
+                self._capture_future = self._capture_executor.submit(capture_region, self.watcher.box, None, self.backend)
+                run_when_done(self._capture_future, self.on_frame_captured)
+        self.update_status()
+        self._timeout_id = GLib.timeout_add(int(self.budget.update() * 1000), self.on_tick)
+        return False # Rescheduled above, with the interval the CPU budget allows now
+
+    def on_frame_captured(self, future):
+        if future.cancelled() or self._timeout_id is None: # Stopped meanwhile
+            return
+        frame = future.result()
+        if frame is not None:
+            self.watcher.process_frame(frame)
+
+    # --- Display ---
+    def refresh(self):
+        if self.is_closed:
+            return
+        units = self.watcher.units()[-OVERLAY_MAX_UNITS:]
+        if not units:
+            self.text_label.set_text(self.watcher.message or "Watching...")
+        elif self.watcher.target_language:
+            self.text_label.set_text("\n".join(f"… {unit}" if translation is None else translation for unit, translation in units))
+        else:
+            self.text_label.set_text("\n".join(unit for unit, _ in units))
+        self.update_status()
+
+    def update_status(self):
+        stats = self.watcher.stats
+        parts = ["paused" if self.paused else f"{1 / self.budget.interval:.1f} fps",
+                 f"CPU {self.budget.usage * 100:.0f}%", f"{stats.recognized}/{stats.frames} frames read"]
+        if stats.last_ocr_ms is not None:
+            parts.append(f"OCR {stats.last_ocr_ms:.0f} ms")
+        if stats.errors:
+            parts.append(f"{stats.errors} errors")
+        self.status_label.set_text(" · ".join(parts))
+
+    # --- Actions ---
+    def on_button_press(self, widget, event):
+        if event.button == 1:
+            self.user_moved = True
+            self.begin_move_drag(event.button, int(event.x_root), int(event.y_root), event.time)
+            return True
+        return False
+
+    def on_copy_clicked(self, widget):
+        units = self.watcher.units()
+        if units:
+            get_clipboard().copy(text="\n".join(unit if translation is None else translation for unit, translation in units))
+
+    def on_pause_clicked(self, widget):
+        self.paused = not self.paused
+        icon_name = "media-playback-start" if self.paused else "media-playback-pause"
+        widget.set_image(Gtk.Image.new_from_icon_name(icon_name + "-symbolic", Gtk.IconSize.MENU))
+        widget.set_tooltip_text("Resume" if self.paused else "Pause")
+        self.update_status()
+
+    def on_destroy(self, widget):
+        print("[WATCH] Stopped watching.")
+        self.is_closed = True
+        if self._timeout_id is not None:
+            GLib.source_remove(self._timeout_id)
+            self._timeout_id = None
+        if self._capture_executor is not None:
+            self._capture_executor.shutdown(wait=False, cancel_futures=True)
+        self.watcher.close()
+        if self.quit_on_close:
+            get_clipboard().store_on_exit()
+            Gtk.main_quit()
+
+
+def start_watch(box, target_language=None, lang=None, quit_on_close=True):
+    """Opens the overlay for the (left, top, right, bottom) screen rectangle box and starts watching it."""
+    overlay = WatchOverlay(box, target_language, lang, quit_on_close=quit_on_close)
+    overlay.show_all()
+    overlay.start()
+    return overlay
+
+
+def parse_region(value):
+    try:
+        x, y, width, height = (int(part) for part in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected X,Y,WIDTH,HEIGHT in screen pixels")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError("WIDTH and HEIGHT must be positive")
+    return (x, y, x + width, y + height)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Watch a screen region and keep its text translated.")
+    parser.add_argument("--region", type=parse_region, required=True, metavar="X,Y,WIDTH,HEIGHT")
+    parser.add_argument("--lang", help="Target language code (e.g. pt-BR); without it the OCR text is shown")
+    parser.add_argument("--ocr-langs", help="Tesseract languages of the watched text (e.g. 'eng+jpn')")
+    args = parser.parse_args()
+    start_watch(args.region, args.lang, args.ocr_langs)
+    Gtk.main()